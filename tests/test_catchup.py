@@ -0,0 +1,205 @@
+#
+# Copyright (c) 2021, 2022 Astroncia
+# Copyright (c) 2023, 2024 Liya Astrova <liyaastrova@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# Font Awesome Free 5.15.4 by @fontawesome - https://fontawesome.com
+# License - https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+import time
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "usr", "lib", "yuki-iptv")
+)
+
+from yuki_iptv import catchup  # noqa: E402
+
+# 2024-10-01 10:00:00 UTC, one hour programme, watched 10 minutes after start
+START = 1727776800
+END = START + 3600
+NOW = START + 600
+
+# Template, expected URL (TZ=UTC)
+TEMPLATES = (
+    (
+        "http://h/ch/index.m3u8?utc={utc}&lutc={lutc}",
+        "http://h/ch/index.m3u8?utc=1727776800&lutc=1727777400",
+    ),
+    (
+        "http://h/timeshift/u/p/{duration:60}/{Y}-{m}-{d}:{H}-{M}/123.ts",
+        "http://h/timeshift/u/p/60/2024-10-01:10-00/123.ts",
+    ),
+    (
+        "http://h/ch/timeshift_abs-${start}.ts",
+        "http://h/ch/timeshift_abs-1727776800.ts",
+    ),
+    (
+        "http://h/ch/timeshift_rel-{offset:1}.m3u8",
+        "http://h/ch/timeshift_rel-600.m3u8",
+    ),
+    (
+        "http://h/ch/video-{utc:YmdHMS}-{duration:3600}.m3u8?t={catchup-id}",
+        "http://h/ch/video-20241001100000-1.m3u8?t=abc",
+    ),
+    (
+        "http://h/{start:Y-m-d-H-M-S}/{end:Y-m-d}/{now:H-M}/{lutc:S}/{timestamp:d-}",
+        "http://h/2024-10-01-10-00-00/2024-10-01/10-10/00/01-",
+    ),
+    ("${offset}${offset:60}${duration}{duration:15}", "600103600240"),
+    (
+        "{s}/{S}/{now}/{timestamp}/{utcend}/{end}",
+        "1727776800/00/1727777400/1727777400/1727780400/1727780400",
+    ),
+    (
+        "$${utc}{{end}}{utc:}{utc:X}{Catchup-id}{$utc}$",
+        "$1727776800{1727780400}{utc:}{utc:X}{Catchup-id}{$utc}$",
+    ),
+    # Zero divisor is invalid, placeholder is kept
+    ("{duration:0}/{offset:0}", "{duration:0}/{offset:0}"),
+    ("no placeholders", "no placeholders"),
+    ("", ""),
+)
+
+# Scheme, channel URL, catchup source, expected URL (TZ=UTC)
+SCHEMES = (
+    (
+        "default",
+        "http://h/ch",
+        "http://h/arc?s={utc}&e={utcend}",
+        "http://h/arc?s=1727776800&e=1727780400",
+    ),
+    (
+        "append",
+        "http://h/ch",
+        "?s={utc}&e={utcend}",
+        "http://h/ch?s=1727776800&e=1727780400",
+    ),
+    (
+        "shift",
+        "http://h/ch/index.m3u8",
+        "",
+        "http://h/ch/index.m3u8?utc=1727776800&lutc=1727777400",
+    ),
+    (
+        "shift",
+        "http://h/ch/index.m3u8?token=x",
+        "",
+        "http://h/ch/index.m3u8?token=x&utc=1727776800&lutc=1727777400",
+    ),
+    (
+        "flussonic",
+        "http://h/ch/index.m3u8?token=x",
+        "",
+        "http://h/ch/timeshift_rel-600.m3u8?token=x",
+    ),
+    (
+        "flussonic-ts",
+        "http://h/ch/mpegts",
+        "",
+        "http://h/ch/timeshift_abs-1727776800.ts",
+    ),
+    (
+        "flussonic-hls",
+        "http://h/ch/mono.m3u8",
+        "",
+        "http://h/ch/mono-timeshift_rel-600.m3u8",
+    ),
+    ("fs", "http://h/ch/stream", "", "http://h/ch/timeshift_abs-1727776800.ts"),
+    (
+        "xc",
+        "http://h/live/u/p/123.m3u8",
+        "",
+        "http://h/timeshift/u/p/60/2024-10-01:10-00/123.m3u8",
+    ),
+    ("xc", "http://h/u/p/123", "", "http://h/timeshift/u/p/60/2024-10-01:10-00/123.ts"),
+)
+
+# Europe/Berlin, clocks go back 2024-10-27 03:00 CEST -> 02:00 CET
+# and forward 2024-03-31 02:00 CET -> 03:00 CEST.
+# Start, end, expected local start time
+DST_CASES = (
+    # Second 02:30 of the night (CET)
+    (1729992600, 1729994400, "2024-10-27-02-30-00"),
+    # First 02:00 of the night (CEST)
+    (1729987200, 1729990800, "2024-10-27-02-00-00"),
+    (1729985400, 1729996200, "2024-10-27-01-30-00"),
+    (1711843200, 1711850400, "2024-03-31-01-00-00"),
+    (1727769600, 1727773200, "2024-10-01-10-00-00"),
+)
+
+
+def set_timezone(monkeypatch, timezone):
+    monkeypatch.setenv("TZ", timezone)
+    time.tzset()
+
+
+@pytest.fixture
+def timezone_utc(monkeypatch):
+    set_timezone(monkeypatch, "UTC")
+    monkeypatch.setattr(time, "time", lambda: NOW)
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture
+def timezone_berlin(monkeypatch):
+    set_timezone(monkeypatch, "Europe/Berlin")
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.mark.parametrize("template, expected", TEMPLATES)
+def test_format_placeholders(timezone_utc, template, expected):
+    assert catchup.format_placeholders(START, END, "abc", template) == expected
+
+
+@pytest.mark.parametrize("template, expected", TEMPLATES)
+def test_render_compiled_template(timezone_utc, template, expected):
+    tokens = catchup.compile_catchup_template(template)
+    assert catchup.render_catchup_template(tokens, START, END, NOW, "abc") == expected
+
+
+@pytest.mark.parametrize("scheme, channel_url, source, expected", SCHEMES)
+def test_get_catchup_url(timezone_utc, scheme, channel_url, source, expected):
+    arr1 = {"catchup": scheme, "catchup-source": source}
+    assert catchup.get_catchup_url(channel_url, arr1, START, END, "") == expected
+
+
+def test_now_url(timezone_utc):
+    template = "http://h/ch.m3u8?now={timestamp}&t={now:H-M}&s={start}&d={duration}"
+    expected = "http://h/ch.m3u8?now=1727777400&t=10-10&s={start}&d={duration}"
+    assert catchup.parse_specifiers_now_url(template) == expected
+    assert catchup.has_now_placeholders(template)
+    assert not catchup.has_now_placeholders("http://h/ch.m3u8?s={start}")
+    assert not catchup.has_now_placeholders("http://h/ch.m3u8")
+
+
+@pytest.mark.parametrize("start, end, local_start", DST_CASES)
+def test_dst(timezone_berlin, start, end, local_start):
+    arr1 = {
+        "catchup": "default",
+        "catchup-source": "http://h/a?utc={utc}&end={utcend}&d={duration}"
+        "&t={start:Y-m-d-H-M-S}",
+    }
+    expected = f"http://h/a?utc={start}&end={end}&d={end - start}&t={local_start}"
+    assert catchup.get_catchup_url("http://h/ch", arr1, start, end, "") == expected
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021, 2022 Astroncia
+# Copyright (c) 2023, 2024 Liya Astrova <liyaastrova@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# Font Awesome Free 5.15.4 by @fontawesome - https://fontawesome.com
+# License - https://creativecommons.org/licenses/by/4.0/
+#
+"""Xtream loading benchmark
+
+Serves a synthetic provider dump (50k live, 70k VOD, 30k series by default)
+from a local stand-in HTTP server and times XTream.load_iptv() with
+a fresh download and from the JSON cache.
+
+Usage: python3 tools/bench_xtream.py [--live N] [--vod N] [--series N]
+
+Run it on two checkouts to compare them.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "usr", "lib", "yuki-iptv")
+)
+
+from thirdparty import xtream  # noqa: E402
+
+
+def make_provider_data(live_count, vod_count, series_count, categories):
+    rnd = random.Random(1)
+    data = {}
+    for stream_type in ("live", "vod", "series"):
+        data[f"get_{stream_type}_categories"] = [
+            {
+                "category_id": str(i + 1),
+                "category_name": f"{stream_type} group {i}",
+                "parent_id": 0,
+            }
+            for i in range(categories)
+        ]
+    data["get_live_streams"] = [
+        {
+            "num": i,
+            "name": f"Live {i}",
+            "stream_type": "live",
+            "stream_id": i,
+            "stream_icon": f"http://logos.example.com/live/{i}.png",
+            "epg_channel_id": f"ch{i}",
+            "added": "1700000000",
+            "is_adult": "0",
+            "category_id": str(rnd.randint(1, categories)),
+            "tv_archive": i % 3 == 0,
+            "tv_archive_duration": 3,
+        }
+        for i in range(live_count)
+    ]
+    data["get_vod_streams"] = [
+        {
+            "num": i,
+            "name": f"Movie {i}",
+            "stream_type": "movie",
+            "stream_id": 10**6 + i,
+            "stream_icon": f"http://logos.example.com/vod/{i}.jpg",
+            "added": "1700000000",
+            "category_id": str(rnd.randint(1, categories)),
+            "container_extension": "mkv",
+        }
+        for i in range(vod_count)
+    ]
+    data["get_series"] = [
+        {
+            "num": i,
+            "name": f"Serie {i}",
+            "series_id": i,
+            "cover": f"http://logos.example.com/series/{i}.jpg",
+            "plot": "",
+            "genre": "",
+            "youtube_trailer": "",
+            "category_id": str(rnd.randint(1, categories)),
+        }
+        for i in range(series_count)
+    ]
+    return {action: json.dumps(value).encode() for action, value in data.items()}
+
+
+def start_server(provider_data):
+    auth = json.dumps(
+        {
+            "user_info": {
+                "username": "user",
+                "password": "pass",
+                "auth": 1,
+                "status": "Active",
+                "exp_date": str(int(time.time()) + 30 * 86400),
+            },
+            "server_info": {"url": "127.0.0.1"},
+        }
+    ).encode()
+
+    class ProviderHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            action = parse_qs(urlparse(self.path).query).get("action", [None])[0]
+            if action is None:
+                body = auth
+            elif action in provider_data:
+                body = provider_data[action]
+            else:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ProviderHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def load(server, cache_path):
+    load_start = time.perf_counter()
+    xt = xtream.XTream(
+        lambda *args, **kwargs: None,
+        "bench",
+        "user",
+        "pass",
+        f"http://127.0.0.1:{server.server_address[1]}",
+        cache_path=cache_path,
+    )
+    xt.load_iptv()
+    return xt, time.perf_counter() - load_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Xtream loading benchmark")
+    parser.add_argument("--live", type=int, default=50000)
+    parser.add_argument("--vod", type=int, default=70000)
+    parser.add_argument("--series", type=int, default=30000)
+    parser.add_argument("--categories", type=int, default=500)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    # Hide progress bar
+    xtream.stdout = io.StringIO()
+
+    server = start_server(
+        make_provider_data(args.live, args.vod, args.series, args.categories)
+    )
+    cache_path = tempfile.mkdtemp(prefix="yuki-iptv-bench-")
+    try:
+        xt, download_secs = load(server, cache_path)
+        xt, cached_secs = load(server, cache_path)
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_path, ignore_errors=True)
+    print(
+        f"live {len(xt.channels)}, VOD {len(xt.movies)}, series {len(xt.series)}, "
+        f"groups {len(xt.groups)}"
+    )
+    print(f"load_iptv with download: {download_secs:.2f}s")
+    print(f"load_iptv from cache: {cached_secs:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,9 +20,18 @@ __author__ = "Claudio Olmi"
 
 import logging
 import json
+import pickle
 import re  # used for URL validation
 import time
+import random
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from email.utils import parsedate_to_datetime
+from array import array
 from os import makedirs
+from os import remove
+from os import replace
 from os import path as osp
 from sys import stdout
 from timeit import default_timer as timer  # Timing xtream json downloads
@@ -35,30 +44,74 @@ import requests
 
 logger = logging.getLogger(__name__)
 
+# Compiled once, it is used for every stream URL and logo URL
+URL_REGEX = re.compile(
+    r"^(?:http|ftp)s?://"  # http:// or https://
+    r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|"  # domain...
+    r"localhost|"  # localhost...
+    r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"  # ...or ip
+    r"(?::\d+)?"  # optional port
+    r"(?:/?|[/?]\S+)$",
+    re.IGNORECASE,
+)
+
+# Retries of failed requests, with jittered exponential backoff
+REQUEST_MAX_RETRIES = 5
+REQUEST_BACKOFF_BASE = 0.5
+REQUEST_BACKOFF_MAX = 8
+# Longest Retry-After delay that is respected
+REQUEST_RETRY_AFTER_MAX = 30
+# Concurrent downloads of categories and streams
+DOWNLOAD_THREADS = 3
+# Streams are cached as columns, in pickle format
+CATALOG_CACHE_VERSION = 1
+# Marks keys missing in stream JSON, JSON has no Ellipsis
+MISSING = Ellipsis
+# Series info (seasons and episodes) is cached for that long
+SERIES_INFO_TTL = 60 * 60 * 6
+# Low concurrency, prefetch should not compete with user requests
+SERIES_PREFETCH_THREADS = 2
+# Skipped streams saved per stream type, the log is rewritten on each start
+SKIPPED_STREAMS_MAX_LINES = 1000
+
 
 class Channel:
-    # Required by Hypnotix
-    info = ""
-    id = ""
-    name = ""  # What is the difference between the below name and title?
-    logo = ""
-    logo_path = ""
-    group_title = ""
-    title = ""
-    url = ""
-
-    # XTream
-    stream_type = ""
-    group_id = ""
-    is_adult = 0
-    added = ""
-    epg_channel_id = ""
-    added = ""
-
-    # This contains the raw JSON data
-    raw = ""
+    __slots__ = (
+        # Required by Hypnotix
+        "info",
+        "id",
+        "name",  # What is the difference between the below name and title?
+        "logo",
+        "group_title",
+        "title",
+        "url",
+        # XTream
+        "xtream",
+        "stream_type",
+        "group_id",
+        "is_adult",
+        "added",
+        "epg_channel_id",
+        # This contains the raw JSON data
+        "raw",
+    )
 
     def __init__(self, xtream: object, group_title, stream_info):
+        self.info = ""
+        self.id = ""
+        self.name = ""
+        self.logo = ""
+        self.xtream = None
+        self.group_title = ""
+        self.title = ""
+        self.url = ""
+        self.stream_type = ""
+        self.group_id = ""
+        self.is_adult = 0
+        self.added = ""
+        self.epg_channel_id = ""
+        self.raw = ""
+
         stream_type = stream_info["stream_type"]
         # Adjust the odd "created_live" type
         if stream_type == "created_live" or stream_type == "radio_streams":
@@ -78,7 +131,7 @@ class Channel:
             self.id = stream_info["stream_id"]
             self.name = stream_name
             self.logo = stream_info["stream_icon"]
-            self.logo_path = xtream._get_logo_local_path(self.logo)
+            self.xtream = xtream
             self.group_title = group_title
             self.title = stream_name
 
@@ -118,6 +171,13 @@ class Channel:
             if not xtream._validate_url(self.url):
                 logger.warning("{} - Bad URL? `{}`".format(self.name, self.url))
 
+    @property
+    def logo_path(self):
+        # Computed on access, it is rarely needed
+        if self.xtream is None:
+            return ""
+        return self.xtream._get_logo_local_path(self.logo)
+
     def export_json(self):
         jsondata = {}
 
@@ -129,17 +189,22 @@ class Channel:
 
 
 class Group:
-    # Required by Hypnotix
-    name = ""
-    group_type = ""
-
-    # XTream
-    group_id = ""
-
-    # This contains the raw JSON data
-    raw = ""
+    __slots__ = (
+        # Required by Hypnotix
+        "name",
+        "group_type",
+        "channels",
+        "series",
+        # XTream
+        "group_id",
+        # This contains the raw JSON data
+        "raw",
+    )
 
     def __init__(self, group_info: dict, stream_type: str):
+        self.group_type = ""
+        self.group_id = ""
+
         # Raw JSON Group
         self.raw = group_info
 
@@ -167,17 +232,27 @@ class Group:
 
 
 class Episode:
-    # Required by Hypnotix
-    title = ""
-    name = ""
-    info = ""
-
-    # XTream
-
-    # This contains the raw JSON data
-    raw = ""
+    __slots__ = (
+        # Required by Hypnotix
+        "title",
+        "name",
+        "info",
+        "logo",
+        "url",
+        # XTream
+        "xtream",
+        "group_title",
+        "id",
+        "container_extension",
+        "episode_number",
+        "av_info",
+        # This contains the raw JSON data
+        "raw",
+    )
 
     def __init__(self, xtream: object, series_info, group_title, episode_info) -> None:
+        self.info = ""
+
         # Raw JSON Episode
         self.raw = episode_info
 
@@ -190,7 +265,7 @@ class Episode:
         self.av_info = episode_info["info"]
 
         self.logo = series_info["cover"]
-        self.logo_path = xtream._get_logo_local_path(self.logo)
+        self.xtream = xtream
 
         self.url = "{}/series/{}/{}/{}.{}".format(
             xtream.server,
@@ -204,23 +279,35 @@ class Episode:
         if not xtream._validate_url(self.url):
             logger.warning("{} - Bad URL? `{}`".format(self.name, self.url))
 
+    @property
+    def logo_path(self):
+        # Computed on access, it is rarely needed
+        return self.xtream._get_logo_local_path(self.logo)
 
-class Serie:
-    # Required by Hypnotix
-    name = ""
-    logo = ""
-    logo_path = ""
-
-    # XTream
-    series_id = ""
-    plot = ""
-    youtube_trailer = ""
-    genre = ""
 
-    # This contains the raw JSON data
-    raw = ""
+class Serie:
+    __slots__ = (
+        # Required by Hypnotix
+        "name",
+        "logo",
+        "seasons",
+        "episodes",
+        # XTream
+        "xtream",
+        "series_id",
+        "plot",
+        "youtube_trailer",
+        "genre",
+        # This contains the raw JSON data
+        "raw",
+    )
 
     def __init__(self, xtream: object, series_info):
+        self.series_id = ""
+        self.plot = ""
+        self.youtube_trailer = ""
+        self.genre = ""
+
         # Raw JSON Series
         self.raw = series_info
         self.xtream = xtream
@@ -228,7 +315,6 @@ class Serie:
         # Required by Hypnotix
         self.name = series_info["name"]
         self.logo = series_info["cover"]
-        self.logo_path = xtream._get_logo_local_path(self.logo)
 
         self.seasons = {}
         self.episodes = {}
@@ -249,6 +335,11 @@ class Serie:
         if "genre" in series_info.keys():
             self.genre = series_info["genre"]
 
+    @property
+    def logo_path(self):
+        # Computed on access, it is rarely needed
+        return self.xtream._get_logo_local_path(self.logo)
+
 
 class Season:
     # Required by Hypnotix
@@ -258,9 +349,102 @@ class Season:
         self.name = name
         self.episodes = {}
 
+class StreamTable:
+    """Streams of one type, stored by columns (one list per JSON key)
+
+    Channel and Serie objects are created from rows only when needed.
+    """
+    __slots__ = ("xtream", "stream_type", "columns", "size", "group_titles")
+
+    def __init__(self, xtream: object, stream_type: str, columns: dict, size: int):
+        self.xtream = xtream
+        self.stream_type = stream_type
+        self.columns = columns
+        self.size = size
+        # Group title of every row, set when streams are loaded
+        self.group_titles = [""] * size
+
+    @classmethod
+    def from_json(cls, xtream: object, stream_type: str, all_streams: list):
+        keys = {}
+        for stream in all_streams:
+            for key in stream:
+                keys[key] = None
+        columns = {
+            key: [stream.get(key, MISSING) for stream in all_streams]
+            for key in keys
+        }
+        return cls(xtream, stream_type, columns, len(all_streams))
+
+    def column(self, key: str) -> list:
+        if key in self.columns:
+            return self.columns[key]
+        return [MISSING] * self.size
+
+    def row(self, index: int) -> dict:
+        """Raw JSON of stream"""
+        return {
+            key: column[index]
+            for key, column in self.columns.items()
+            if column[index] is not MISSING
+        }
+
+    def view(self, index: int):
+        if self.stream_type == self.xtream.series_type:
+            return Serie(self.xtream, self.row(index))
+        return Channel(self.xtream, self.group_titles[index], self.row(index))
+
+
+class StreamList:
+    """List of streams in StreamTable, objects are created on access"""
+    __slots__ = ("table", "indices")
+
+    def __init__(self, table: StreamTable, indices: array):
+        self.table = table
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        for index in self.indices:
+            yield self.table.view(index)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self.table.view(index) for index in self.indices[item]]
+        return self.table.view(self.indices[item])
+
+
 class MyStatus(Protocol):
     def __call__(self, string: str, guiOnly: bool) -> None: ...
 
+def get_auth_data(provider_username: str, provider_password: str, provider_url: str, headers: dict = {}, timeout: int = 10) -> dict:
+    """Authenticate without building XTream client
+
+    Used when only account info (like expiration date) is needed
+
+    Args:
+        provider_username (str): User name of the IPTV provider
+        provider_password (str): Password of the IPTV provider
+        provider_url      (str): URL of the IPTV provider
+        headers           (dict, optional): Requests Headers
+        timeout           (int, optional): Request timeout. Defaults to 10.
+
+    Returns:
+        dict: Authentication data, empty dictionary if authentication failed
+    """
+    URL = "%s/player_api.php?username=%s&password=%s" % (provider_url, provider_username, provider_password)
+    try:
+        r = requests_get(URL, timeout=timeout, headers=headers)
+        if r.ok:
+            return r.json()
+        logger.warning("Xtream authentication failed: `{} {}`".format(r.status_code, r.reason))
+    except Exception as e:
+        logger.warning("Xtream authentication failed: e=`{}`".format(e))
+    return {}
+
+
 class XTream:
     live_type = "Live"
     vod_type = "VOD"
@@ -310,9 +494,22 @@ class XTream:
         """
 
         self.state = {"authenticated": False, "loaded": False}
+        self.series_prefetch_pool = None
+        # Serie ID -> prefetch future, while it is queued or running
+        self.series_prefetch_futures = {}
+        # Cancelled futures run done callbacks at once, under the lock
+        self.series_prefetch_lock = threading.RLock()
+        self.loaded_types = set()
+        # Rows of skipped streams, saved once per load
+        self.skipped_streams = []
+        self.skipped_streams_saved = False
+        # stream type -> (categories future, streams future)
+        self.downloads = {}
         self.auth_data = {}
         self.authorization = {}
         self.groups = []
+        # (stream type, group id) -> Group
+        self.groups_by_id = {}
         self.channels = []
         self.series = []
         self.movies = []
@@ -321,6 +518,7 @@ class XTream:
         self.username = provider_username
         self.password = provider_password
         self.name = provider_name
+        self.slug_name = self._slugify(provider_name)
         self.cache_path = cache_path
         self.hide_adult_content = hide_adult_content
         self.update_status = update_status
@@ -340,7 +538,12 @@ class XTream:
             if not osp.isdir(self.cache_path):
                 makedirs(self.cache_path, exist_ok=True)
 
+        self.series_info_path = osp.join(self.cache_path, "series_info")
+        makedirs(self.series_info_path, exist_ok=True)
+
         self.connection_headers = headers
+        # Shared keep-alive session for all requests to provider
+        self.session = requests.Session()
 
         self.authenticate()
 
@@ -397,20 +600,13 @@ class XTream:
         Returns:
             str: Normalized String
         """
+        # Fast path, lowercasing ASCII string as a whole is the same
+        if string.isascii() and string.isprintable():
+            return string.lower()
         return "".join(x.lower() for x in string if x.isprintable())
 
     def _validate_url(self, url: str) -> bool:
-        regex = re.compile(
-            r"^(?:http|ftp)s?://"  # http:// or https://
-            r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|"  # domain...
-            r"localhost|"  # localhost...
-            r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"  # ...or ip
-            r"(?::\d+)?"  # optional port
-            r"(?:/?|[/?]\S+)$",
-            re.IGNORECASE,
-        )
-
-        return re.match(regex, url) is not None
+        return URL_REGEX.match(url) is not None
 
     def _get_logo_local_path(self, logo_url: str) -> str:
         """Convert the Logo URL to a local Logo Path
@@ -427,7 +623,7 @@ class XTream:
                 logo_url = None
             else:
                 local_logo_path = osp.join(self.cache_path, "{}-{}".format(
-                    self._slugify(self.name),
+                    self.slug_name,
                     self._slugify(osp.split(logo_url)[-1])
                 )
                 )
@@ -453,7 +649,7 @@ class XTream:
             #        i += 1
 
             try:
-                r = requests_get(self.get_authenticate_URL(), timeout=(10), headers=self.connection_headers)
+                r = requests_get(self.get_authenticate_URL(), timeout=(10), headers=self.connection_headers, session=self.session)
             except requests.exceptions.ConnectionError:
                 r = None
 
@@ -546,7 +742,111 @@ class XTream:
         else:
             return False
 
-    def load_iptv(self):
+    def _load_or_download(self, filename: str, download):
+        """Load JSON from cache file, or download it and save it to cache
+
+        Runs in download threads
+
+        Returns:
+            tuple: (data or None, download time in seconds)
+        """
+        dt = 0
+        data = self._load_from_file(filename)
+        # If file empty or does not exists, download it from remote
+        if data is None:
+            start = timer()
+            data = download()
+            self._save_to_file(data, filename)
+            dt = timer() - start
+        return data, dt
+
+    def _get_table_filename(self, stream_type: str) -> str:
+        return osp.join(self.cache_path, "{}-all_stream_{}.pickle".format(
+            self.slug_name, stream_type
+        ))
+
+    def _load_table_from_file(self, stream_type: str):
+        """Load streams table from cache, None if it is missing or expired"""
+        full_filename = self._get_table_filename(stream_type)
+        try:
+            if self.threshold_time_sec > time.time() - osp.getmtime(full_filename):
+                with open(full_filename, mode="rb") as myfile:
+                    cache = pickle.load(myfile)
+                if cache["version"] == CATALOG_CACHE_VERSION and cache["size"]:
+                    return StreamTable(self, stream_type, cache["columns"], cache["size"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(" - Could not load from file `{}`: e=`{}`".format(
+                full_filename, e
+            ))
+        return None
+
+    def _save_table_to_file(self, table: StreamTable):
+        full_filename = self._get_table_filename(table.stream_type)
+        try:
+            with open(full_filename + ".tmp", mode="wb") as myfile:
+                pickle.dump(
+                    {"version": CATALOG_CACHE_VERSION, "size": table.size, "columns": table.columns},
+                    myfile,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            replace(full_filename + ".tmp", full_filename)
+        except Exception as e:
+            logger.warning(" - Could not save to file `{}`: e=`{}`".format(
+                full_filename, e
+            ))
+        # JSON cache from older versions
+        try:
+            remove(osp.join(self.cache_path, "{}-all_stream_{}.json".format(
+                self.slug_name, table.stream_type
+            )))
+        except Exception:
+            pass
+
+    def _load_or_download_table(self, stream_type: str):
+        """Load streams table from cache file, or download it and save it to cache
+
+        Runs in download threads
+
+        Returns:
+            tuple: (StreamTable or None, download time in seconds)
+        """
+        dt = 0
+        table = self._load_table_from_file(stream_type)
+        if table is None:
+            start = timer()
+            all_streams = self._load_streams_from_provider(stream_type)
+            if all_streams:
+                table = StreamTable.from_json(self, stream_type, all_streams)
+                self._save_table_to_file(table)
+            dt = timer() - start
+        return table, dt
+
+    def _start_downloads(self):
+        """Start downloading categories and streams of all stream types
+
+        Downloads run in a small thread pool, so large payloads are
+        transferred concurrently. Each stream type maps to
+        (categories future, streams future).
+        """
+        if self.downloads:
+            return
+        download_pool = ThreadPoolExecutor(max_workers=DOWNLOAD_THREADS, thread_name_prefix="xtream")
+        # Live TV first, so it is ready as soon as possible
+        for loading_stream_type in (self.live_type, self.vod_type, self.series_type):
+            self.downloads[loading_stream_type] = (
+                download_pool.submit(
+                    self._load_or_download,
+                    "all_groups_{}.json".format(loading_stream_type),
+                    partial(self._load_categories_from_provider, loading_stream_type),
+                ),
+                download_pool.submit(self._load_or_download_table, loading_stream_type),
+            )
+        # Threads exit when downloads are finished
+        download_pool.shutdown(wait=False)
+
+    def load_iptv(self, stream_types=None):
         """Load XTream IPTV
 
         - Add all Live TV to XTream.channels
@@ -557,202 +857,216 @@ class XTream:
         - Add all groups to XTream.groups
           Groups are for all three channel types, Live TV, VOD, and Series
 
+        Downloads of all stream types are started on first call, so
+        Live TV can be loaded first while VOD and Series are still downloading.
+
+        Args:
+            stream_types (tuple, optional): Stream types to load. Defaults to all of them.
+
         """
+        if stream_types is None:
+            stream_types = (self.live_type, self.vod_type, self.series_type)
         # If pyxtream has already authenticated the connection and not loaded the data, start loading
         if self.state["authenticated"] is True:
-            if self.state["loaded"] is False:
-
-                for loading_stream_type in (self.live_type, self.vod_type, self.series_type):
-                    ## Get GROUPS
-
-                    # Try loading local file
-                    dt = 0
-                    all_cat = self._load_from_file("all_groups_{}.json".format(
-                        loading_stream_type
-                    ))
-                    # If file empty or does not exists, download it from remote
-                    if all_cat is None:
-                        # Load all Groups and save file locally
-                        start = timer()
-                        all_cat = self._load_categories_from_provider(loading_stream_type)
-                        self._save_to_file(all_cat,"all_groups_{}.json".format(
-                            loading_stream_type
-                        ))
-                        dt = timer() - start
-
-                    # If we got the GROUPS data, show the statistics and load GROUPS
-                    if all_cat is not None:
-                        self.update_status(
-                            "{}: Loaded {} {} Groups in {:.3f} seconds".format(
-                                self.name, len(all_cat), loading_stream_type, dt
-                            )
-                        )
+            pending_types = [x for x in stream_types if x not in self.loaded_types]
+            if pending_types:
+                self._start_downloads()
+
+                # Process stream types in the order their data arrives
+                while pending_types:
+                    wait(
+                        [future for x in pending_types for future in self.downloads[x]],
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for loading_stream_type in list(pending_types):
+                        cat_future, streams_future = self.downloads[loading_stream_type]
+                        if cat_future.done() and streams_future.done():
+                            pending_types.remove(loading_stream_type)
+                            self.loaded_types.add(loading_stream_type)
+                            self._load_stream_type(loading_stream_type, cat_future.result(), streams_future.result())
+
+                self.state["loaded"] = len(self.loaded_types) == 3
+
+                self._save_to_file_skipped_streams()
+
+                # Sort Categories
+                self.groups.sort(key=lambda x: x.name)
 
-                        ## Add GROUPS to dictionaries
+            else:
+                logger.warning("Warning, data has already been loaded.")
+        else:
+            logger.warning("Warning, cannot load steams since authorization failed")
 
-                        # Add the catch-all-errors group
-                        self.groups.append(self.catch_all_group)
+    def _load_stream_type(self, loading_stream_type: str, cat_result: tuple, streams_result: tuple):
+        """Add groups and streams of one stream type
 
-                        for cat_obj in all_cat:
-                            # Create Group (Category)
-                            new_group = Group(cat_obj, loading_stream_type)
-                            #  Add to xtream class
-                            self.groups.append(new_group)
+        Args:
+            loading_stream_type (str): Stream type can be Live, VOD, Series
+            cat_result (tuple): Categories JSON and download time
+            streams_result (tuple): Streams JSON and download time
+        """
+        ## Get GROUPS
+        all_cat, dt = cat_result
+
+        # If we got the GROUPS data, show the statistics and load GROUPS
+        if all_cat is not None:
+            self.update_status(
+                "{}: Loaded {} {} Groups in {:.3f} seconds".format(
+                    self.name, len(all_cat), loading_stream_type, dt
+                )
+            )
 
-                        # Add the catch-all-errors group
-                        self.groups.append(Group({"category_id": "9999", "category_name": "xEverythingElse", "parent_id": 0}, loading_stream_type))
+            ## Add GROUPS to dictionaries
 
-                        # Sort Categories
-                        self.groups.sort(key=lambda x: x.name)
-                    else:
-                        logger.warning(" - Could not load {} Groups".format(loading_stream_type))
-                        break
+            for cat_obj in all_cat:
+                # Create Group (Category)
+                new_group = Group(cat_obj, loading_stream_type)
+                #  Add to xtream class
+                self.groups.append(new_group)
+                # Category IDs are only unique within one stream type
+                self.groups_by_id.setdefault((loading_stream_type, new_group.group_id), new_group)
 
-                    ## Get Streams
+            # Add the catch-all-errors group
+            type_catch_all_group = Group({"category_id": "9999", "category_name": "xEverythingElse", "parent_id": 0}, loading_stream_type)
+            self.groups.append(type_catch_all_group)
+            self.groups_by_id.setdefault((loading_stream_type, type_catch_all_group.group_id), type_catch_all_group)
+        else:
+            logger.warning(" - Could not load {} Groups".format(loading_stream_type))
+            return
 
-                    # Try loading local file
-                    dt = 0
-                    all_streams = self._load_from_file("all_stream_{}.json".format(
-                        loading_stream_type
-                    ))
-                    # If file empty or does not exists, download it from remote
-                    if all_streams is None:
-                        # Load all Streams and save file locally
-                        start = timer()
-                        all_streams = self._load_streams_from_provider(loading_stream_type)
-                        self._save_to_file(all_streams,"all_stream_{}.json".format(
-                            loading_stream_type
-                        ))
-                        dt = timer() - start
-
-                    # If we got the STREAMS data, show the statistics and load Streams
-                    if all_streams is not None:
-                        logger.info("{}: Loaded {} {} Streams in {:.3f} seconds".format(
-                            self.name, len(all_streams), loading_stream_type, dt
-                        ))
-                        ## Add Streams to dictionaries
-
-                        skipped_adult_content = 0
-                        skipped_no_name_content = 0
-
-                        numberOfStreams = len(all_streams)
-                        currentStream = 0
-                        # Calculate 1% of total number of streams
-                        # This is used to slow down the progress bar
-                        onePercentNumberOfStreams = numberOfStreams/100
-
-                        # Inform the user
-                        self.update_status("{}: Processing {} {} Streams".format(self.name, numberOfStreams, loading_stream_type), None, True)
-
-                        for stream_channel in all_streams:
-                            skip_stream = False
-                            currentStream += 1
-
-                            # Show download progress every 1% of total number of streams
-                            if (currentStream < onePercentNumberOfStreams):
-                                progress(currentStream,numberOfStreams,"Processing {} Streams".format(loading_stream_type))
-                                onePercentNumberOfStreams *= 2
-
-                            # Skip if the name of the stream is empty
-                            if stream_channel["name"] == "":
-                                skip_stream = True
-                                skipped_no_name_content = skipped_no_name_content + 1
-                                self._save_to_file_skipped_streams(stream_channel)
-
-                            # Skip if the user chose to hide adult streams
-                            if self.hide_adult_content and loading_stream_type == self.live_type:
-                                if "is_adult" in stream_channel:
-                                    if stream_channel["is_adult"] == "1":
-                                        skip_stream = True
-                                        skipped_adult_content = skipped_adult_content + 1
-                                        self._save_to_file_skipped_streams(stream_channel)
-
-                            if not skip_stream:
-                                # Some channels have no group,
-                                # so let's add them to the catch all group
-                                if stream_channel["category_id"] is None:
-                                    stream_channel["category_id"] = "9999"
-                                elif stream_channel["category_id"] != "1":
-                                    pass
-
-                                # Find the first occurence of the group that the
-                                # Channel or Stream is pointing to
-                                the_group = next(
-                                    (x for x in self.groups if x.group_id == int(stream_channel["category_id"])),
-                                    None
-                                )
-
-                                # Set group title
-                                if the_group is not None:
-                                    group_title = the_group.name
-                                else:
-                                    group_title = self.catch_all_group.name
-                                    the_group = self.catch_all_group
-
-                                if loading_stream_type == self.series_type:
-                                    # Load all Series
-                                    new_series = Serie(self, stream_channel)
-                                    # To get all the Episodes for every Season of each
-                                    # Series is very time consuming, we will only
-                                    # populate the Series once the user click on the
-                                    # Series, the Seasons and Episodes will be loaded
-                                    # using x.getSeriesInfoByID() function
-
-                                else:
-                                    new_channel = Channel(
-                                        self, group_title, stream_channel
-                                    )
-
-                                if new_channel.group_id == "9999":
-                                    logger.info(" - xEverythingElse Channel -> {} - {}".format(new_channel.name,new_channel.stream_type))
-
-                                # Save the new channel to the local list of channels
-                                if loading_stream_type == self.live_type:
-                                    self.channels.append(new_channel)
-                                elif loading_stream_type == self.vod_type:
-                                    self.movies.append(new_channel)
-                                else:
-                                    self.series.append(new_series)
-
-                                # Add stream to the specific Group
-                                if the_group is not None:
-                                    if loading_stream_type != self.series_type:
-                                        the_group.channels.append(new_channel)
-                                    else:
-                                        the_group.series.append(new_series)
-                                else:
-                                    logger.warning(" - Group not found `{}`".format(stream_channel["name"]))
-                        logger.info("\n")
-                        # Print information of which streams have been skipped
-                        if self.hide_adult_content:
-                            logger.info(" - Skipped {} adult {} streams".format(skipped_adult_content, loading_stream_type))
-                        if skipped_no_name_content > 0:
-                            logger.info(" - Skipped {} unprintable {} streams".format(skipped_no_name_content, loading_stream_type))
-                    else:
-                        logger.warning(" - Could not load {} Streams".format(loading_stream_type))
-
-                    self.state["loaded"] = True
+        ## Get Streams
+        table, dt = streams_result
 
+        # If we got the STREAMS data, show the statistics and load Streams
+        if table is not None:
+            logger.info("{}: Loaded {} {} Streams in {:.3f} seconds".format(
+                self.name, table.size, loading_stream_type, dt
+            ))
+            ## Add Streams to dictionaries
+
+            skipped_adult_content = 0
+            skipped_no_name_content = 0
+            skipped_indices = []
+
+            numberOfStreams = table.size
+            # Calculate 1% of total number of streams
+            # This is used to slow down the progress bar
+            onePercentNumberOfStreams = max(1, numberOfStreams // 100)
+            nextProgress = 0
+
+            # Inform the user
+            self.update_status("{}: Processing {} {} Streams".format(self.name, numberOfStreams, loading_stream_type), None, True)
+
+            is_live = loading_stream_type == self.live_type
+            is_series = loading_stream_type == self.series_type
+            hide_adult = self.hide_adult_content and is_live
+            names = table.column("name")
+            categories = table.column("category_id")
+            adult_flags = table.column("is_adult")
+            group_titles = table.group_titles
+            # Category IDs of streams are strings, resolve each one once
+            groups_by_category = {}
+            # Rows of loaded streams, all and by group
+            stream_indices = array("L")
+            group_indices = {}
+
+            # Single pass over columns: filter and resolve groups,
+            # Channel and Serie objects are only created when accessed
+            for index in range(numberOfStreams):
+                # Show download progress every 1% of total number of streams
+                if index >= nextProgress:
+                    progress(index + 1, numberOfStreams, "Processing {} Streams".format(loading_stream_type))
+                    nextProgress += onePercentNumberOfStreams
+
+                # Skip if the name of the stream is empty
+                if names[index] == "":
+                    skipped_no_name_content = skipped_no_name_content + 1
+                    skipped_indices.append(index)
+                    continue
+
+                # Skip if the user chose to hide adult streams
+                if hide_adult and adult_flags[index] == "1":
+                    skipped_adult_content = skipped_adult_content + 1
+                    skipped_indices.append(index)
+                    continue
+
+                # Some channels have no group,
+                # so let's add them to the catch all group
+                category_id = categories[index]
+                if category_id is None:
+                    category_id = categories[index] = "9999"
+
+                the_group = groups_by_category.get(category_id)
+                if the_group is None:
+                    try:
+                        the_group = self.groups_by_id.get((loading_stream_type, int(category_id)))
+                    except (TypeError, ValueError):
+                        the_group = None
+                    if the_group is None:
+                        the_group = type_catch_all_group
+                    groups_by_category[category_id] = the_group
+                    # Several categories can map to one group (catch all)
+                    group_indices.setdefault(the_group, array("L"))
+
+                group_titles[index] = the_group.name
+                group_indices[the_group].append(index)
+                stream_indices.append(index)
+            stdout.write("\n")
+
+            # Save the streams to the local list of streams
+            # and to the specific Group
+            if is_live:
+                self.channels = StreamList(table, stream_indices)
+            elif is_series:
+                self.series = StreamList(table, stream_indices)
             else:
-                logger.warning("Warning, data has already been loaded.")
+                self.movies = StreamList(table, stream_indices)
+            for the_group, indices in group_indices.items():
+                if is_series:
+                    the_group.series = StreamList(table, indices)
+                else:
+                    the_group.channels = StreamList(table, indices)
+
+            if type_catch_all_group.channels or type_catch_all_group.series:
+                logger.info(" - {} {} streams without group".format(
+                    len(type_catch_all_group.channels) + len(type_catch_all_group.series),
+                    loading_stream_type
+                ))
+            self.skipped_streams.extend(table.row(index) for index in skipped_indices[:SKIPPED_STREAMS_MAX_LINES])
+            # Print information of which streams have been skipped
+            logger.info(" - Added {} {} streams, skipped {} adult and {} unprintable".format(
+                len(stream_indices), loading_stream_type, skipped_adult_content, skipped_no_name_content
+            ))
         else:
-            logger.warning("Warning, cannot load steams since authorization failed")
+            logger.warning(" - Could not load {} Streams".format(loading_stream_type))
 
-    def _save_to_file_skipped_streams(self, stream_channel: Channel):
+    def _save_to_file_skipped_streams(self):
+        """Write collected skipped streams as JSON lines
+
+        The file is rewritten by the first save of this instance
+        and appended to by later loads, so its size stays bounded
+        """
+        if not self.skipped_streams:
+            return True
 
         # Build the full path
         full_filename = osp.join(self.cache_path, "skipped_streams.json")
 
         # If the path makes sense, save the file
-        json_data = json.dumps(stream_channel, ensure_ascii=False)
+        json_lines = "".join(
+            json.dumps(stream_row, ensure_ascii=False) + "\n" for stream_row in self.skipped_streams
+        )
+        self.skipped_streams = []
         try:
-            with open(full_filename, mode="a", encoding="utf-8") as myfile:
-                myfile.writelines(json_data)
+            with open(full_filename, mode="a" if self.skipped_streams_saved else "w", encoding="utf-8") as myfile:
+                myfile.write(json_lines)
+            self.skipped_streams_saved = True
         except Exception as e:
             logger.warning(" - Could not save to skipped stream file `{}`: e=`{}`".format(
                 full_filename, e
             ))
             return False
+        return True
 
     def get_series_info_by_id(self, get_series: dict):
         """Get Seasons and Episodes for a Series
@@ -761,8 +1075,11 @@ class XTream:
             get_series (dict): Series dictionary
         """
         start = timer()
-        series_seasons = self._load_series_info_by_id_from_provider(get_series.series_id)
+        series_seasons = self._load_series_info(get_series.series_id)
         dt = timer() - start
+        logger.info("{}: Loaded series info {} in {:.3f} seconds".format(
+            self.name, get_series.series_id, dt
+        ))
         if series_seasons["seasons"] == None:
             series_seasons["seasons"] = [{"name": "Season 1", "cover": series_seasons["info"]["cover"]}]
 
@@ -778,9 +1095,123 @@ class XTream:
                         )
                         season.episodes[episode_info["title"]] = new_episode_channel
 
+    def _get_series_info_filename(self, series_id) -> str:
+        return osp.join(self.series_info_path, "{}-{}.json".format(
+            self.slug_name, series_id
+        ))
+
+    def _load_series_info(self, series_id, prefetch: bool = False):
+        """Get series info from cache or from provider
+
+        Args:
+            series_id (str): Serie ID
+            prefetch (bool, optional): Only make sure info is cached. Defaults to False.
+
+        Returns:
+            [type]: JSON if successfull, otherwise None
+        """
+        if not prefetch:
+            self._wait_series_prefetch(series_id)
+        full_filename = self._get_series_info_filename(series_id)
+        try:
+            if SERIES_INFO_TTL > time.time() - osp.getmtime(full_filename):
+                if prefetch:
+                    return None
+                with open(full_filename, mode="r", encoding="utf-8") as myfile:
+                    return json.load(myfile)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(" - Could not load from file `{}`: e=`{}`".format(
+                full_filename, e
+            ))
+        series_info = self._load_series_info_by_id_from_provider(series_id)
+        if series_info:
+            try:
+                # Prefetch thread may write the same file
+                with open(full_filename + ".tmp" + str(threading.get_ident()), mode="wt", encoding="utf-8") as myfile:
+                    myfile.write(json.dumps(series_info, ensure_ascii=False))
+                replace(myfile.name, full_filename)
+            except Exception as e:
+                logger.warning(" - Could not save to file `{}`: e=`{}`".format(
+                    full_filename, e
+                ))
+        return series_info
+
+    def prefetch_series_info(self, series_ids: list):
+        """Fetch series info in background, so it is cached when selected
+
+        Prefetches which have not started yet are cancelled
+
+        Args:
+            series_ids (list): Serie IDs, most important first
+        """
+        if self.series_prefetch_pool is None:
+            self.series_prefetch_pool = ThreadPoolExecutor(
+                max_workers=SERIES_PREFETCH_THREADS, thread_name_prefix="xtream_series"
+            )
+        with self.series_prefetch_lock:
+            # Cancelled futures are removed by _series_prefetch_done
+            for future in list(self.series_prefetch_futures.values()):
+                future.cancel()
+            for series_id in series_ids:
+                if series_id in self.series_prefetch_futures:
+                    continue
+                future = self.series_prefetch_pool.submit(
+                    self._load_series_info, series_id, True
+                )
+                self.series_prefetch_futures[series_id] = future
+                future.add_done_callback(
+                    lambda future, series_id=series_id: self._series_prefetch_done(
+                        series_id, future
+                    )
+                )
+
+    def _series_prefetch_done(self, series_id, future):
+        with self.series_prefetch_lock:
+            if self.series_prefetch_futures.get(series_id) is future:
+                del self.series_prefetch_futures[series_id]
+
+    def _wait_series_prefetch(self, series_id):
+        """Wait for running prefetch of the serie instead of fetching it twice
+
+        Queued prefetch is cancelled, the caller fetches the serie itself
+
+        Args:
+            series_id (str): Serie ID
+        """
+        with self.series_prefetch_lock:
+            future = self.series_prefetch_futures.get(series_id)
+            if future is None or future.cancel():
+                return
+        try:
+            future.result()
+        except Exception:
+            pass
+
+    def _get_retry_after(self, r) -> float:
+        """Parse Retry-After header, seconds or HTTP date
+
+        Returns:
+            float: Delay in seconds, 0 if header is missing or invalid
+        """
+        retry_after = r.headers.get("Retry-After", "")
+        try:
+            if retry_after.isdigit():
+                delay = float(retry_after)
+            else:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+        except Exception:
+            return 0
+        return min(max(delay, 0), REQUEST_RETRY_AFTER_MAX)
+
     def _get_request(self, URL: str, timeout: Tuple = (2, 15)):
         """Generic GET Request with Error handling
 
+        First attempt is sent immediately. Connection errors, timeouts,
+        5xx and 429 responses are retried with jittered exponential backoff,
+        other errors are not.
+
         Args:
             URL (str): The URL where to GET content
             timeout (Tuple, optional): Connection and Downloading Timeout. Defaults to (2,15).
@@ -788,29 +1219,34 @@ class XTream:
         Returns:
             [type]: JSON dictionary of the loaded data, or None
         """
-        i = 0
-        while i < 10:
-            time.sleep(1)
+        for attempt in range(REQUEST_MAX_RETRIES + 1):
+            retry_after = 0
             try:
-                r = requests_get(URL, timeout=timeout, headers=self.connection_headers)
-                i = 20
+                r = requests_get(URL, timeout=timeout, headers=self.connection_headers, session=self.session)
                 if r.status_code == 200:
                     return r.json()
-            except requests.exceptions.ConnectionError:
+                if r.status_code != 429 and r.status_code < 500:
+                    logger.error(" - HTTP Error {}".format(r.status_code))
+                    return None
+                logger.error(" - HTTP Error {}, retrying".format(r.status_code))
+                retry_after = self._get_retry_after(r)
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError):
                 logger.error(" - Connection Error")
-                i += 1
+
+            except requests.exceptions.Timeout:
+                logger.error(" - Timeout while loading data")
 
             except requests.exceptions.HTTPError:
                 logger.error(" - HTTP Error")
-                i += 1
+                return None
 
             except requests.exceptions.TooManyRedirects:
                 logger.error(" - TooManyRedirects")
-                i += 1
+                return None
 
-            except requests.exceptions.ReadTimeout:
-                logger.error(" - Timeout while loading data")
-                i += 1
+            if attempt < REQUEST_MAX_RETRIES:
+                backoff = random.uniform(0, min(REQUEST_BACKOFF_MAX, REQUEST_BACKOFF_BASE * 2 ** attempt))
+                time.sleep(max(backoff, retry_after))
 
         return None
 
@@ -45,7 +45,8 @@ import threading
 import traceback
 import setproctitle
 from pathlib import Path
-from multiprocessing import Manager, active_children, get_context
+from multiprocessing import active_children, get_context
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import partial
 from unidecode import unidecode
 from gi.repository import Gio, GLib
@@ -79,7 +80,11 @@ from yuki_iptv.menubar import (
 )
 from yuki_iptv.catchup import (
     get_catchup_url,
+    get_catchup_schemes,
+    resolve_catchup_url,
+    CATCHUP_UNVERIFIABLE_SCHEMES,
     parse_specifiers_now_url,
+    has_now_placeholders,
     format_url_clean,
     format_catchup_array,
 )
@@ -99,10 +104,30 @@ from yuki_iptv.misc import (
     TVGUIDE_WIDTH,
     UPDATE_BR_INTERVAL,
     WINDOW_SIZE,
+    XTREAM_EXPIRATION_THREADS,
+    XTREAM_EXPIRATION_TTL,
+    XTREAM_SERIES_PREFETCH_COUNT,
+    XTREAM_VOD_LOAD_DELAY,
     YukiData,
 )
-from yuki_iptv.playlist import load_playlist
-from yuki_iptv.channel_logos import channel_logos_worker, get_custom_channel_logo
+from yuki_iptv.playlist import load_playlist, load_xtream_vod
+from yuki_iptv.channel_logos import (
+    start_channel_logos_service,
+    get_custom_channel_logo,
+    update_custom_logos_index,
+)
+from yuki_iptv.logo_cache import LogoDiskCache
+from yuki_iptv.logo_pixmaps import LogoPixmapCache
+from yuki_iptv.ipc import YukiIPCDict, set_ipc_worker_sender
+from yuki_iptv.xtream_epg import XtreamShortEPG
+from yuki_iptv.zap_stats import ZapStats, ZAP_STATS_EVENTS
+from yuki_iptv.stream_resolve import StreamResolveCache
+from yuki_iptv.channel_profiles import (
+    ChannelProfiles,
+    CHANNEL_PROFILE_OPTIONS,
+    CHANNEL_PROFILE_MIN_WATCH,
+    get_learned_cache_secs,
+)
 from yuki_iptv.settings import parse_settings
 from yuki_iptv.qt6compat import _exec
 from yuki_iptv.playlist_editor import PlaylistEditor
@@ -112,7 +137,7 @@ from yuki_iptv.xdg import LOCAL_DIR, SAVE_FOLDER_DEFAULT
 from yuki_iptv.mpv_opengl import MPVOpenGLWidget
 from yuki_iptv.mpris import start_mpris, emit_mpris_change, mpris_seeked
 from yuki_iptv.gui import YukiGUIClass
-from thirdparty.xtream import XTream
+from thirdparty.xtream import XTream, get_auth_data
 
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
@@ -221,11 +246,6 @@ if __name__ == "__main__":
     def exit_handler(*args):
         try:
             logger.info("exit_handler called")
-            try:
-                if multiprocessing_manager:
-                    multiprocessing_manager.shutdown()
-            except Exception:
-                pass
             for process_3 in active_children():
                 try:
                     process_3.kill()
@@ -248,8 +268,6 @@ if __name__ == "__main__":
                         YukiData.epg_thread_2.terminate()
                     except Exception:
                         pass
-            if multiprocessing_manager:
-                multiprocessing_manager.shutdown()
             for process_3 in active_children():
                 try:
                     process_3.kill()
@@ -331,8 +349,7 @@ if __name__ == "__main__":
 
         enable_libmpv_render_context = False  # TODO: for native Wayland
 
-        multiprocessing_manager = Manager()
-        YukiData.mp_manager_dict = multiprocessing_manager.dict()
+        YukiData.ipc_dict = YukiIPCDict()
 
         from thirdparty import mpv
 
@@ -539,6 +556,11 @@ if __name__ == "__main__":
         def btn_update_click(unused=None):
             YukiGUI.btn_update.click()
 
+        def get_epg_url():
+            if YukiData.use_xtream_short_epg:
+                return ""
+            return YukiData.settings["epg"]
+
         @async_gui_blocking_function
         def update_epg_func():
             if YukiData.settings["nocacheepg"]:
@@ -562,7 +584,7 @@ if __name__ == "__main__":
                         load_epg_cache,
                         (
                             YukiData.settings["m3u"],
-                            YukiData.settings["epg"],
+                            get_epg_url(),
                             YukiData.epg_ready,
                         ),
                     )
@@ -722,6 +744,12 @@ if __name__ == "__main__":
         def log_xtream(*args):
             logger.info(" ".join([str(arg2) for arg2 in args]))
 
+        def get_xtream_headers():
+            xtream_headers = {"User-Agent": YukiData.settings["ua"]}
+            if YukiData.settings["referer"]:
+                xtream_headers["Referer"] = YukiData.settings["referer"]
+            return xtream_headers
+
         def load_xtream(m3u_url):
             (
                 _xtream_unused,
@@ -730,9 +758,7 @@ if __name__ == "__main__":
                 xtream_url,
             ) = m3u_url.split("::::::::::::::")
             Path(LOCAL_DIR, "xtream").mkdir(parents=True, exist_ok=True)
-            xtream_headers = {"User-Agent": YukiData.settings["ua"]}
-            if YukiData.settings["referer"]:
-                xtream_headers["Referer"] = YukiData.settings["referer"]
+            xtream_headers = get_xtream_headers()
             try:
                 xt = XTream(
                     log_xtream,
@@ -972,14 +998,27 @@ if __name__ == "__main__":
             epg_win_checkbox_changed()
 
         YukiData.archive_epg = None
+        YukiData.archive_resolve_id = 0
+
+        # Playlist -> channel name -> catchup scheme which answered
+        YukiData.catchup_schemes = {}
+        if os.path.isfile(str(Path(LOCAL_DIR, "catchupschemes.json"))):
+            try:
+                with open(
+                    str(Path(LOCAL_DIR, "catchupschemes.json")), encoding="utf8"
+                ) as catchup_schemes_file:
+                    YukiData.catchup_schemes = json.loads(catchup_schemes_file.read())
+            except Exception:
+                logger.warning("Failed to load catchup schemes")
 
         def do_open_archive(link):
             if "#__archive__" in link:
+                # [channel name, start, end (UNIX timestamps), programme index]
                 archive_json = json.loads(
                     urllib.parse.unquote_plus(link.split("#__archive__")[1])
                 )
-                arr1 = getArrayItem(archive_json[0])
-                arr1 = format_catchup_array(arr1)
+                # Copy, scheme is changed below for this archive only
+                arr1 = format_catchup_array(getArrayItem(archive_json[0]).copy())
 
                 channel_url = getArrayItem(archive_json[0])["url"]
                 start_time = archive_json[1]
@@ -1014,22 +1053,100 @@ if __name__ == "__main__":
                 if YukiData.is_xtream:
                     arr2["catchup"] = "xc"
 
+                YukiData.archive_resolve_id += 1
+                catchup_schemes = get_catchup_schemes(arr2["catchup"])
+                channel_schemes = YukiData.catchup_schemes.get(
+                    YukiData.settings["m3u"], {}
+                )
+                remembered_scheme = channel_schemes.get(archive_json[0])
+                if (
+                    remembered_scheme in catchup_schemes
+                    and remembered_scheme not in CATCHUP_UNVERIFIABLE_SCHEMES
+                ):
+                    # Scheme which worked before for this channel
+                    arr2["catchup"] = remembered_scheme
+                elif len(catchup_schemes) > 1:
+                    showLoading()
+                    resolve_archive_url(
+                        YukiData.archive_resolve_id,
+                        archive_json,
+                        channel_url,
+                        arr2,
+                        catchup_id,
+                    )
+                    return False
+
                 play_url = get_catchup_url(
                     channel_url, arr2, start_time, end_time, catchup_id
                 )
+                open_archive_url(archive_json, play_url)
+                return False
 
-                itemClicked_event(
-                    archive_json[0], play_url, True, is_rewind=(len(archive_json) == 5)
+        @async_gui_blocking_function
+        def resolve_archive_url(
+            archive_resolve_id, archive_json, channel_url, arr2, catchup_id
+        ):
+            try:
+                useragent_ref, referer_ref = get_ua_ref_for_channel(archive_json[0])
+                probe_headers = {"User-Agent": useragent_ref}
+                if referer_ref:
+                    probe_headers["Referer"] = referer_ref
+                catchup_scheme, play_url, scheme_ok = resolve_catchup_url(
+                    channel_url,
+                    arr2,
+                    archive_json[1],
+                    archive_json[2],
+                    catchup_id,
+                    probe_headers,
                 )
-                setChannelText("({}) {}".format(_("Archive"), archive_json[0]), True)
-                YukiGUI.progress.hide()
-                YukiGUI.start_label.setText("")
-                YukiGUI.start_label.hide()
-                YukiGUI.stop_label.setText("")
-                YukiGUI.stop_label.hide()
-                YukiGUI.epg_win.hide()
+            except Exception:
+                logger.warning("Failed to resolve archive URL")
+                logger.warning(traceback.format_exc())
+                catchup_scheme = arr2["catchup"]
+                play_url = get_catchup_url(
+                    channel_url, arr2, archive_json[1], archive_json[2], catchup_id
+                )
+                scheme_ok = False
+            archive_url_resolved(
+                archive_resolve_id, archive_json, catchup_scheme, play_url, scheme_ok
+            )
 
-                return False
+        @idle_function
+        def archive_url_resolved(
+            archive_resolve_id, archive_json, catchup_scheme, play_url, scheme_ok
+        ):
+            # Another channel or archive was opened while probing
+            if archive_resolve_id != YukiData.archive_resolve_id:
+                return
+            if scheme_ok and catchup_scheme not in CATCHUP_UNVERIFIABLE_SCHEMES:
+                if YukiData.settings["m3u"] not in YukiData.catchup_schemes:
+                    YukiData.catchup_schemes[YukiData.settings["m3u"]] = {}
+                YukiData.catchup_schemes[YukiData.settings["m3u"]][
+                    archive_json[0]
+                ] = catchup_scheme
+                save_catchup_schemes()
+            open_archive_url(archive_json, play_url)
+
+        def save_catchup_schemes():
+            try:
+                with open(
+                    Path(LOCAL_DIR, "catchupschemes.json"), "w", encoding="utf8"
+                ) as catchup_schemes_file:
+                    catchup_schemes_file.write(json.dumps(YukiData.catchup_schemes))
+            except Exception:
+                logger.warning("Failed to save catchup schemes")
+
+        def open_archive_url(archive_json, play_url):
+            itemClicked_event(
+                archive_json[0], play_url, True, is_rewind=(len(archive_json) == 5)
+            )
+            setChannelText("({}) {}".format(_("Archive"), archive_json[0]), True)
+            YukiGUI.progress.hide()
+            YukiGUI.start_label.setText("")
+            YukiGUI.start_label.hide()
+            YukiGUI.stop_label.setText("")
+            YukiGUI.stop_label.hide()
+            YukiGUI.epg_win.hide()
 
         class playlists_data:
             pass
@@ -1053,19 +1170,33 @@ if __name__ == "__main__":
             playlist_item_widget.setData(QtCore.Qt.ItemDataRole.UserRole, name3)
             return playlist_item_widget
 
-        def get_xtream_expiration_date(xt2):
+        def get_xtream_expiration_date(auth_data):
             xtream_exp_date = _("Unknown")
             try:
                 xtream_exp_date = datetime.datetime.fromtimestamp(
-                    int(xt2.auth_data["user_info"]["exp_date"])
+                    int(auth_data["user_info"]["exp_date"])
                 ).strftime("%d.%m.%Y %H:%M:%S")
             except Exception:
                 try:
-                    xtream_exp_date = str(xt2.auth_data["user_info"]["exp_date"])
+                    xtream_exp_date = str(auth_data["user_info"]["exp_date"])
                 except Exception:
                     pass
             return xtream_exp_date
 
+        def get_xtream_auth_data(m3u_url):
+            (
+                _xtream_unused,
+                xtream_username,
+                xtream_password,
+                xtream_url,
+            ) = m3u_url.split("::::::::::::::")
+            return get_auth_data(
+                xtream_username,
+                xtream_password,
+                xtream_url,
+                headers=get_xtream_headers(),
+            )
+
         @idle_function
         def show_xtream_playlists_expiration_pt2(unused=None):
             try:
@@ -1091,14 +1222,14 @@ if __name__ == "__main__":
                 logger.warning(traceback.format_exc())
 
         @idle_function
-        def xtream_expiration_show_loading(unused=None):
+        def xtream_expiration_show_loading(playlist_names):
             try:
                 for i10 in range(0, YukiGUI.playlists_list.count()):
-                    i10_name = YukiGUI.playlists_list.item(i10).data(
-                        QtCore.Qt.ItemDataRole.UserRole
-                    )
-                    if playlists_data.playlists_used[i10_name]["m3u"].startswith(
-                        "XTREAM::::::::::::::"
+                    if (
+                        YukiGUI.playlists_list.item(i10).data(
+                            QtCore.Qt.ItemDataRole.UserRole
+                        )
+                        in playlist_names
                     ):
                         YukiGUI.playlists_list.item(i10).setIcon(
                             YukiGUI.loading_icon_small
@@ -1108,14 +1239,14 @@ if __name__ == "__main__":
                 logger.warning(traceback.format_exc())
 
         @idle_function
-        def xtream_expiration_hide_loading(unused=None):
+        def xtream_expiration_hide_loading(playlist_names):
             try:
                 for i10 in range(0, YukiGUI.playlists_list.count()):
-                    i10_name = YukiGUI.playlists_list.item(i10).data(
-                        QtCore.Qt.ItemDataRole.UserRole
-                    )
-                    if playlists_data.playlists_used[i10_name]["m3u"].startswith(
-                        "XTREAM::::::::::::::"
+                    if (
+                        YukiGUI.playlists_list.item(i10).data(
+                            QtCore.Qt.ItemDataRole.UserRole
+                        )
+                        in playlist_names
                     ):
                         YukiGUI.playlists_list.item(i10).setIcon(YukiGUI.tv_icon_small)
             except Exception:
@@ -1124,44 +1255,52 @@ if __name__ == "__main__":
 
         @async_gui_blocking_function
         def show_xtream_playlists_expiration(unused=None):
+            if YukiData.xtream_list_lock:
+                return
+            YukiData.xtream_list_lock = True
             try:
-                if not YukiData.xtream_list_lock:
-                    YukiData.xtream_list_lock = True
-                    xtream_list = set()
-                    for i8 in playlists_data.playlists_used:
-                        if playlists_data.playlists_used[i8]["m3u"].startswith(
-                            "XTREAM::::::::::::::"
+                expiration_list = {}
+                xtream_check = {}
+                for i8 in playlists_data.playlists_used:
+                    i8_m3u = playlists_data.playlists_used[i8]["m3u"]
+                    if i8_m3u.startswith("XTREAM::::::::::::::"):
+                        if i8_m3u in YukiData.xtream_expiration_cache and (
+                            time.time() - YukiData.xtream_expiration_cache[i8_m3u][0]
+                            < XTREAM_EXPIRATION_TTL
                         ):
-                            xtream_list.add(
-                                i8
-                                + ":^:^:^:^:^:^:^:^:^:^:"
-                                + playlists_data.playlists_used[i8]["m3u"]
-                            )
-                    if xtream_list != YukiData.xtream_list_old:
-                        YukiData.xtream_list_old = xtream_list
-                        xtream_expiration_show_loading()
-                        expiration_list = {}
-                        for i9 in xtream_list:
-                            (
-                                xt2,
-                                _xtream_username,
-                                _xtream_password,
-                                _xtream_url,
-                            ) = load_xtream(
-                                playlists_data.playlists_used[
-                                    i9.split(":^:^:^:^:^:^:^:^:^:^:")[0]
-                                ]["m3u"]
-                            )
-                            expiration_list[
-                                i9.split(":^:^:^:^:^:^:^:^:^:^:")[0]
-                            ] = get_xtream_expiration_date(xt2)
-                        YukiData.xtream_expiration_list = expiration_list
-                        xtream_expiration_hide_loading()
-                        show_xtream_playlists_expiration_pt2()
-                    YukiData.xtream_list_lock = False
+                            expiration_list[i8] = YukiData.xtream_expiration_cache[
+                                i8_m3u
+                            ][1]
+                        else:
+                            xtream_check[i8] = i8_m3u
+                if xtream_check:
+                    xtream_expiration_show_loading(set(xtream_check))
+                    with ThreadPoolExecutor(
+                        max_workers=XTREAM_EXPIRATION_THREADS
+                    ) as executor:
+                        futures = {
+                            executor.submit(get_xtream_auth_data, xtream_check[i9]): i9
+                            for i9 in xtream_check
+                        }
+                        for future in as_completed(futures):
+                            i9 = futures[future]
+                            auth_data = future.result()
+                            expiration_list[i9] = get_xtream_expiration_date(auth_data)
+                            # Failed checks are retried next time
+                            if auth_data:
+                                YukiData.xtream_expiration_cache[xtream_check[i9]] = (
+                                    time.time(),
+                                    expiration_list[i9],
+                                )
+                            xtream_expiration_hide_loading({i9})
+                # GUI thread reads the list, so it is replaced only when complete
+                YukiData.xtream_expiration_list = expiration_list
+                show_xtream_playlists_expiration_pt2()
             except Exception:
                 logger.warning("Exception in show_xtream_playlists_expiration")
                 logger.warning(traceback.format_exc())
+            finally:
+                YukiData.xtream_list_lock = False
 
         def playlists_win_save():
             if YukiGUI.m3u_edit_1.text():
@@ -1686,7 +1825,7 @@ if __name__ == "__main__":
                     rate = "audio"
 
                 rates[rate].append(int(bitrate) / 1000.0)
-                rates[rate] = rates[rate][-30:]
+                del rates[rate][:-30]
                 br = sum(rates[rate]) / float(len(rates[rate]))
 
                 if rate == "video":
@@ -1806,6 +1945,137 @@ if __name__ == "__main__":
 
         YukiData.event_handler = None
 
+        YukiData.zap_stats = ZapStats(
+            str(Path(LOCAL_DIR, "zapstats.json")),
+            str(Path(LOCAL_DIR, "zaplatency.csv")),
+            YukiData.settings["m3u"],
+        )
+
+        def zap_stats_mark(phase, event):
+            if YukiData.zap_stats.mark(phase):
+                stream_resolve_start()
+
+        YukiData.stream_resolve_cache = None
+        # doPlay arguments with original URL, while resolved URL is playing
+        YukiData.stream_resolve_fallback = None
+        # Resolve request for the playing channel, sent once playback started
+        YukiData.stream_resolve_pending = None
+        # Incremented on every play and stop, outdated validations are dropped
+        YukiData.stream_resolve_play_id = 0
+        if YukiData.settings["streamresolve"]:
+            YukiData.stream_resolve_cache = StreamResolveCache()
+
+        YukiData.channel_profiles = ChannelProfiles(
+            str(Path(LOCAL_DIR, "channelprofiles.json")), YukiData.settings["m3u"]
+        )
+        # Global cache options, restored for channels without profile
+        YukiData.channel_profile_defaults = {}
+
+        def set_channel_profile_options(options):
+            for option, default_value in YukiData.channel_profile_defaults.items():
+                try:
+                    YukiData.player[option] = options.get(option, default_value)
+                except Exception:
+                    logger.warning(f"Failed to set {option}")
+
+        def apply_channel_profile(channel_name_0):
+            options = {}
+            if (
+                channel_name_0
+                and YukiData.playing_group == 0
+                and not YukiData.playing_archive
+            ):
+                options = YukiData.channel_profiles.get_options(channel_name_0)
+                YukiData.channel_profiles.start_session(channel_name_0)
+            set_channel_profile_options(options)
+            if options:
+                logger.info(f"Using channel cache profile: {options}")
+
+        def end_channel_profile_session():
+            YukiData.channel_profiles.end_session()
+
+        def channel_profile_stall(unused, paused_for_cache):
+            YukiData.channel_profiles.stall(bool(paused_for_cache))
+
+        def channel_profile_bitrate(prop, bitrate):
+            # Sampled for the whole session, stream information only keeps
+            # the last samples and stops when its window is closed
+            if bitrate:
+                YukiData.channel_profiles.add_bitrate(
+                    prop.split("-")[0], int(bitrate) / 1000.0
+                )
+
+        def get_resolved_stream_url(play_url1, channel_name_0):
+            if (
+                not YukiData.stream_resolve_cache
+                or not channel_name_0
+                or YukiData.playing_archive
+                or YukiData.playing_group != 0
+                or YukiData.settings["uuid"]
+                or not play_url1.startswith(("http://", "https://"))
+                # URLs with current time placeholders must not be frozen
+                or has_now_placeholders(play_url1)
+            ):
+                return play_url1
+            resolved_url = YukiData.stream_resolve_cache.get(channel_name_0, play_url1)
+            if resolved_url:
+                return resolved_url
+            YukiData.stream_resolve_pending = (
+                channel_name_0,
+                play_url1,
+                get_stream_resolve_headers(channel_name_0),
+            )
+            return play_url1
+
+        def get_stream_resolve_headers(channel_name_0):
+            useragent_ref, referer_ref = get_ua_ref_for_channel(channel_name_0)
+            headers = {"User-Agent": useragent_ref}
+            if referer_ref:
+                headers["Referer"] = referer_ref
+            return headers
+
+        @async_gui_blocking_function
+        def validate_resolved_stream_url(
+            play_id, resolved_url, play_url1, ua_ch, channel_name_0
+        ):
+            if not YukiData.stream_resolve_cache.validate(
+                channel_name_0, resolved_url, get_stream_resolve_headers(channel_name_0)
+            ):
+                resolved_url = play_url1
+            validate_resolved_stream_url_pt2(
+                play_id, resolved_url, play_url1, ua_ch, channel_name_0
+            )
+
+        @idle_function
+        def validate_resolved_stream_url_pt2(
+            play_id, resolved_url, play_url1, ua_ch, channel_name_0
+        ):
+            # Other channel was selected or playback stopped meanwhile
+            if play_id != YukiData.stream_resolve_play_id:
+                return
+            if resolved_url != play_url1:
+                logger.info("Using cached resolved stream URL")
+                YukiData.stream_resolve_fallback = (play_url1, ua_ch, channel_name_0)
+            else:
+                logger.info("Using original stream URL")
+            start_play(resolved_url, channel_name_0)
+
+        def start_play(play_url1, channel_name_0):
+            mpv_override_play(play_url1, channel_name_0)
+            # Set channel (video) settings
+            setPlayerSettings(channel_name_0)
+            # Monitor playback (for stream information)
+            monitor_playback()
+
+        def stream_resolve_start():
+            # Called from mpv event thread. Resolving while mpv opens the stream
+            # would take a second provider connection at the worst moment,
+            # after playback started only a short extra request is made
+            stream_resolve_pending = YukiData.stream_resolve_pending
+            YukiData.stream_resolve_pending = None
+            if stream_resolve_pending:
+                YukiData.stream_resolve_cache.request(*stream_resolve_pending)
+
         def on_before_play():
             YukiGUI.streaminfo_win.hide()
             stream_info.video_properties.clear()
@@ -1992,11 +2262,24 @@ if __name__ == "__main__":
                 pass
             YukiData.player.loop = False
             # Playing
-            mpv_override_play(play_url1, channel_name_0)
-            # Set channel (video) settings
-            setPlayerSettings(channel_name_0)
-            # Monitor playback (for stream information)
-            monitor_playback()
+            YukiData.zap_stats.start(channel_name_0, format_url_clean(play_url1))
+            YukiData.stream_resolve_fallback = None
+            YukiData.stream_resolve_pending = None
+            YukiData.stream_resolve_play_id += 1
+            end_channel_profile_session()
+            apply_channel_profile(channel_name_0)
+            resolved_url = get_resolved_stream_url(play_url1, channel_name_0)
+            if resolved_url != play_url1:
+                # Expired token or moved CDN edge would cost a failed open
+                validate_resolved_stream_url(
+                    YukiData.stream_resolve_play_id,
+                    resolved_url,
+                    play_url1,
+                    ua_ch,
+                    channel_name_0,
+                )
+            else:
+                start_play(play_url1, channel_name_0)
 
         def channel_settings_save():
             channel_3 = YukiGUI.title.text()
@@ -2023,7 +2306,15 @@ if __name__ == "__main__":
                 ),
             }
             save_channel_sets()
+            YukiData.channel_profiles.set_cache_secs(
+                channel_3, YukiGUI.channelcache_choose.value()
+            )
+            YukiData.channel_profiles.save()
             if YukiData.playing_channel == channel_3:
+                if YukiData.playing_group == 0 and not YukiData.playing_archive:
+                    set_channel_profile_options(
+                        YukiData.channel_profiles.get_options(channel_3)
+                    )
                 YukiData.player.deinterlace = YukiGUI.deinterlace_chk.isChecked()
                 YukiData.player.contrast = YukiGUI.contrast_choose.value()
                 YukiData.player.brightness = YukiGUI.brightness_choose.value()
@@ -2080,6 +2371,9 @@ if __name__ == "__main__":
             YukiData.do_save_settings = True
             app.quit()
 
+        def get_logo_cache_size():
+            return YukiData.settings["logocachesize"] * 1024 * 1024
+
         def reset_channel_settings():
             if os.path.isfile(str(Path(LOCAL_DIR, "channelsettings.json"))):
                 os.remove(str(Path(LOCAL_DIR, "channelsettings.json")))
@@ -2087,16 +2381,19 @@ if __name__ == "__main__":
                 os.remove(str(Path(LOCAL_DIR, "favouritechannels.json")))
             if os.path.isfile(str(Path(LOCAL_DIR, "sortchannels.json"))):
                 os.remove(str(Path(LOCAL_DIR, "sortchannels.json")))
+            if os.path.isfile(str(Path(LOCAL_DIR, "catchupschemes.json"))):
+                os.remove(str(Path(LOCAL_DIR, "catchupschemes.json")))
             save_settings()
 
         def do_clear_logo_cache():
-            logger.info("Clearing channel logos cache...")
-            if os.path.isdir(Path(LOCAL_DIR, "logo_cache")):
-                channel_logos = os.listdir(Path(LOCAL_DIR, "logo_cache"))
-                for channel_logo in channel_logos:
-                    if os.path.isfile(Path(LOCAL_DIR, "logo_cache", channel_logo)):
-                        os.remove(Path(LOCAL_DIR, "logo_cache", channel_logo))
-            logger.info("Channel logos cache cleared!")
+            # Logos service owns the cache index while it is running
+            if (
+                YukiData.logos_service_process
+                and YukiData.logos_service_process.is_alive()
+            ):
+                YukiData.logos_service_conn.send(("trim",))
+            else:
+                LogoDiskCache(get_logo_cache_size()).trim()
 
         def close_settings():
             YukiGUI.settings_win.hide()
@@ -2165,7 +2462,11 @@ if __name__ == "__main__":
             YukiData.settings["showcontrolsmouse"]
         )
         YukiGUI.channellogos_select.setCurrentIndex(YukiData.settings["channellogos"])
+        YukiGUI.logocachesize_choose.setValue(YukiData.settings["logocachesize"])
+        YukiGUI.logomemorycache_choose.setValue(YukiData.settings["logomemorycache"])
         YukiGUI.nocacheepg_flag.setChecked(YukiData.settings["nocacheepg"])
+        YukiGUI.xtreamshortepg_flag.setChecked(YukiData.settings["xtreamshortepg"])
+        YukiGUI.streamresolve_flag.setChecked(YukiData.settings["streamresolve"])
         YukiGUI.scrrecnosubfolders_flag.setChecked(
             YukiData.settings["scrrecnosubfolders"]
         )
@@ -2570,6 +2871,11 @@ if __name__ == "__main__":
                     pass
             else:
                 logger.info("Using default cache settings")
+            for option in CHANNEL_PROFILE_OPTIONS:
+                try:
+                    YukiData.channel_profile_defaults[option] = YukiData.player[option]
+                except Exception:
+                    logger.warning(f"Failed to get {option}")
             YukiData.player.user_agent = def_user_agent
             if YukiData.settings["referer"]:
                 YukiData.player.http_header_fields = (
@@ -2633,9 +2939,15 @@ if __name__ == "__main__":
             def file_loaded_2(event):
                 file_loaded_callback()
 
+            for zap_stats_event, zap_stats_phase in ZAP_STATS_EVENTS.items():
+                YukiData.player.event_callback(zap_stats_event)(
+                    partial(zap_stats_mark, zap_stats_phase)
+                )
+
             @YukiData.player.event_callback("end_file")
             def ready_handler_2(event):
                 if event["event"]["error"] != 0:
+                    YukiData.zap_stats.fail()
                     end_file_error_callback()
                 else:
                     end_file_callback()
@@ -2696,6 +3008,9 @@ if __name__ == "__main__":
                     pass
 
             YukiData.player.observe_property("pause", pause_handler)
+            YukiData.player.observe_property("paused-for-cache", channel_profile_stall)
+            YukiData.player.observe_property("video-bitrate", channel_profile_bitrate)
+            YukiData.player.observe_property("audio-bitrate", channel_profile_bitrate)
 
             def yuki_track_set(track, type1):
                 logger.info(f"Set {type1} track to {track}")
@@ -3302,6 +3617,7 @@ if __name__ == "__main__":
                 YukiData.playing_archive = archived
                 if not archived:
                     YukiData.archive_epg = None
+                    YukiData.archive_resolve_id += 1
                     YukiGUI.rewind_slider.setValue(100)
                     YukiData.rewind_value = YukiGUI.rewind_slider.value()
                 else:
@@ -3334,15 +3650,17 @@ if __name__ == "__main__":
                     jlower = YukiData.prog_match_arr[jlower]
                 except Exception:
                     pass
-                if YukiData.settings["epg"] and exists_in_epg(
-                    jlower, YukiData.programmes
-                ):
+                if (
+                    YukiData.settings["epg"] or YukiData.xtream_short_epg
+                ) and exists_in_epg(jlower, YukiData.programmes):
                     for pr in get_epg(YukiData.programmes, jlower):
                         if time.time() > pr["start"] and time.time() < pr["stop"]:
                             current_prog = pr
                             break
                 YukiData.current_prog1 = current_prog
                 show_progress(current_prog)
+                if YukiData.xtream_short_epg and not current_prog and not archived:
+                    request_xtream_short_epg([j], cancel_previous=False)
                 if YukiGUI.start_label.isVisible():
                     dockWidget_controlPanel.setFixedHeight(
                         DOCKWIDGET_CONTROLPANEL_HEIGHT_HIGH
@@ -3383,6 +3701,11 @@ if __name__ == "__main__":
         def mpv_stop():
             YukiData.playing_channel = ""
             YukiData.playing_group = -1
+            YukiData.zap_stats.cancel()
+            YukiData.stream_resolve_fallback = None
+            YukiData.stream_resolve_pending = None
+            YukiData.stream_resolve_play_id += 1
+            end_channel_profile_session()
             YukiData.playing_url = ""
             setUrlText()
             hideLoading()
@@ -3754,27 +4077,34 @@ if __name__ == "__main__":
         YukiData.prog_match_arr = {}
 
         YukiData.channel_logos_request_old = {}
-        YukiData.channel_logos_process = None
-        YukiData.mp_manager_dict["logos_inprogress"] = False
-        YukiData.mp_manager_dict["logos_completed"] = False
-        YukiData.mp_manager_dict["logosmovie_inprogress"] = False
-        YukiData.mp_manager_dict["logosmovie_completed"] = False
-        logos_cache = {}
+        YukiData.logos_service_process = None
+        YukiData.ipc_dict["logos_inprogress"] = False
+        YukiData.ipc_dict["logos_completed"] = False
+        YukiData.ipc_dict["logosmovie_inprogress"] = False
+        YukiData.ipc_dict["logosmovie_completed"] = False
+        YukiData.ipc_dict["logosseries_completed"] = False
+        logos_cache = LogoPixmapCache(
+            YukiData.settings["logomemorycache"] * 1024 * 1024
+        )
+
+        def request_logos(logos_request, logos_prefetch, append=""):
+            if not (
+                YukiData.logos_service_process
+                and YukiData.logos_service_process.is_alive()
+            ):
+                (
+                    YukiData.logos_service_process,
+                    YukiData.logos_service_conn,
+                ) = start_channel_logos_service(
+                    loglevel, YukiData.ipc_dict.sender, get_logo_cache_size()
+                )
+            # Page changes only re-prioritize the queue in logos service
+            YukiData.logos_service_conn.send(
+                ("request", append, logos_request, logos_prefetch)
+            )
 
         def get_pixmap_from_filename(pixmap_filename):
-            if pixmap_filename in logos_cache:
-                return logos_cache[pixmap_filename]
-            else:
-                try:
-                    if os.path.isfile(pixmap_filename):
-                        icon_pixmap = QtGui.QIcon(pixmap_filename)
-                        logos_cache[pixmap_filename] = icon_pixmap
-                        icon_pixmap = None
-                        return logos_cache[pixmap_filename]
-                    else:
-                        return None
-                except Exception:
-                    return None
+            return logos_cache.get(pixmap_filename)
 
         YukiData.timer_logos_update_lock = False
 
@@ -3782,19 +4112,20 @@ if __name__ == "__main__":
             try:
                 if not YukiData.timer_logos_update_lock:
                     YukiData.timer_logos_update_lock = True
-                    if YukiData.mp_manager_dict["logos_completed"]:
-                        YukiData.mp_manager_dict["logos_completed"] = False
+                    if YukiData.ipc_dict["logos_completed"]:
+                        YukiData.ipc_dict["logos_completed"] = False
                         btn_update_click()
-                    if YukiData.mp_manager_dict["logosmovie_completed"]:
-                        YukiData.mp_manager_dict["logosmovie_completed"] = False
+                    if YukiData.ipc_dict["logosmovie_completed"]:
+                        YukiData.ipc_dict["logosmovie_completed"] = False
                         update_movie_icons()
+                    if YukiData.ipc_dict["logosseries_completed"]:
+                        YukiData.ipc_dict["logosseries_completed"] = False
+                        update_series_icons()
                     YukiData.timer_logos_update_lock = False
             except Exception:
                 pass
 
-        custom_logos_enabled = os.path.isdir(Path(LOCAL_DIR, "logos")) or os.path.isdir(
-            Path("..", "..", "share", "yuki-iptv", "channel_logos")
-        )
+        update_custom_logos_index()
 
         all_channels_lang = _("All channels")
         favourites_lang = _("Favourites")
@@ -3802,6 +4133,97 @@ if __name__ == "__main__":
         def get_page_count(array_len):
             return max(1, math.ceil(array_len / 100))
 
+        def get_prog_search(i):
+            is_epgname_found = False
+
+            # First, match EPG name from settings
+            if (
+                YukiData.settings["m3u"] in YukiData.channel_sets
+                and i in YukiData.channel_sets[YukiData.settings["m3u"]]
+            ):
+                if "epgname" in YukiData.channel_sets[YukiData.settings["m3u"]][i]:
+                    if YukiData.channel_sets[YukiData.settings["m3u"]][i]["epgname"]:
+                        epg_name = YukiData.channel_sets[YukiData.settings["m3u"]][i][
+                            "epgname"
+                        ]
+                        if exists_in_epg(str(epg_name).lower(), YukiData.programmes):
+                            prog_search = str(epg_name).lower()
+                            is_epgname_found = True
+
+            # Second, match from tvg-id
+            if not is_epgname_found:
+                if YukiData.array[i]["tvg-ID"]:
+                    if str(YukiData.array[i]["tvg-ID"]) in YukiData.prog_ids:
+                        prog_search_lst = YukiData.prog_ids[
+                            str(YukiData.array[i]["tvg-ID"])
+                        ]
+                        if prog_search_lst:
+                            prog_search = prog_search_lst[0].lower()
+                            is_epgname_found = True
+
+            # Third, match from tvg-name
+            if not is_epgname_found:
+                if YukiData.array[i]["tvg-name"]:
+                    if exists_in_epg(
+                        str(YukiData.array[i]["tvg-name"]).lower(),
+                        YukiData.programmes,
+                    ):
+                        prog_search = str(YukiData.array[i]["tvg-name"]).lower()
+                        is_epgname_found = True
+                    else:
+                        spaces_replaced_name = YukiData.array[i]["tvg-name"].replace(
+                            " ", "_"
+                        )
+                        if exists_in_epg(
+                            str(spaces_replaced_name).lower(), YukiData.programmes
+                        ):
+                            prog_search = str(spaces_replaced_name).lower()
+                            is_epgname_found = True
+
+            # Last, match from channel name
+            if not is_epgname_found:
+                prog_search = i.lower()
+                is_epgname_found = True
+
+            return prog_search
+
+        def add_channel_logos_request(channel_logos_request, i, prog_search):
+            try:
+                channel_logo1 = ""
+                if "tvg-logo" in YukiData.array[i]:
+                    channel_logo1 = YukiData.array[i]["tvg-logo"]
+
+                if not channel_logo1:
+                    custom_channel_logo = get_custom_channel_logo(i)
+                    if custom_channel_logo:
+                        channel_logo1 = custom_channel_logo
+                        YukiData.array[i]["tvg-logo"] = custom_channel_logo
+
+                epg_logo1 = ""
+                if prog_search in YukiData.epg_icons:
+                    epg_logo1 = YukiData.epg_icons[prog_search]
+
+                req_data_ua, req_data_ref = get_ua_ref_for_channel(i)
+                channel_logos_request[YukiData.array[i]["title"]] = [
+                    channel_logo1,
+                    epg_logo1,
+                    req_data_ua,
+                    req_data_ref,
+                ]
+            except Exception:
+                logger.warning(f"Exception in channel logos (channel '{i}')")
+                logger.warning(traceback.format_exc())
+
+        def request_xtream_short_epg(channel_names, cancel_previous=True):
+            streams = {}
+            for channel_name in channel_names:
+                if channel_name in YukiData.xtream_stream_ids:
+                    epg_name = YukiData.prog_match_arr.get(
+                        channel_name.lower(), channel_name.lower()
+                    )
+                    streams[epg_name] = YukiData.xtream_stream_ids[channel_name]
+            YukiData.xtream_short_epg.request(streams, cancel_previous)
+
         def generate_channels():
             channel_logos_request = {}
 
@@ -3827,13 +4249,15 @@ if __name__ == "__main__":
                             continue
                 array_filtered.append(j1)
 
-            ch_array = [
+            ch_array_all = [
                 x13
                 for x13 in array_filtered
                 if unidecode(filter_txt).lower().strip()
                 in unidecode(x13).lower().strip()
             ]
-            ch_array = ch_array[idx : idx + 100]
+            ch_array = ch_array_all[idx : idx + 100]
+            if YukiData.xtream_short_epg:
+                request_xtream_short_epg(ch_array)
             try:
                 if filter_txt:
                     YukiGUI.page_box.setMaximum(get_page_count(len(ch_array)))
@@ -3853,61 +4277,7 @@ if __name__ == "__main__":
                 k += 1
                 prog = ""
                 prog_desc = ""
-                is_epgname_found = False
-
-                # First, match EPG name from settings
-                if (
-                    YukiData.settings["m3u"] in YukiData.channel_sets
-                    and i in YukiData.channel_sets[YukiData.settings["m3u"]]
-                ):
-                    if "epgname" in YukiData.channel_sets[YukiData.settings["m3u"]][i]:
-                        if YukiData.channel_sets[YukiData.settings["m3u"]][i][
-                            "epgname"
-                        ]:
-                            epg_name = YukiData.channel_sets[YukiData.settings["m3u"]][
-                                i
-                            ]["epgname"]
-                            if exists_in_epg(
-                                str(epg_name).lower(), YukiData.programmes
-                            ):
-                                prog_search = str(epg_name).lower()
-                                is_epgname_found = True
-
-                # Second, match from tvg-id
-                if not is_epgname_found:
-                    if YukiData.array[i]["tvg-ID"]:
-                        if str(YukiData.array[i]["tvg-ID"]) in YukiData.prog_ids:
-                            prog_search_lst = YukiData.prog_ids[
-                                str(YukiData.array[i]["tvg-ID"])
-                            ]
-                            if prog_search_lst:
-                                prog_search = prog_search_lst[0].lower()
-                                is_epgname_found = True
-
-                # Third, match from tvg-name
-                if not is_epgname_found:
-                    if YukiData.array[i]["tvg-name"]:
-                        if exists_in_epg(
-                            str(YukiData.array[i]["tvg-name"]).lower(),
-                            YukiData.programmes,
-                        ):
-                            prog_search = str(YukiData.array[i]["tvg-name"]).lower()
-                            is_epgname_found = True
-                        else:
-                            spaces_replaced_name = YukiData.array[i][
-                                "tvg-name"
-                            ].replace(" ", "_")
-                            if exists_in_epg(
-                                str(spaces_replaced_name).lower(), YukiData.programmes
-                            ):
-                                prog_search = str(spaces_replaced_name).lower()
-                                is_epgname_found = True
-
-                # Last, match from channel name
-                if not is_epgname_found:
-                    prog_search = i.lower()
-                    is_epgname_found = True
-
+                prog_search = get_prog_search(i)
                 YukiData.prog_match_arr[i.lower()] = prog_search
                 if exists_in_epg(prog_search, YukiData.programmes):
                     current_prog = {"start": 0, "stop": 0, "title": "", "desc": ""}
@@ -3957,38 +4327,7 @@ if __name__ == "__main__":
                 original_channel_name = channel_name
 
                 if YukiData.settings["channellogos"] != 3:
-                    try:
-                        channel_logo1 = ""
-                        if "tvg-logo" in YukiData.array[i]:
-                            channel_logo1 = YukiData.array[i]["tvg-logo"]
-
-                        if (
-                            custom_logos_enabled
-                            and not channel_logo1
-                            and "channel-logo-file-checked" not in YukiData.array[i]
-                        ):
-                            YukiData.array[i]["channel-logo-file-checked"] = True
-                            custom_channel_logo = get_custom_channel_logo(i)
-                            if custom_channel_logo:
-                                channel_logo1 = custom_channel_logo
-                                YukiData.array[i]["tvg-logo"] = custom_channel_logo
-
-                        epg_logo1 = ""
-                        if prog_search in YukiData.epg_icons:
-                            epg_logo1 = YukiData.epg_icons[prog_search]
-
-                        req_data_ua, req_data_ref = get_ua_ref_for_channel(
-                            original_channel_name
-                        )
-                        channel_logos_request[YukiData.array[i]["title"]] = [
-                            channel_logo1,
-                            epg_logo1,
-                            req_data_ua,
-                            req_data_ref,
-                        ]
-                    except Exception:
-                        logger.warning(f"Exception in channel logos (channel '{i}')")
-                        logger.warning(traceback.format_exc())
+                    add_channel_logos_request(channel_logos_request, i, prog_search)
 
                 if len(channel_name) > CHANNEL_TITLE_MAX_SIZE:
                     channel_name = channel_name[0:CHANNEL_TITLE_MAX_SIZE] + "..."
@@ -4042,62 +4381,46 @@ if __name__ == "__main__":
 
                 if YukiData.settings["channellogos"] != 3:  # Do not load any logos
                     try:
-                        if (
+                        channel_logo_files = YukiData.ipc_dict.get(
                             f"LOGO:::{original_channel_name}"
-                            in YukiData.mp_manager_dict
-                        ):
+                        )
+                        if channel_logo_files:
                             if YukiData.settings["channellogos"] == 0:  # Prefer M3U
                                 first_loaded = False
-                                if YukiData.mp_manager_dict[
-                                    f"LOGO:::{original_channel_name}"
-                                ][0]:
+                                if channel_logo_files[0]:
                                     channel_logo = get_pixmap_from_filename(
-                                        YukiData.mp_manager_dict[
-                                            f"LOGO:::{original_channel_name}"
-                                        ][0]
+                                        channel_logo_files[0]
                                     )
                                     if channel_logo:
                                         first_loaded = True
                                         MyPlaylistWidget.setIcon(channel_logo)
                                 if not first_loaded:
                                     channel_logo = get_pixmap_from_filename(
-                                        YukiData.mp_manager_dict[
-                                            f"LOGO:::{original_channel_name}"
-                                        ][1]
+                                        channel_logo_files[1]
                                     )
                                     if channel_logo:
                                         MyPlaylistWidget.setIcon(channel_logo)
                             elif YukiData.settings["channellogos"] == 1:  # Prefer EPG
                                 first_loaded = False
-                                if YukiData.mp_manager_dict[
-                                    f"LOGO:::{original_channel_name}"
-                                ][1]:
+                                if channel_logo_files[1]:
                                     channel_logo = get_pixmap_from_filename(
-                                        YukiData.mp_manager_dict[
-                                            f"LOGO:::{original_channel_name}"
-                                        ][1]
+                                        channel_logo_files[1]
                                     )
                                     if channel_logo:
                                         first_loaded = True
                                         MyPlaylistWidget.setIcon(channel_logo)
                                 if not first_loaded:
                                     channel_logo = get_pixmap_from_filename(
-                                        YukiData.mp_manager_dict[
-                                            f"LOGO:::{original_channel_name}"
-                                        ][0]
+                                        channel_logo_files[0]
                                     )
                                     if channel_logo:
                                         MyPlaylistWidget.setIcon(channel_logo)
                             elif (
                                 YukiData.settings["channellogos"] == 2
                             ):  # Do not load from EPG (only M3U)
-                                if YukiData.mp_manager_dict[
-                                    f"LOGO:::{original_channel_name}"
-                                ][0]:
+                                if channel_logo_files[0]:
                                     channel_logo = get_pixmap_from_filename(
-                                        YukiData.mp_manager_dict[
-                                            f"LOGO:::{original_channel_name}"
-                                        ][0]
+                                        channel_logo_files[0]
                                     )
                                     if channel_logo:
                                         MyPlaylistWidget.setIcon(channel_logo)
@@ -4134,29 +4457,22 @@ if __name__ == "__main__":
                     if channel_logos_request != YukiData.channel_logos_request_old:
                         YukiData.channel_logos_request_old = channel_logos_request
                         logger.debug("Channel logos request")
-                        if (
-                            YukiData.channel_logos_process
-                            and YukiData.channel_logos_process.is_alive()
+                        # Prefetch next and previous pages
+                        channel_logos_prefetch = {}
+                        for i in (
+                            ch_array_all[idx + 100 : idx + 200]
+                            + ch_array_all[max(0, idx - 100) : idx]
                         ):
-                            # logger.debug(
-                            #     "Old channel logos request found, stopping it"
-                            # )
-                            YukiData.channel_logos_process.kill()
-                        YukiData.channel_logos_process = get_context("spawn").Process(
-                            name="[yuki-iptv] channel_logos_worker",
-                            target=channel_logos_worker,
-                            daemon=True,
-                            args=(
-                                loglevel,
-                                channel_logos_request,
-                                YukiData.mp_manager_dict,
-                            ),
-                        )
-                        YukiData.channel_logos_process.start()
+                            add_channel_logos_request(
+                                channel_logos_prefetch, i, get_prog_search(i)
+                            )
+                        request_logos(channel_logos_request, channel_logos_prefetch)
             except Exception:
                 logger.warning("Fetch channel logos failed with exception:")
                 logger.warning(traceback.format_exc())
 
+            logos_cache.log_stats()
+
             return res
 
         YukiData.row0 = -1
@@ -4189,6 +4505,26 @@ if __name__ == "__main__":
 
         YukiGUI.btn_update.clicked.connect(redraw_channels)
 
+        @idle_function
+        def xtream_short_epg_loaded(results):
+            for epg_name in results:
+                if results[epg_name]:
+                    YukiData.programmes[epg_name] = results[epg_name]
+            if YukiData.playing_channel and not YukiData.playing_archive:
+                playing_epg_name = YukiData.prog_match_arr.get(
+                    YukiData.playing_channel.lower(), YukiData.playing_channel.lower()
+                )
+                if playing_epg_name in results:
+                    for pr in results[playing_epg_name]:
+                        if time.time() > pr["start"] and time.time() < pr["stop"]:
+                            YukiData.current_prog1 = pr
+                            show_progress(pr)
+                            break
+            redraw_channels()
+
+        if YukiData.xtream_stream_ids:
+            YukiData.xtream_short_epg = XtreamShortEPG(xt, xtream_short_epg_loaded)
+
         YukiData.first_playmode_change = False
 
         def playmode_change(self=False):
@@ -4218,6 +4554,8 @@ if __name__ == "__main__":
                         YukiGUI.channelfilter.setPlaceholderText(_("Search channel"))
                     except Exception:
                         pass
+                if playmode_selector.currentIndex() in (1, 2):
+                    start_xtream_vod_loading()
                 if playmode_selector.currentIndex() == 1:
                     # Movies
                     for lbl4 in tv_widgets:
@@ -4407,6 +4745,24 @@ if __name__ == "__main__":
                 YukiGUI.referer_choose_custom.setText("")
                 YukiGUI.group_text.setText("")
                 YukiGUI.epgname_lbl.setText(_("Default"))
+            channel_profile = YukiData.channel_profiles.get(YukiData.item_selected)
+            YukiGUI.channelcache_choose.setValue(channel_profile.get("cache_secs", 0))
+            if channel_profile.get("watch_secs", 0) < CHANNEL_PROFILE_MIN_WATCH:
+                channel_profile_text = _("not enough history")
+            else:
+                learned_cache_secs = get_learned_cache_secs(channel_profile)
+                channel_profile_text = "{}: {}, {} {}".format(
+                    _("stalls"),
+                    round(channel_profile.get("stalls", 0)),
+                    _("learned cache"),
+                    (
+                        gettext.ngettext("%d second", "%d seconds", learned_cache_secs)
+                        % learned_cache_secs
+                        if learned_cache_secs
+                        else _("Default")
+                    ),
+                )
+            YukiGUI.channelcache_learned.setText(f"({channel_profile_text})")
             moveWindowToCenter(YukiGUI.channels_win)
             YukiGUI.channels_win.show()
 
@@ -4609,7 +4965,6 @@ if __name__ == "__main__":
         YukiData.currentMoviesGroup = {}
 
         YukiData.movie_logos_request_old = {}
-        YukiData.movie_logos_process = None
 
         def update_movie_icons():
             if YukiData.settings["channellogos"] != 3:  # Do not load any logos
@@ -4617,14 +4972,13 @@ if __name__ == "__main__":
                     for item4 in range(win.moviesWidget.count()):
                         movie_name = get_movie_text(win.moviesWidget.item(item4))
                         if movie_name:
-                            if f"LOGOmovie:::{movie_name}" in YukiData.mp_manager_dict:
-                                if YukiData.mp_manager_dict[
-                                    f"LOGOmovie:::{movie_name}"
-                                ][0]:
+                            movie_logo_files = YukiData.ipc_dict.get(
+                                f"LOGOmovie:::{movie_name}"
+                            )
+                            if movie_logo_files:
+                                if movie_logo_files[0]:
                                     movie_logo = get_pixmap_from_filename(
-                                        YukiData.mp_manager_dict[
-                                            f"LOGOmovie:::{movie_name}"
-                                        ][0]
+                                        movie_logo_files[0]
                                     )
                                     if movie_logo:
                                         win.moviesWidget.itemWidget(
@@ -4693,35 +5047,17 @@ if __name__ == "__main__":
                             if movie_logos_request != YukiData.movie_logos_request_old:
                                 YukiData.movie_logos_request_old = movie_logos_request
                                 logger.debug("Movie logos request")
-                                if (
-                                    YukiData.movie_logos_process
-                                    and YukiData.movie_logos_process.is_alive()
-                                ):
-                                    # logger.debug(
-                                    #     "Old movie logos request found, stopping it"
-                                    # )
-                                    YukiData.movie_logos_process.kill()
-                                YukiData.movie_logos_process = get_context(
-                                    "spawn"
-                                ).Process(
-                                    name="[yuki-iptv] channel_logos_worker_for_movie",
-                                    target=channel_logos_worker,
-                                    daemon=True,
-                                    args=(
-                                        loglevel,
-                                        movie_logos_request,
-                                        YukiData.mp_manager_dict,
-                                        "movie",
-                                    ),
-                                )
-                                YukiData.movie_logos_process.start()
+                                request_logos(movie_logos_request, {}, "movie")
                     except Exception:
                         logger.warning("Fetch movie logos failed with exception:")
                         logger.warning(traceback.format_exc())
                     update_movie_icons()
             else:
                 win.moviesWidget.clear()
-                win.moviesWidget.addItem(_("Nothing found"))
+                if YukiData.xtream_vod_state:
+                    win.moviesWidget.addItem(_("Loading..."))
+                else:
+                    win.moviesWidget.addItem(_("Nothing found"))
 
         def movies_play(mov_item):
             if get_movie_text(mov_item) in YukiData.currentMoviesGroup:
@@ -4732,23 +5068,118 @@ if __name__ == "__main__":
 
         win.moviesWidget.itemDoubleClicked.connect(movies_play)
 
-        movies_groups = []
         movies_combobox = QtWidgets.QComboBox()
-        for movie_combobox in YukiData.movies:
-            if "tvg-group" in YukiData.movies[movie_combobox]:
-                if YukiData.movies[movie_combobox]["tvg-group"] not in movies_groups:
-                    movies_groups.append(YukiData.movies[movie_combobox]["tvg-group"])
-        for movie_group in movies_groups:
-            movies_combobox.addItem(movie_group)
+
+        def update_movies_groups():
+            movies_groups = []
+            for movie_combobox in YukiData.movies:
+                if "tvg-group" in YukiData.movies[movie_combobox]:
+                    if (
+                        YukiData.movies[movie_combobox]["tvg-group"]
+                        not in movies_groups
+                    ):
+                        movies_groups.append(
+                            YukiData.movies[movie_combobox]["tvg-group"]
+                        )
+            for movie_group in movies_groups:
+                movies_combobox.addItem(movie_group)
+
+        update_movies_groups()
         movies_combobox.currentIndexChanged.connect(movies_group_change)
         movies_group_change()
 
+        YukiData.series_logos_request_old = {}
+
+        def update_series_icons():
+            if YukiData.settings["channellogos"] != 3 and not YukiData.serie_selected:
+                try:
+                    for item5 in range(win.seriesWidget.count()):
+                        serie_logo_files = YukiData.ipc_dict.get(
+                            f"LOGOseries:::{win.seriesWidget.item(item5).text()}"
+                        )
+                        if serie_logo_files and serie_logo_files[0]:
+                            serie_logo = get_pixmap_from_filename(serie_logo_files[0])
+                            if serie_logo:
+                                win.seriesWidget.item(item5).setIcon(serie_logo)
+                except Exception:
+                    logger.warning("Set series logos failed with exception")
+                    logger.warning(traceback.format_exc())
+
+        # Series logos are requested for shown rows only, like channel logos
+        # for current page, with rows around them as prefetch
+        SERIES_LOGOS_VISIBLE_MAX = 50
+        SERIES_LOGOS_PREFETCH = 100
+
+        def get_series_logos_request(first_row, last_row):
+            series_logos_request = {}
+            for row in range(first_row, last_row):
+                serie_item = win.seriesWidget.item(row)
+                if serie_item.isHidden():
+                    continue
+                serie2 = serie_item.text()
+                if serie2 in YukiData.series and YukiData.series[serie2].logo:
+                    req_data_ua2, req_data_ref2 = get_ua_ref_for_channel(serie2)
+                    series_logos_request[serie2] = [
+                        YukiData.series[serie2].logo,
+                        "",
+                        req_data_ua2,
+                        req_data_ref2,
+                    ]
+            return series_logos_request
+
+        def request_series_logos():
+            if (
+                YukiData.settings["channellogos"] == 3
+                or YukiData.playmodeIndex != 2
+                or YukiData.serie_selected
+                or not YukiData.series
+            ):
+                return
+            try:
+                series_count = win.seriesWidget.count()
+                first_row = max(0, win.seriesWidget.indexAt(QtCore.QPoint(0, 0)).row())
+                last_row = win.seriesWidget.indexAt(
+                    QtCore.QPoint(0, win.seriesWidget.viewport().height() - 1)
+                ).row()
+                if last_row == -1:
+                    last_row = first_row + SERIES_LOGOS_VISIBLE_MAX - 1
+                last_row = min(series_count, last_row + 1)
+                series_logos_request = get_series_logos_request(first_row, last_row)
+                if series_logos_request != YukiData.series_logos_request_old:
+                    YukiData.series_logos_request_old = series_logos_request
+                    series_logos_prefetch = get_series_logos_request(
+                        last_row, min(series_count, last_row + SERIES_LOGOS_PREFETCH)
+                    )
+                    series_logos_prefetch.update(
+                        get_series_logos_request(
+                            max(0, first_row - SERIES_LOGOS_PREFETCH), first_row
+                        )
+                    )
+                    logger.debug("Series logos request")
+                    request_logos(series_logos_request, series_logos_prefetch, "series")
+            except Exception:
+                logger.warning("Fetch series logos failed with exception:")
+                logger.warning(traceback.format_exc())
+
+        YukiData.series_logos_timer = QtCore.QTimer()
+        YukiData.series_logos_timer.setSingleShot(True)
+        YukiData.series_logos_timer.setInterval(200)
+        YukiData.series_logos_timer.timeout.connect(request_series_logos)
+        win.seriesWidget.verticalScrollBar().valueChanged.connect(
+            lambda unused: YukiData.series_logos_timer.start()
+        )
+
         def redraw_series():
             YukiData.serie_selected = False
             win.seriesWidget.clear()
             if YukiData.series:
                 for serie2 in YukiData.series:
                     win.seriesWidget.addItem(serie2)
+                # After filter is applied and list is laid out
+                YukiData.series_logos_timer.start()
+                update_series_icons()
+            elif YukiData.xtream_vod_state:
+                win.seriesWidget.addItem(_("Loading..."))
             else:
                 win.seriesWidget.addItem(_("Nothing found"))
 
@@ -4805,11 +5236,61 @@ if __name__ == "__main__":
                         logger.info(f"Fetching data for serie '{sel_serie}' completed")
                     except Exception:
                         logger.warning(f"Fetching data for serie '{sel_serie}' FAILED")
+                    if YukiData.is_xtream:
+                        prefetch_series_info(sel_serie)
+
+        def prefetch_series_info(sel_serie):
+            try:
+                series_names = list(YukiData.series)
+                serie_index = series_names.index(sel_serie)
+                series_ids = []
+                # Nearest neighbours first
+                for offset in range(1, XTREAM_SERIES_PREFETCH_COUNT + 1):
+                    for neighbour_index in (serie_index + offset, serie_index - offset):
+                        if 0 <= neighbour_index < len(series_names):
+                            neighbour = YukiData.series[series_names[neighbour_index]]
+                            if not neighbour.seasons:
+                                series_ids.append(neighbour.series_id)
+                xt.prefetch_series_info(series_ids)
+            except Exception:
+                logger.warning("Series info prefetch failed")
 
         win.seriesWidget.itemDoubleClicked.connect(series_change)
 
         redraw_series()
 
+        @idle_function
+        def xtream_vod_loaded(movies, series):
+            YukiData.xtream_vod_state = ""
+            YukiData.movies.update(movies)
+            YukiData.series.update(series)
+            # Adding first group redraws movies
+            update_movies_groups()
+            if not movies_combobox.count():
+                movies_group_change()
+            redraw_series()
+
+        @async_gui_blocking_function
+        def load_xtream_vod_thread():
+            movies = {}
+            series = {}
+            try:
+                movies, series = load_xtream_vod(_, YukiData.settings, xt)
+            except Exception:
+                logger.warning("XTream movies and series loading FAILED")
+                logger.warning(traceback.format_exc())
+            xtream_vod_loaded(movies, series)
+
+        def start_xtream_vod_loading():
+            if YukiData.xtream_vod_state == "pending":
+                YukiData.xtream_vod_state = "loading"
+                logger.info("Loading XTream movies and series...")
+                load_xtream_vod_thread()
+
+        # Live channels are shown first
+        if YukiData.xtream_vod_state:
+            QtCore.QTimer.singleShot(XTREAM_VOD_LOAD_DELAY, start_xtream_vod_loading)
+
         playmode_selector = QtWidgets.QComboBox()
         playmode_selector.currentIndexChanged.connect(playmode_change)
         for playmode in [_("TV channels"), _("Movies"), _("Series")]:
@@ -5173,12 +5654,8 @@ if __name__ == "__main__":
                                         json.dumps(
                                             [
                                                 channel_1,
-                                                datetime.datetime.fromtimestamp(
-                                                    pr["start"]
-                                                ).strftime("%d.%m.%Y %H:%M:%S"),
-                                                datetime.datetime.fromtimestamp(
-                                                    pr["stop"]
-                                                ).strftime("%d.%m.%Y %H:%M:%S"),
+                                                int(pr["start"]),
+                                                int(pr["stop"]),
                                                 prog.index(pr),
                                             ]
                                         )
@@ -5601,6 +6078,21 @@ if __name__ == "__main__":
                     stream_info_count, _("Layout"), stream_props[3], ""
                 )
 
+                zap_summary, zap_histogram = YukiData.zap_stats.get_properties(
+                    YukiData.playing_channel
+                )
+                if zap_summary:
+                    stream_info_count = process_stream_info(
+                        stream_info_count,
+                        _("General"),
+                        zap_summary,
+                        _("Startup latency"),
+                    )
+                if zap_histogram:
+                    stream_info_count = process_stream_info(
+                        stream_info_count, _("Playback started"), zap_histogram, ""
+                    )
+
                 if not YukiGUI.streaminfo_win.isVisible():
                     YukiGUI.streaminfo_win.show()
                     moveWindowToCenter(YukiGUI.streaminfo_win)
@@ -5662,6 +6154,12 @@ if __name__ == "__main__":
 
         @idle_function
         def end_file_error_callback(unused=None):
+            if YukiData.stream_resolve_fallback:
+                play_args = YukiData.stream_resolve_fallback
+                logger.warning("Resolved stream URL failed, using original URL")
+                YukiData.stream_resolve_cache.invalidate(play_args[2])
+                doPlay(*play_args)
+                return
             logger.warning("Playing error!")
             if YukiData.is_loading:
                 YukiData.resume_playback = not YukiData.player.pause
@@ -6346,15 +6844,13 @@ if __name__ == "__main__":
                 s_stop = None
                 s_index = None
                 if YukiData.archive_epg:
-                    s_start = datetime.datetime.strptime(
-                        YukiData.archive_epg[1], "%d.%m.%Y %H:%M:%S"
-                    ).timestamp()
-                    s_stop = datetime.datetime.strptime(
-                        YukiData.archive_epg[2], "%d.%m.%Y %H:%M:%S"
-                    ).timestamp()
+                    s_start = YukiData.archive_epg[1]
+                    s_stop = YukiData.archive_epg[2]
                     s_index = YukiData.archive_epg[3]
                 else:
-                    if YukiData.settings["epg"] and exists_in_epg(
+                    if (
+                        YukiData.settings["epg"] or YukiData.xtream_short_epg
+                    ) and exists_in_epg(
                         YukiData.playing_channel.lower(), YukiData.programmes
                     ):
                         prog1 = get_epg(
@@ -6398,12 +6894,8 @@ if __name__ == "__main__":
                                 json.dumps(
                                     [
                                         YukiData.playing_channel,
-                                        datetime.datetime.fromtimestamp(
-                                            rewind_time[0]
-                                        ).strftime("%d.%m.%Y %H:%M:%S"),
-                                        datetime.datetime.fromtimestamp(
-                                            rewind_time[1]
-                                        ).strftime("%d.%m.%Y %H:%M:%S"),
+                                        int(rewind_time[0]),
+                                        int(rewind_time[1]),
                                         rewind_time[2],
                                         True,
                                     ]
@@ -6496,6 +6988,9 @@ if __name__ == "__main__":
             return w1_height
 
         def myExitHandler_before():
+            YukiData.zap_stats.save()
+            end_channel_profile_session()
+            YukiData.channel_profiles.save()
             if comm_instance.comboboxIndex != -1:
                 write_option(
                     "comboboxindex",
@@ -6575,8 +7070,6 @@ if __name__ == "__main__":
                         YukiData.epg_thread_2.terminate()
                     except Exception:
                         pass
-            if multiprocessing_manager:
-                multiprocessing_manager.shutdown()
             for process_3 in active_children():
                 try:
                     process_3.kill()
@@ -6626,14 +7119,14 @@ if __name__ == "__main__":
             YukiData.ic += 0.1
             # redraw every 15 seconds
             if YukiData.ic > (
-                14.9 if not YukiData.mp_manager_dict["logos_inprogress"] else 2.9
+                14.9 if not YukiData.ipc_dict["logos_inprogress"] else 2.9
             ):
                 YukiData.ic = 0
                 btn_update_click()
             YukiData.ic3 += 0.1
             # redraw every 15 seconds
             if YukiData.ic3 > (
-                14.9 if not YukiData.mp_manager_dict["logosmovie_inprogress"] else 2.9
+                14.9 if not YukiData.ipc_dict["logosmovie_inprogress"] else 2.9
             ):
                 YukiData.ic3 = 0
                 update_movie_icons()
@@ -6658,7 +7151,7 @@ if __name__ == "__main__":
             while not YukiData.stopped:
                 if not YukiData.first_boot:
                     YukiData.first_boot = True
-                    if YukiData.settings["epg"] and not YukiData.epg_failed:
+                    if get_epg_url() and not YukiData.epg_failed:
                         if not YukiData.use_local_tvguide:
                             update_epg = not YukiData.settings["donotupdateepg"]
                             if not YukiData.first_boot_1:
@@ -6672,13 +7165,16 @@ if __name__ == "__main__":
                                         YukiData.waiting_for_epg = True
                                         YukiData.epg_data = (
                                             get_context("spawn")
-                                            .Pool(1)
+                                            .Pool(
+                                                1,
+                                                initializer=set_ipc_worker_sender,
+                                                initargs=(YukiData.ipc_dict.sender,),
+                                            )
                                             .apply(
                                                 worker,
                                                 (
                                                     YukiData.settings,
                                                     get_catchup_days(),
-                                                    YukiData.mp_manager_dict,
                                                 ),
                                             )
                                         )
@@ -6915,12 +7411,10 @@ if __name__ == "__main__":
                     try:
                         if YukiData.waiting_for_epg:
                             if (
-                                "epg_progress" in YukiData.mp_manager_dict
-                                and YukiData.mp_manager_dict["epg_progress"]
+                                "epg_progress" in YukiData.ipc_dict
+                                and YukiData.ipc_dict["epg_progress"]
                             ):
-                                YukiData.static_text = YukiData.mp_manager_dict[
-                                    "epg_progress"
-                                ]
+                                YukiData.static_text = YukiData.ipc_dict["epg_progress"]
                                 YukiData.state.setTextYuki(is_previous=True)
                     except Exception:
                         pass
@@ -6928,6 +7422,15 @@ if __name__ == "__main__":
             except Exception:
                 pass
 
+        def ipc_activated(*args):
+            changed = YukiData.ipc_dict.drain()
+            if changed.intersection(
+                ("logos_completed", "logosmovie_completed", "logosseries_completed")
+            ):
+                timer_logos_update()
+            if "epg_progress" in changed:
+                timer_tvguide_progress()
+
         def timer_update_time():
             try:
                 YukiGUI.scheduler_clock.setText(get_current_time())
@@ -7561,9 +8064,7 @@ if __name__ == "__main__":
                 timer_record: 100,
                 timer_osc: 100,
                 timer_check_tvguide_obsolete: 100,
-                timer_tvguide_progress: 100,
                 timer_update_time: 1000,
-                timer_logos_update: 1000,
                 record_timer: 1000,
                 record_timer_2: 1000,
                 timer_afterrecord: 50,
@@ -7575,6 +8076,12 @@ if __name__ == "__main__":
                 timers_array[timer].timeout.connect(timer)
                 timers_array[timer].start(timers[timer])
 
+            # Workers push their updates into pipe, drain it when readable
+            YukiData.ipc_notifier = QtCore.QSocketNotifier(
+                YukiData.ipc_dict.fileno(), QtCore.QSocketNotifier.Type.Read
+            )
+            YukiData.ipc_notifier.activated.connect(ipc_activated)
+
             # Updating EPG, async
             thread_tvguide_update()
             thread_tvguide_update_pt2()
@@ -22,10 +22,11 @@
 # License - https://creativecommons.org/licenses/by/4.0/
 #
 import time
-import datetime
 import re
-import traceback
+import functools
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from yuki_iptv.requests_timeout import requests_get
 
 logger = logging.getLogger(__name__)
 
@@ -59,161 +60,158 @@ def format_catchup_array(array0):
     return array0
 
 
-def format_placeholders(start_time, end_time, catchup_id, orig_url):
-    if start_time == "TEST":
-        return orig_url
-    logger.info("")
-    logger.info(f"orig placeholder url: {orig_url}")
-    start_timestamp = int(time.mktime(time.strptime(start_time, "%d.%m.%Y %H:%M:%S")))
-    end_timestamp = int(time.mktime(time.strptime(end_time, "%d.%m.%Y %H:%M:%S")))
-    duration = int(end_timestamp - start_timestamp)
-
-    current_utc = int(time.time())
-    utcend = start_timestamp + duration
-    offset2 = int(current_utc - start_timestamp)
-
-    start_timestamp_1 = list(
-        reversed(start_time.split(" ")[0].split("."))
-    ) + start_time.split(" ")[1].split(":")
-
-    # offset
-    orig_url = orig_url.replace("${offset}", "${offset:1}")
-    orig_url = orig_url.replace("{offset}", "{offset:1}")
-
-    orig_url = orig_url.replace("${utc}", str(start_timestamp))
-    orig_url = orig_url.replace("{utc}", str(start_timestamp))
-
-    orig_url = orig_url.replace("${start}", str(start_timestamp))
-    orig_url = orig_url.replace("{start}", str(start_timestamp))
-
-    orig_url = orig_url.replace("${s}", str(start_timestamp))
-    orig_url = orig_url.replace("{s}", str(start_timestamp))
-
-    orig_url = orig_url.replace("${lutc}", str(current_utc))
-    orig_url = orig_url.replace("{lutc}", str(current_utc))
-
-    orig_url = orig_url.replace("${now}", str(current_utc))
-    orig_url = orig_url.replace("{now}", str(current_utc))
-
-    orig_url = orig_url.replace("${timestamp}", str(current_utc))
-    orig_url = orig_url.replace("{timestamp}", str(current_utc))
-
-    orig_url = orig_url.replace("${utcend}", str(utcend))
-    orig_url = orig_url.replace("{utcend}", str(utcend))
-
-    orig_url = orig_url.replace("${end}", str(utcend))
-    orig_url = orig_url.replace("{end}", str(utcend))
-
-    orig_url = orig_url.replace("${Y}", str(start_timestamp_1[0]))
-    orig_url = orig_url.replace("{Y}", str(start_timestamp_1[0]))
-
-    orig_url = orig_url.replace("${m}", str(start_timestamp_1[1]))
-    orig_url = orig_url.replace("{m}", str(start_timestamp_1[1]))
-
-    orig_url = orig_url.replace("${d}", str(start_timestamp_1[2]))
-    orig_url = orig_url.replace("{d}", str(start_timestamp_1[2]))
-
-    orig_url = orig_url.replace("${H}", str(start_timestamp_1[3]))
-    orig_url = orig_url.replace("{H}", str(start_timestamp_1[3]))
-
-    orig_url = orig_url.replace("${M}", str(start_timestamp_1[4]))
-    orig_url = orig_url.replace("{M}", str(start_timestamp_1[4]))
-
-    orig_url = orig_url.replace("${S}", str(start_timestamp_1[5]))
-    orig_url = orig_url.replace("{S}", str(start_timestamp_1[5]))
-
-    orig_url = orig_url.replace("${duration}", str(duration))
-    orig_url = orig_url.replace("{duration}", str(duration))
-
-    orig_url = orig_url.replace("${catchup-id}", str(catchup_id))
-    orig_url = orig_url.replace("{catchup-id}", str(catchup_id))
-
-    try:
-        duration_re = sorted(re.findall(r"\$?{duration:\d+}", orig_url))
-        if duration_re:
-            for duration_re_i in duration_re:
-                duration_re_i_parse = int(duration_re_i.split(":")[1].split("}")[0])
-                orig_url = orig_url.replace(
-                    duration_re_i, str(int(duration / duration_re_i_parse))
+# Placeholders are matched with optional "$" prefix, like ${start} and {start}
+CATCHUP_TOKEN_RE = re.compile(
+    r"\$?{(?:"
+    r"(utc|start|s|lutc|now|timestamp|utcend|end|duration|offset|catchup-id|[YmdHMS])"
+    r"|(duration|offset):(\d+)"
+    r"|(utc|start|lutc|now|timestamp|utcend|end):"
+    r"([YmdHMS]-?[YmdHMS]?-?[YmdHMS]?-?[YmdHMS]?-?[YmdHMS]?-?[YmdHMS]?)"
+    r")}"
+)
+# Other catchup schemes tried when archive is opened, configured one goes first
+CATCHUP_SCHEME_ALTERNATIVES = {
+    "default": ("shift",),
+    "append": ("shift",),
+    "shift": ("flussonic-hls", "flussonic-ts"),
+    "flussonic": ("flussonic-ts", "shift"),
+    "flussonic-hls": ("flussonic-ts", "shift"),
+    "flussonic-ts": ("flussonic-hls", "shift"),
+    "fs": ("flussonic-hls", "shift"),
+}
+CATCHUP_PROBE_TIMEOUT = 3
+# Live URL with extra parameters, servers without archive answer it too,
+# so an answer does not prove that the scheme works
+CATCHUP_UNVERIFIABLE_SCHEMES = ("shift",)
+CATCHUP_TIMES = {
+    "utc": "start",
+    "start": "start",
+    "s": "start",
+    "lutc": "now",
+    "now": "now",
+    "timestamp": "now",
+    "utcend": "end",
+    "end": "end",
+}
+CATCHUP_TIME_PARTS = "YmdHMS"
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_catchup_template(template, now_only=False):
+    """Split catchup template into literal strings and placeholder tokens
+
+    Tokens are tuples:
+    ("time", start | now | end) - UNIX timestamp
+    ("part", index) - part of start time (Y, m, d, H, M, S)
+    ("divide", duration | offset, divisor) - seconds divided by divisor
+    ("format", start | now | end, spec) - spec is tuple of part indexes
+    and literal strings (like "-")
+    ("catchup-id",)
+    """
+    tokens = []
+    pos = 0
+    for match in CATCHUP_TOKEN_RE.finditer(template):
+        if match.start() > pos:
+            tokens.append(template[pos : match.start()])
+        pos = match.end()
+        name, divide_name, divisor, format_name, spec = match.groups()
+        if name in CATCHUP_TIMES:
+            token = ("time", CATCHUP_TIMES[name])
+        elif name in ("duration", "offset"):
+            token = ("divide", name, 1)
+        elif name == "catchup-id":
+            token = ("catchup-id",)
+        elif name:
+            token = ("part", CATCHUP_TIME_PARTS.index(name))
+        elif divide_name:
+            if int(divisor) == 0:
+                logger.warning(f"Catchup placeholder '{match.group()}' is invalid")
+                token = match.group()
+            else:
+                token = ("divide", divide_name, int(divisor))
+        else:
+            token = (
+                "format",
+                CATCHUP_TIMES[format_name],
+                tuple(
+                    (
+                        CATCHUP_TIME_PARTS.index(spec_char)
+                        if spec_char in CATCHUP_TIME_PARTS
+                        else spec_char
+                    )
+                    for spec_char in spec
+                ),
+            )
+        # Live URLs only get current time, other placeholders are kept
+        if now_only and not (token[0] in ("time", "format") and token[1] == "now"):
+            token = match.group()
+        tokens.append(token)
+    if pos < len(template):
+        tokens.append(template[pos:])
+    return tuple(tokens)
+
+
+def get_time_parts(timestamp):
+    return time.strftime("%Y %m %d %H %M %S", time.localtime(timestamp)).split(" ")
+
+
+def render_catchup_template(tokens, start, end, now, catchup_id=""):
+    """Render compiled catchup template, times are UNIX timestamps"""
+    times = {"start": start, "end": end, "now": now}
+    divided = {"duration": end - start, "offset": now - start}
+    time_parts = {}
+    output = []
+    for token in tokens:
+        if isinstance(token, str):
+            output.append(token)
+        elif token[0] == "time":
+            output.append(str(times[token[1]]))
+        elif token[0] == "divide":
+            output.append(str(int(divided[token[1]] / token[2])))
+        elif token[0] == "catchup-id":
+            output.append(str(catchup_id))
+        else:
+            time_name = "start" if token[0] == "part" else token[1]
+            if time_name not in time_parts:
+                time_parts[time_name] = get_time_parts(times[time_name])
+            if token[0] == "part":
+                output.append(time_parts[time_name][token[1]])
+            else:
+                output.extend(
+                    (
+                        time_parts[time_name][spec_part]
+                        if isinstance(spec_part, int)
+                        else spec_part
+                    )
+                    for spec_part in token[2]
                 )
-    except Exception:
-        logger.warning("format_placeholders / duration_re parsing failed")
-        logger.warning(traceback.format_exc())
+    return "".join(output)
 
-    try:
-        offset_re = sorted(re.findall(r"\$?{offset:\d+}", orig_url))
-        if offset_re:
-            for offset_re_i in offset_re:
-                offset_re_i_parse = int(offset_re_i.split(":")[1].split("}")[0])
-                orig_url = orig_url.replace(
-                    offset_re_i, str(int(offset2 / offset_re_i_parse))
-                )
-    except Exception:
-        logger.warning("format_placeholders / offset_re parsing failed")
-        logger.warning(traceback.format_exc())
 
-    utc_time = (
-        datetime.datetime.fromtimestamp(start_timestamp)
-        .strftime("%Y-%m-%d-%H-%M-%S")
-        .split("-")
-    )
-    lutc_time = (
-        datetime.datetime.fromtimestamp(current_utc)
-        .strftime("%Y-%m-%d-%H-%M-%S")
-        .split("-")
-    )
-    utcend_time = (
-        datetime.datetime.fromtimestamp(utcend).strftime("%Y-%m-%d-%H-%M-%S").split("-")
+def format_placeholders(start_time, end_time, catchup_id, orig_url):
+    """Start and end time are UNIX timestamps"""
+    logger.info("")
+    logger.info(f"orig placeholder url: {orig_url}")
+    orig_url = render_catchup_template(
+        compile_catchup_template(orig_url),
+        int(start_time),
+        int(end_time),
+        int(time.time()),
+        catchup_id,
     )
-
-    try:
-        specifiers_re = re.findall(
-            re.compile(
-                "((\\$?){(utc|start|lutc|now|timestamp|utcend|end):"
-                "([YmdHMS])(-?)([YmdHMS]?)(-?)([YmdHMS]?)(-?)"
-                "([YmdHMS]?)(-?)([YmdHMS]?)(-?)([YmdHMS]?)})"
-            ),
-            orig_url,
-        )
-        if specifiers_re:
-            for specifiers_re_i in specifiers_re:
-                specifiers_re_i_o = specifiers_re_i[0]
-                spec_name = str(specifiers_re_i_o.split("{")[1].split(":")[0])
-                spec_val = str(specifiers_re_i_o.split(":")[1].split("}")[0])
-                if spec_name in ("utc", "start"):
-                    spec_val = spec_val.replace("Y", str(utc_time[0]))
-                    spec_val = spec_val.replace("m", str(utc_time[1]))
-                    spec_val = spec_val.replace("d", str(utc_time[2]))
-                    spec_val = spec_val.replace("H", str(utc_time[3]))
-                    spec_val = spec_val.replace("M", str(utc_time[4]))
-                    spec_val = spec_val.replace("S", str(utc_time[5]))
-                elif spec_name in ("lutc", "now", "timestamp"):
-                    spec_val = spec_val.replace("Y", str(lutc_time[0]))
-                    spec_val = spec_val.replace("m", str(lutc_time[1]))
-                    spec_val = spec_val.replace("d", str(lutc_time[2]))
-                    spec_val = spec_val.replace("H", str(lutc_time[3]))
-                    spec_val = spec_val.replace("M", str(lutc_time[4]))
-                    spec_val = spec_val.replace("S", str(lutc_time[5]))
-                elif spec_name in ("utcend", "end"):
-                    spec_val = spec_val.replace("Y", str(utcend_time[0]))
-                    spec_val = spec_val.replace("m", str(utcend_time[1]))
-                    spec_val = spec_val.replace("d", str(utcend_time[2]))
-                    spec_val = spec_val.replace("H", str(utcend_time[3]))
-                    spec_val = spec_val.replace("M", str(utcend_time[4]))
-                    spec_val = spec_val.replace("S", str(utcend_time[5]))
-                orig_url = orig_url.replace(specifiers_re_i_o, str(spec_val))
-    except Exception:
-        logger.warning("format_placeholders / specifiers_re parsing failed")
-        logger.warning(traceback.format_exc())
-
     logger.info(f"formatted placeholder url: {orig_url}")
     logger.info("")
     return orig_url
 
 
+def format_catchup_time(timestamp):
+    return time.strftime("%d.%m.%Y %H:%M:%S %Z", time.localtime(timestamp))
+
+
 def get_catchup_url(channel_url, arr1, start_time, end_time, catchup_id):
-    logger.info(f"Start time: {start_time}")
-    logger.info(f"End time: {end_time}")
+    """Start and end time are UNIX timestamps"""
+    logger.info(f"Start time: {format_catchup_time(start_time)} ({int(start_time)})")
+    logger.info(f"End time: {format_catchup_time(end_time)} ({int(end_time)})")
     if catchup_id:
         logger.info(f"Catchup id: {catchup_id}")
     play_url = channel_url
@@ -313,12 +311,83 @@ def get_catchup_url(channel_url, arr1, start_time, end_time, catchup_id):
     return play_url
 
 
+def get_catchup_schemes(catchup):
+    schemes = [catchup]
+    for scheme in CATCHUP_SCHEME_ALTERNATIVES.get(catchup, ()):
+        if scheme not in schemes:
+            schemes.append(scheme)
+    return schemes
+
+
+def probe_catchup_url(url, headers):
+    """Check that archive URL answers, without downloading it"""
+    try:
+        probe_headers = dict(headers)
+        probe_headers["Range"] = "bytes=0-1023"
+        probe_req = requests_get(
+            format_url_clean(url),
+            headers=probe_headers,
+            stream=True,
+            timeout=(CATCHUP_PROBE_TIMEOUT, CATCHUP_PROBE_TIMEOUT),
+        )
+        probe_req.close()
+        return probe_req.status_code < 400
+    except Exception:
+        return False
+
+
+def resolve_catchup_url(channel_url, arr1, start_time, end_time, catchup_id, headers):
+    """Probe configured catchup scheme, then alternatives concurrently
+
+    Configured scheme is used whenever it answers. Otherwise returns
+    (scheme, URL, True) for the first answering alternative in preference
+    order, or (configured scheme, its URL, False) if none does
+    """
+    candidates = {}
+    for scheme in get_catchup_schemes(arr1["catchup"]):
+        arr_scheme = arr1.copy()
+        arr_scheme["catchup"] = scheme
+        scheme_url = get_catchup_url(
+            channel_url, arr_scheme, start_time, end_time, catchup_id
+        )
+        if scheme_url not in candidates.values():
+            candidates[scheme] = scheme_url
+    configured = arr1["catchup"]
+    if probe_catchup_url(candidates[configured], headers):
+        return configured, candidates[configured], True
+    alternatives = [scheme for scheme in candidates if scheme != configured]
+    if alternatives:
+        executor = ThreadPoolExecutor(max_workers=len(alternatives))
+        try:
+            futures = {
+                scheme: executor.submit(probe_catchup_url, candidates[scheme], headers)
+                for scheme in alternatives
+            }
+            # Probed concurrently, but picked in preference order
+            for scheme in alternatives:
+                if futures[scheme].result():
+                    logger.info(f"Catchup scheme '{scheme}' used, not '{configured}'")
+                    return scheme, candidates[scheme], True
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    logger.warning("No catchup scheme answered, using configured one")
+    return configured, candidates[configured], False
+
+
 def format_url_clean(url5):
     if "^^^^^^^^^^" in url5:
         url5 = url5.split("^^^^^^^^^^")[0]
     return url5
 
 
+def has_now_placeholders(url):
+    """True if live URL has current time placeholders"""
+    return any(
+        not isinstance(token, str)
+        for token in compile_catchup_template(url, now_only=True)
+    )
+
+
 def parse_specifiers_now_url(url4):
     if (
         url4.endswith("/icons/main.png")
@@ -329,44 +398,10 @@ def parse_specifiers_now_url(url4):
         return url4
     logger.info("")
     logger.info(f"orig spec url: {format_url_clean(url4)}")
-    current_utc_str = int(time.time())
-    url4 = url4.replace("${lutc}", str(current_utc_str))
-    url4 = url4.replace("{lutc}", str(current_utc_str))
-
-    url4 = url4.replace("${now}", str(current_utc_str))
-    url4 = url4.replace("{now}", str(current_utc_str))
-
-    url4 = url4.replace("${timestamp}", str(current_utc_str))
-    url4 = url4.replace("{timestamp}", str(current_utc_str))
-
-    cur_utc_time = (
-        datetime.datetime.fromtimestamp(current_utc_str)
-        .strftime("%Y-%m-%d-%H-%M-%S")
-        .split("-")
+    url4 = render_catchup_template(
+        compile_catchup_template(url4, now_only=True), 0, 0, int(time.time())
     )
 
-    try:
-        specifiers_re_url = re.findall(
-            re.compile(
-                "((\\$?){(lutc|now|timestamp):([YmdHMS])(-?)([YmdHMS]?)"
-                "(-?)([YmdHMS]?)(-?)([YmdHMS]?)(-?)([YmdHMS]?)(-?)([YmdHMS]?)})"
-            ),
-            url4,
-        )
-        if specifiers_re_url:
-            for specifiers_re_url_i in specifiers_re_url:
-                spec_val_1 = str(specifiers_re_url_i[0].split(":")[1].split("}")[0])
-                spec_val_1 = spec_val_1.replace("Y", str(cur_utc_time[0]))
-                spec_val_1 = spec_val_1.replace("m", str(cur_utc_time[1]))
-                spec_val_1 = spec_val_1.replace("d", str(cur_utc_time[2]))
-                spec_val_1 = spec_val_1.replace("H", str(cur_utc_time[3]))
-                spec_val_1 = spec_val_1.replace("M", str(cur_utc_time[4]))
-                spec_val_1 = spec_val_1.replace("S", str(cur_utc_time[5]))
-                url4 = url4.replace(specifiers_re_url_i[0], str(spec_val_1))
-    except Exception:
-        logger.warning("parse_specifiers_now_url / specifiers_re_url parsing failed")
-        logger.warning(traceback.format_exc())
-
     logger.info(f"after spec url: {format_url_clean(url4)}")
     logger.info("")
     return url4
@@ -26,11 +26,24 @@ import os
 import logging
 import traceback
 import io
-import base64
-import hashlib
+import heapq
+import json
+import time
+import threading
+import requests
 from pathlib import Path
+from multiprocessing import get_context
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from yuki_iptv.xdg import LOCAL_DIR
 from yuki_iptv.requests_timeout import requests_get
+from yuki_iptv.logo_cache import (
+    LogoDiskCache,
+    get_logo_hash,
+    get_logo_2x_file,
+    LOGO_CACHE_DIR,
+)
+from yuki_iptv.logo_atlas import LogoAtlasWriter
 
 logger = logging.getLogger(__name__)
 
@@ -44,118 +57,461 @@ except Exception:
     use_wand = False
 
 
-def fetch_remote_channel_icon(
-    loglevel, channel_name, logo_url, req_data_ua, req_data_ref
-):
-    icon_ret = None
+LOGO_SERVICE_THREADS = 4
+# Decoding and resizing is CPU bound, so it runs in separate processes
+LOGO_DECODE_PROCESSES = max(1, min(4, (os.cpu_count() or 1) // 2))
+LOGO_DECODE_TIMEOUT = 30
+# Logo size in channel list, 2x logo is used on HiDPI screens
+LOGO_SIZE = 64
+# Visible rows first, then adjacent pages
+LOGO_PRIORITY_VISIBLE = 0
+LOGO_PRIORITY_PREFETCH = 1
+# Failed logo URLs are retried after 5 minutes, 10 minutes, ... up to 7 days
+LOGO_FAILED_BACKOFF = 300
+LOGO_FAILED_BACKOFF_MAX = 7 * 86400
+LOGO_FAILED_FORGET = 30 * 86400
+
+# System, then local
+CUSTOM_LOGOS_DIRS = (
+    str(Path("..", "..", "share", "yuki-iptv", "channel_logos")),
+    str(Path(LOCAL_DIR, "logos")),
+)
+CUSTOM_LOGOS_EXTS = ("png", "jpg", "svg")
+CUSTOM_LOGOS_CHECK_INTERVAL = 5
+
+
+def setup_logging(loglevel):
+    # Spawned processes do not inherit logging configuration
+    logging.basicConfig(
+        format="%(asctime)s.%(msecs)03d %(name)s %(levelname)s: %(message)s",
+        level=getattr(logging, loglevel.upper(), logging.INFO),
+        datefmt="%H:%M:%S",
+    )
+
+
+def download_channel_logo(loglevel, logo_url, req_data_ua, req_data_ref, session=None):
     if not logo_url:
         return None
-    base64_enc = base64.b64encode(bytes(logo_url, "utf-8")).decode("utf-8")
-    sha512_hash = str(hashlib.sha512(bytes(base64_enc, "utf-8")).hexdigest()) + ".png"
-    cache_file = str(Path(LOCAL_DIR, "logo_cache", sha512_hash))
-    if os.path.isfile(cache_file):
-        # logger.debug("is remote icon, cache available")
+    try:
+        # logger.debug("is remote icon, cache not available, fetching it...")
+        req_data_headers = {"User-Agent": req_data_ua}
+        if req_data_ref:
+            req_data_headers["Referer"] = req_data_ref
+        return requests_get(
+            logo_url,
+            headers=req_data_headers,
+            timeout=(3, 3),
+            stream=True,
+            session=session,
+        ).content
+    except Exception:
+        if loglevel.upper() == "DEBUG":
+            logger.debug("Logging failed channel logo because loglevel is DEBUG")
+            logger.debug(traceback.format_exc())
+        return None
+
+
+def decode_channel_logo(loglevel, logo_data, cache_file):
+    """Write 1x and 2x thumbnails, PNG with fast compression level"""
+    icon_ret = None
+    try:
+        # Logo may be replaced while GUI reads it (revalidation)
+        for logo_size, logo_file in (
+            (LOGO_SIZE * 2, get_logo_2x_file(cache_file)),
+            (LOGO_SIZE, cache_file),
+        ):
+            logo_file_tmp = logo_file + ".tmp"
+            with io.BytesIO(logo_data) as im_logo_bytes:
+                if use_wand:
+                    with Image(file=im_logo_bytes) as original:
+                        with original.convert("png") as im_logo:
+                            im_logo.transform(resize=f"{logo_size}x{logo_size}>")
+                            im_logo.compression_quality = 10
+                            im_logo.save(filename=logo_file_tmp)
+                else:
+                    with Image.open(im_logo_bytes) as im_logo:
+                        if im_logo.mode == "CMYK":
+                            im_logo = im_logo.convert("RGB")
+                        im_logo.thumbnail((logo_size, logo_size))
+                        im_logo.save(logo_file_tmp, "PNG", compress_level=1)
+            os.replace(logo_file_tmp, logo_file)
         icon_ret = cache_file
-    else:
+    except Exception:
+        if loglevel.upper() == "DEBUG":
+            logger.debug("Logging failed channel logo because loglevel is DEBUG")
+            logger.debug(traceback.format_exc())
+        icon_ret = None
+    return icon_ret
+
+
+def logo_decode_worker_init(loglevel, parent_pid):
+    setup_logging(loglevel)
+
+    def watch_parent():
+        # Logos service is gone (killed), do not stay orphaned
+        while os.getppid() == parent_pid:
+            time.sleep(5)
+        os._exit(0)
+
+    threading.Thread(target=watch_parent, daemon=True).start()
+
+
+class LogoDecoder:
+    """Decodes logos from fetch threads in a pool of processes
+
+    The pool is owned by logos service process. A crashed decode process
+    breaks the pool, waiting tasks fail at once and a new pool is started.
+    """
+
+    def __init__(self, loglevel):
+        self.loglevel = loglevel
+        self.lock = threading.Lock()
+        self.executor = self.start_executor()
+
+    def start_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=LOGO_DECODE_PROCESSES,
+            mp_context=get_context("spawn"),
+            initializer=logo_decode_worker_init,
+            initargs=(self.loglevel, os.getpid()),
+        )
+
+    def decode(self, logo_data, cache_file):
+        with self.lock:
+            executor = self.executor
+        try:
+            return executor.submit(
+                decode_channel_logo, self.loglevel, logo_data, cache_file
+            ).result(LOGO_DECODE_TIMEOUT)
+        except BrokenProcessPool:
+            with self.lock:
+                if self.executor is executor:
+                    logger.warning("Logo decode process died, restarting decoders")
+                    self.executor = self.start_executor()
+        except TimeoutError:
+            logger.warning("Logo decode timed out")
+        return None
+
+    def shutdown(self):
+        with self.lock:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class LogoNegativeCache:
+    """Failed logo URLs, retried with exponential backoff"""
+
+    def __init__(self):
+        self.file = str(Path(LOGO_CACHE_DIR, "failed_logos.json"))
+        self.failed = {}
+        self.changed = False
         try:
-            if os.path.isfile(logo_url.strip()):
-                # logger.debug("is local icon")
-                icon_ret = logo_url.strip()
-            else:
-                # logger.debug(
-                #     "is remote icon, cache not available, fetching it..."
-                # )
-                req_data_headers = {"User-Agent": req_data_ua}
-                if req_data_ref:
-                    req_data_headers["Referer"] = req_data_ref
-                req_data1 = requests_get(
-                    logo_url,
-                    headers=req_data_headers,
-                    timeout=(3, 3),
-                    stream=True,
-                ).content
-                if req_data1:
-                    with io.BytesIO(req_data1) as im_logo_bytes:
-                        if use_wand:
-                            with Image(file=im_logo_bytes) as original:
-                                with original.convert("png") as im_logo:
-                                    im_logo.transform(resize="64x64>")
-                                    im_logo.save(filename=cache_file)
-                                icon_ret = cache_file
-                        else:
-                            with Image.open(im_logo_bytes) as im_logo:
-                                im_logo.thumbnail((64, 64))
-                                im_logo.save(cache_file, "PNG")
-                                icon_ret = cache_file
+            if os.path.isfile(self.file):
+                with open(self.file, encoding="utf8") as failed_file:
+                    self.failed = json.loads(failed_file.read())
         except Exception:
-            if loglevel.upper() == "DEBUG":
-                logger.debug("Logging failed channel logo because loglevel is DEBUG")
-                logger.debug(traceback.format_exc())
-            icon_ret = None
-    return icon_ret
+            logger.warning("Failed to load failed logos list")
+            self.failed = {}
+        # Forget URLs which were not retried for a long time
+        current_time = time.time()
+        for logo_url in list(self.failed):
+            if current_time - self.failed[logo_url][1] > LOGO_FAILED_FORGET:
+                self.failed.pop(logo_url)
+                self.changed = True
 
+    def is_failed(self, logo_url):
+        return logo_url in self.failed and time.time() < self.failed[logo_url][1]
 
-def channel_logos_worker(loglevel, requested_logos, update_dict, append=""):
-    # logger.debug("channel_logos_worker started")
-    update_dict[f"logos{append}_inprogress"] = True
-    for logo_channel in requested_logos:
-        # logger.debug(f"Downloading logo for channel '{logo_channel}'...")
-        logo_m3u = fetch_remote_channel_icon(
-            loglevel,
-            logo_channel,
-            requested_logos[logo_channel][0],
-            requested_logos[logo_channel][2],
-            requested_logos[logo_channel][3],
+    def add(self, logo_url):
+        failures = self.failed[logo_url][0] + 1 if logo_url in self.failed else 1
+        backoff = min(
+            LOGO_FAILED_BACKOFF * (2 ** (failures - 1)), LOGO_FAILED_BACKOFF_MAX
         )
-        logo_epg = fetch_remote_channel_icon(
-            loglevel,
-            logo_channel,
-            requested_logos[logo_channel][1],
-            requested_logos[logo_channel][2],
-            requested_logos[logo_channel][3],
+        self.failed[logo_url] = [failures, time.time() + backoff]
+        self.changed = True
+
+    def remove(self, logo_url):
+        if logo_url in self.failed:
+            self.failed.pop(logo_url)
+            self.changed = True
+
+    def save(self):
+        if self.changed:
+            self.changed = False
+            try:
+                with open(self.file, "w", encoding="utf8") as failed_file:
+                    failed_file.write(json.dumps(self.failed))
+            except Exception:
+                logger.warning("Failed to save failed logos list")
+
+
+class LogoServiceState:
+    def __init__(self, logo_cache_size, decoder):
+        self.cond = threading.Condition()
+        self.queue = []
+        self.seq = 0
+        # URL -> job, every URL is fetched only once for all channels using it
+        self.jobs = {}
+        self.channels = {}
+        self.visible = {}
+        self.negative_cache = LogoNegativeCache()
+        self.disk_cache = LogoDiskCache(logo_cache_size)
+        self.decoder = decoder
+        self.atlas = LogoAtlasWriter(
+            os.path.join(LOGO_CACHE_DIR, entry[0])
+            for entry in self.disk_cache.index.values()
         )
-        update_dict[f"LOGO{append}:::{logo_channel}"] = [logo_m3u, logo_epg]
-    # logger.debug("channel_logos_worker ended")
-    update_dict[f"logos{append}_inprogress"] = False
-    update_dict[f"logos{append}_completed"] = True
+        self.disk_cache.on_remove = self.atlas.remove
+        # Throughput since fetching started
+        self.decoded_count = 0
+        self.decode_start = None
 
 
-def get_custom_channel_logo(channel_name):
-    custom_channel_logo = ""
-    name_escaped = channel_name.replace("/", "_")
-    exts = ("png", "jpg", "svg")
-    # System
-    for ext in exts:
+def is_remote_logo(logo_url):
+    return not os.path.isfile(logo_url.strip())
+
+
+def logo_service_publish(state, update_dict, append, logo_channel, channel_entry):
+    update_dict[f"LOGO{append}:::{logo_channel}"] = channel_entry["files"]
+    # Results of older requests are published, but do not count as completed
+    if state.channels.get((append, logo_channel)) is channel_entry:
+        state.channels.pop((append, logo_channel))
+        visible = state.visible[append]
+        if logo_channel in visible:
+            visible.remove(logo_channel)
+            if not visible:
+                update_dict[f"logos{append}_inprogress"] = False
+                update_dict[f"logos{append}_completed"] = True
+
+
+def logo_service_fetch_thread(loglevel, state, update_dict):
+    # Every thread keeps its own session, so connections
+    # to logo hosts are reused (keep-alive)
+    session = requests.Session()
+    while True:
+        with state.cond:
+            while True:
+                while not state.queue:
+                    if state.decoded_count and not state.jobs:
+                        decode_time = time.time() - state.decode_start
+                        logger.info(
+                            f"Decoded {state.decoded_count} logos "
+                            f"in {decode_time:.2f}s, "
+                            f"{state.decoded_count / decode_time:.1f} logos/s"
+                        )
+                        state.decoded_count = 0
+                        state.decode_start = None
+                    state.negative_cache.save()
+                    state.disk_cache.save()
+                    state.cond.wait()
+                priority, _seq, logo_url = heapq.heappop(state.queue)
+                job = state.jobs.get(logo_url)
+                # Skip cancelled and re-prioritized entries
+                if job and not job["running"] and job["priority"] == priority:
+                    break
+            job["running"] = True
+            if state.decode_start is None:
+                state.decode_start = time.time()
+        # Thread must survive any failure, or job would stay in progress forever
+        logo_file = None
         try:
-            if os.path.isfile(
-                Path(
-                    "..",
-                    "..",
-                    "share",
-                    "yuki-iptv",
-                    "channel_logos",
-                    f"{name_escaped}.{ext}",
-                )
-            ):
-                custom_channel_logo = str(
-                    Path(
-                        "..",
-                        "..",
-                        "share",
-                        "yuki-iptv",
-                        "channel_logos",
-                        f"{name_escaped}.{ext}",
+            with state.cond:
+                cache_file = state.disk_cache.get_file(get_logo_hash(logo_url))
+            logo_data = download_channel_logo(
+                loglevel, logo_url, job["ua"], job["ref"], session
+            )
+            if logo_data:
+                logo_file = state.decoder.decode(logo_data, cache_file)
+        except Exception:
+            logger.warning(f"Failed to fetch logo '{logo_url}'")
+            logo_file = None
+        with state.cond:
+            state.jobs.pop(logo_url, None)
+            try:
+                if logo_file:
+                    state.decoded_count += 1
+                    state.negative_cache.remove(logo_url)
+                    state.disk_cache.add(logo_url, logo_file)
+                    state.atlas.add(logo_file)
+                else:
+                    state.negative_cache.add(logo_url)
+            except Exception:
+                logger.warning(f"Failed to store logo '{logo_url}'")
+                if logo_file and not os.path.isfile(logo_file):
+                    logo_file = None
+            finally:
+                if not logo_file:
+                    # Revalidation failed, keep using old logo
+                    logo_file = job["stale_file"]
+                for append, logo_channel, slot, channel_entry in job["subscribers"]:
+                    channel_entry["files"][slot] = logo_file
+                    channel_entry["pending"] -= 1
+                    if not channel_entry["pending"]:
+                        logo_service_publish(
+                            state, update_dict, append, logo_channel, channel_entry
+                        )
+
+
+def logo_service_request(state, update_dict, append, requested_logos, prefetch_logos):
+    with state.cond:
+        # Cancel everything not yet started for previous request
+        for logo_url in list(state.jobs):
+            job = state.jobs[logo_url]
+            if not job["running"]:
+                job["subscribers"] = [
+                    subscriber
+                    for subscriber in job["subscribers"]
+                    if subscriber[0] != append
+                ]
+                if not job["subscribers"]:
+                    state.jobs.pop(logo_url)
+        state.visible[append] = set(requested_logos)
+        published = []
+        for priority, logos in (
+            (LOGO_PRIORITY_VISIBLE, requested_logos),
+            (LOGO_PRIORITY_PREFETCH, prefetch_logos),
+        ):
+            for logo_channel in logos:
+                logo_data = logos[logo_channel]
+                channel_entry = {"files": [None, None], "pending": 0}
+                state.channels[(append, logo_channel)] = channel_entry
+                for slot in (0, 1):
+                    logo_url = logo_data[slot]
+                    if not logo_url:
+                        continue
+                    if not is_remote_logo(logo_url):
+                        channel_entry["files"][slot] = logo_url.strip()
+                        continue
+                    cached_logo = state.disk_cache.get(logo_url)
+                    if cached_logo and (
+                        cached_logo[1] or state.negative_cache.is_failed(logo_url)
+                    ):
+                        channel_entry["files"][slot] = cached_logo[0]
+                        continue
+                    if state.negative_cache.is_failed(logo_url):
+                        continue
+                    channel_entry["pending"] += 1
+                    job = state.jobs.get(logo_url)
+                    if not job:
+                        job = {
+                            "priority": priority,
+                            "running": False,
+                            "ua": logo_data[2],
+                            "ref": logo_data[3],
+                            "stale_file": cached_logo[0] if cached_logo else None,
+                            "subscribers": [],
+                        }
+                        state.jobs[logo_url] = job
+                        state.seq += 1
+                        heapq.heappush(state.queue, (priority, state.seq, logo_url))
+                    elif not job["running"] and priority < job["priority"]:
+                        job["priority"] = priority
+                        state.seq += 1
+                        heapq.heappush(state.queue, (priority, state.seq, logo_url))
+                    job["subscribers"].append(
+                        (append, logo_channel, slot, channel_entry)
                     )
-                )
+                if not channel_entry["pending"]:
+                    published.append((logo_channel, channel_entry))
+        if requested_logos:
+            update_dict[f"logos{append}_inprogress"] = True
+        else:
+            update_dict[f"logos{append}_inprogress"] = False
+            update_dict[f"logos{append}_completed"] = True
+        for logo_channel, channel_entry in published:
+            logo_service_publish(
+                state, update_dict, append, logo_channel, channel_entry
+            )
+        state.cond.notify_all()
+
+
+def channel_logos_service(loglevel, request_conn, update_dict, logo_cache_size):
+    """Long-lived logo fetcher
+
+    Requests are ("request", append, visible, prefetch) or ("trim",)
+    """
+    setup_logging(loglevel)
+    state = LogoServiceState(logo_cache_size, LogoDecoder(loglevel))
+    for _i in range(LOGO_SERVICE_THREADS):
+        threading.Thread(
+            target=logo_service_fetch_thread,
+            args=(loglevel, state, update_dict),
+            daemon=True,
+        ).start()
+    while True:
+        try:
+            service_request = request_conn.recv()
+        except EOFError:
+            break
+        if service_request[0] == "trim":
+            with state.cond:
+                state.disk_cache.trim()
+            state.atlas.compact()
+        else:
+            # logger.debug(f"Logos request ({service_request[1]})")
+            logo_service_request(state, update_dict, *service_request[1:])
+    state.decoder.shutdown()
+    with state.cond:
+        state.negative_cache.save()
+        state.disk_cache.save(force=True)
+
+
+def start_channel_logos_service(loglevel, update_dict, logo_cache_size):
+    """Start logo fetcher process, returns (process, request conn)
+
+    The process starts and owns decode processes, so it is not daemonic.
+    It exits when GUI closes the request conn and is killed on exit
+    with other children.
+    """
+    spawn_context = get_context("spawn")
+    request_reader, request_conn = spawn_context.Pipe(duplex=False)
+    service_process = spawn_context.Process(
+        name="[yuki-iptv] channel_logos_service",
+        target=channel_logos_service,
+        daemon=False,
+        args=(loglevel, request_reader, update_dict, logo_cache_size),
+    )
+    service_process.start()
+    request_reader.close()
+    return service_process, request_conn
+
+
+class CustomLogosIndex:
+    # channel name -> logo file
+    index = {}
+    mtimes = None
+    last_check = 0
+
+
+def update_custom_logos_index():
+    """Rescan custom logo directories if files were added or removed"""
+    current_time = time.time()
+    if current_time - CustomLogosIndex.last_check < CUSTOM_LOGOS_CHECK_INTERVAL:
+        return
+    CustomLogosIndex.last_check = current_time
+    mtimes = []
+    for logos_dir in CUSTOM_LOGOS_DIRS:
+        try:
+            mtimes.append(os.stat(logos_dir).st_mtime)
         except Exception:
-            pass
-    # Local
-    for ext in exts:
+            mtimes.append(None)
+    if mtimes == CustomLogosIndex.mtimes:
+        return
+    CustomLogosIndex.mtimes = mtimes
+    index = {}
+    # Local logos override system ones, svg overrides jpg and png
+    for logos_dir in CUSTOM_LOGOS_DIRS:
         try:
-            if os.path.isfile(Path(LOCAL_DIR, "logos", f"{name_escaped}.{ext}")):
-                custom_channel_logo = str(
-                    Path(LOCAL_DIR, "logos", f"{name_escaped}.{ext}")
-                )
+            logo_files = os.listdir(logos_dir)
         except Exception:
-            pass
-    return custom_channel_logo
+            continue
+        for ext in CUSTOM_LOGOS_EXTS:
+            for logo_file in logo_files:
+                if logo_file.endswith(f".{ext}"):
+                    index[logo_file[: -len(ext) - 1]] = str(Path(logos_dir, logo_file))
+    CustomLogosIndex.index = index
+    logger.debug(f"Custom channel logos index updated, {len(index)} logos")
+
+
+def get_custom_channel_logo(channel_name):
+    update_custom_logos_index()
+    return CustomLogosIndex.index.get(channel_name.replace("/", "_"), "")
@@ -0,0 +1,212 @@
+#
+# Copyright (c) 2021, 2022 Astroncia
+# Copyright (c) 2023, 2024 Liya Astrova <liyaastrova@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# Font Awesome Free 5.15.4 by @fontawesome - https://fontawesome.com
+# License - https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import json
+import math
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# mpv options which are set per channel, values are restored for other channels
+CHANNEL_PROFILE_OPTIONS = (
+    "cache-secs",
+    "demuxer-readahead-secs",
+    "demuxer-max-bytes",
+    "cache-pause-wait",
+)
+# Channel is judged only after that much watching
+CHANNEL_PROFILE_MIN_WATCH = 60
+# Older history is halved when a channel was watched longer than that
+CHANNEL_PROFILE_HISTORY = 2 * 60 * 60
+# Fewer stalls per 10 minutes keep mpv defaults, so good channels start fast
+CHANNEL_PROFILE_STALL_RATE = 0.5
+CHANNEL_PROFILE_MIN_CACHE = 5
+CHANNEL_PROFILE_MAX_CACHE = 60
+CHANNEL_PROFILE_MAX_PAUSE_WAIT = 10
+# mpv default demuxer-max-bytes, only raised for high bitrate channels
+CHANNEL_PROFILE_DEMUXER_MAX_BYTES = 150 * 1024 * 1024
+
+
+def get_learned_cache_secs(profile):
+    """Cache length (seconds) learned from stalls history, 0 - defaults"""
+    watch_secs = profile.get("watch_secs", 0)
+    stalls = profile.get("stalls", 0)
+    if watch_secs < CHANNEL_PROFILE_MIN_WATCH or not stalls:
+        return 0
+    stall_rate = stalls * 600 / watch_secs
+    if stall_rate < CHANNEL_PROFILE_STALL_RATE:
+        return 0
+    mean_stall = profile.get("stall_secs", 0) / stalls
+    cache_secs = mean_stall * 3
+    if stall_rate >= CHANNEL_PROFILE_STALL_RATE * 6:
+        cache_secs *= 2
+    return min(
+        CHANNEL_PROFILE_MAX_CACHE, max(CHANNEL_PROFILE_MIN_CACHE, math.ceil(cache_secs))
+    )
+
+
+def get_profile_options(profile):
+    """mpv options for channel profile, empty dict - use defaults"""
+    cache_secs = profile.get("cache_secs", 0)
+    if not cache_secs:
+        cache_secs = get_learned_cache_secs(profile)
+    if not cache_secs:
+        return {}
+    options = {
+        "cache-secs": cache_secs,
+        "demuxer-readahead-secs": cache_secs,
+    }
+    # Bitrate (kbps) * cache, twice for back buffer and bitrate peaks
+    max_bytes = profile.get("bitrate", 0) * 1000 / 8 * cache_secs * 2
+    if max_bytes > CHANNEL_PROFILE_DEMUXER_MAX_BYTES:
+        options["demuxer-max-bytes"] = f"{math.ceil(max_bytes / 1024 / 1024)}MiB"
+    if profile.get("stalls"):
+        # Resume after a stall only with enough buffered for an average stall
+        options["cache-pause-wait"] = min(
+            CHANNEL_PROFILE_MAX_PAUSE_WAIT,
+            max(1, round(profile["stall_secs"] / profile["stalls"], 1)),
+        )
+    return options
+
+
+class ChannelProfiles:
+    """Per channel buffering history and cache settings
+
+    Stalls are reported from mpv event thread, so everything is under lock
+    """
+
+    def __init__(self, path, playlist):
+        self.path = path
+        self.playlist = playlist
+        self.lock = threading.Lock()
+        self.profiles = {}
+        self.channel_profiles = {}
+        self.session = None
+        self.load()
+
+    def load(self):
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, encoding="utf8") as channel_profiles_file:
+                    self.profiles = json.loads(channel_profiles_file.read())
+            except Exception:
+                logger.warning("Failed to load channel profiles")
+        if self.playlist not in self.profiles:
+            self.profiles[self.playlist] = {}
+        self.channel_profiles = self.profiles[self.playlist]
+
+    def save(self):
+        with self.lock:
+            data = json.dumps(self.profiles)
+        try:
+            with open(self.path + ".tmp", "w", encoding="utf8") as profiles_file:
+                profiles_file.write(data)
+            os.replace(self.path + ".tmp", self.path)
+        except Exception:
+            logger.warning("Failed to save channel profiles")
+
+    def get(self, channel_name):
+        with self.lock:
+            return dict(self.channel_profiles.get(channel_name, {}))
+
+    def get_options(self, channel_name):
+        return get_profile_options(self.get(channel_name))
+
+    def set_cache_secs(self, channel_name, cache_secs):
+        """Cache length set by user in channel settings, 0 - automatic"""
+        with self.lock:
+            profile = self.channel_profiles.setdefault(channel_name, {})
+            profile["cache_secs"] = cache_secs
+
+    def start_session(self, channel_name):
+        with self.lock:
+            self.session = {
+                "channel": channel_name,
+                "start": time.monotonic(),
+                "stall_start": None,
+                "stalls": 0,
+                "stall_secs": 0,
+                # video / audio -> [sum, count] of bitrate samples (kbps)
+                "bitrates": {},
+            }
+
+    def stall(self, paused_for_cache):
+        with self.lock:
+            session = self.session
+            if not session:
+                return
+            if paused_for_cache and session["stall_start"] is None:
+                session["stall_start"] = time.monotonic()
+                session["stalls"] += 1
+            elif not paused_for_cache and session["stall_start"] is not None:
+                session["stall_secs"] += time.monotonic() - session["stall_start"]
+                session["stall_start"] = None
+
+    def add_bitrate(self, kind, bitrate):
+        """Bitrate sample (kbps) for video or audio, from mpv event thread"""
+        with self.lock:
+            if self.session:
+                samples = self.session["bitrates"].setdefault(kind, [0, 0])
+                samples[0] += bitrate
+                samples[1] += 1
+
+    def end_session(self):
+        """Add finished session to channel history"""
+        with self.lock:
+            session = self.session
+            self.session = None
+            if not session:
+                return
+            now = time.monotonic()
+            if session["stall_start"] is not None:
+                session["stall_secs"] += now - session["stall_start"]
+            watch_secs = now - session["start"]
+            bitrate = sum(
+                bitrate_sum / count
+                for bitrate_sum, count in session["bitrates"].values()
+            )
+            # Zapping through the channel tells nothing about it
+            if watch_secs < 10:
+                return
+            profile = self.channel_profiles.setdefault(session["channel"], {})
+            if profile.get("watch_secs", 0) > CHANNEL_PROFILE_HISTORY:
+                for name in ("watch_secs", "stalls", "stall_secs"):
+                    profile[name] /= 2
+            profile["watch_secs"] = profile.get("watch_secs", 0) + watch_secs
+            profile["stalls"] = profile.get("stalls", 0) + session["stalls"]
+            profile["stall_secs"] = profile.get("stall_secs", 0) + round(
+                session["stall_secs"], 1
+            )
+            if bitrate:
+                if profile.get("bitrate"):
+                    profile["bitrate"] = round(profile["bitrate"] * 0.7 + bitrate * 0.3)
+                else:
+                    profile["bitrate"] = round(bitrate)
+            if session["stalls"]:
+                logger.info(
+                    f"Channel '{session['channel']}': {session['stalls']} stalls, "
+                    f"{session['stall_secs']:.1f}s total in {watch_secs:.0f}s"
+                )
@@ -34,6 +34,7 @@ from yuki_iptv.xdg import LOCAL_DIR
 from yuki_iptv.epg_xmltv import parse_as_xmltv
 from yuki_iptv.epg_zip import parse_epg_zip
 from yuki_iptv.requests_timeout import requests_get
+from yuki_iptv.ipc import get_ipc_worker_sender
 
 _ = gettext.gettext
 logger = logging.getLogger(__name__)
@@ -163,8 +164,9 @@ def fetch_epg(settings, catchup_days1, return_dict1):
     return [{}, programmes_epg, epg_ok, exc, prog_ids, epg_icons]
 
 
-def worker(sys_settings, catchup_days1, return_dict1):
+def worker(sys_settings, catchup_days1):
     """Worker running from multiprocess"""
+    return_dict1 = get_ipc_worker_sender()
     epg = fetch_epg(sys_settings, catchup_days1, return_dict1)
     return_dict1["epg_progress"] = _("Updating TV guide...")
     return [epg[0], epg[1], True, epg[2], epg[3], epg[4], epg[5]]
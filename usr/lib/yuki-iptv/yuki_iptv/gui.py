@@ -677,9 +677,42 @@ class YukiGUIClass:
         self.channellogos_select.addItem(_("Do not load from EPG"))
         self.channellogos_select.addItem(_("Do not load any logos"))
 
+        self.logocachesize_label = QtWidgets.QLabel("{}:".format(_("Logo cache size")))
+        self.logocachesize_choose = QtWidgets.QSpinBox()
+        self.logocachesize_choose.setMinimum(10)
+        self.logocachesize_choose.setMaximum(10000)
+        self.logocachesize_mb = QtWidgets.QLabel(_("MB"))
+
+        self.logomemorycache_label = QtWidgets.QLabel(
+            "{}:".format(_("Logo memory cache"))
+        )
+        self.logomemorycache_choose = QtWidgets.QSpinBox()
+        self.logomemorycache_choose.setMinimum(4)
+        self.logomemorycache_choose.setMaximum(1024)
+        self.logomemorycache_mb = QtWidgets.QLabel(_("MB"))
+
         self.nocacheepg_label = QtWidgets.QLabel("{}:".format(_("Do not cache EPG")))
         self.nocacheepg_flag = QtWidgets.QCheckBox()
 
+        self.xtreamshortepg_label = QtWidgets.QLabel(
+            "{}:".format(
+                _("XTream: load TV guide on demand\n(current and next programmes)")
+            )
+        )
+        self.xtreamshortepg_flag = QtWidgets.QCheckBox()
+
+        self.streamresolve_label = QtWidgets.QLabel(
+            "{}:".format(_("Remember final stream URLs\n(redirects, HLS variant)"))
+        )
+        self.streamresolve_flag = QtWidgets.QCheckBox()
+        streamresolve_tooltip = _(
+            "After a channel starts playing, its URL is requested once more\n"
+            "to remember the final address. Do not enable if your provider\n"
+            "limits connections per account."
+        )
+        self.streamresolve_label.setToolTip(streamresolve_tooltip)
+        self.streamresolve_flag.setToolTip(streamresolve_tooltip)
+
         self.scrrecnosubfolders_label = QtWidgets.QLabel(
             "{}:".format(_("Do not create screenshots\nand recordings subfolders"))
         )
@@ -843,6 +876,8 @@ class YukiGUIClass:
         self.tab_network.layout.addWidget(self.useragent_choose_2, 2, 1)
         self.tab_network.layout.addWidget(self.referer_lbl, 3, 0)
         self.tab_network.layout.addWidget(self.referer_choose, 3, 1)
+        self.tab_network.layout.addWidget(self.streamresolve_label, 4, 0)
+        self.tab_network.layout.addWidget(self.streamresolve_flag, 4, 1)
         self.tab_network.setLayout(self.tab_network.layout)
 
         self.tab_gui.layout = QtWidgets.QGridLayout()
@@ -899,6 +934,8 @@ class YukiGUIClass:
         self.tab_epg.layout.addWidget(self.donot_flag, 0, 1)
         self.tab_epg.layout.addWidget(self.nocacheepg_label, 1, 0)
         self.tab_epg.layout.addWidget(self.nocacheepg_flag, 1, 1)
+        self.tab_epg.layout.addWidget(self.xtreamshortepg_label, 2, 0)
+        self.tab_epg.layout.addWidget(self.xtreamshortepg_flag, 2, 1)
         self.tab_epg.setLayout(self.tab_epg.layout)
 
         self.tab_other.layout = QtWidgets.QGridLayout()
@@ -914,6 +951,12 @@ class YukiGUIClass:
         self.tab_other.layout.addWidget(self.volumechangestep_label, 3, 0)
         self.tab_other.layout.addWidget(self.volumechangestep_choose, 3, 1)
         self.tab_other.layout.addWidget(self.volumechangestep_percent, 3, 2)
+        self.tab_other.layout.addWidget(self.logocachesize_label, 4, 0)
+        self.tab_other.layout.addWidget(self.logocachesize_choose, 4, 1)
+        self.tab_other.layout.addWidget(self.logocachesize_mb, 4, 2)
+        self.tab_other.layout.addWidget(self.logomemorycache_label, 5, 0)
+        self.tab_other.layout.addWidget(self.logomemorycache_choose, 5, 1)
+        self.tab_other.layout.addWidget(self.logomemorycache_mb, 5, 2)
         self.tab_other.setLayout(self.tab_other.layout)
 
         self.tab_debug_warning = QtWidgets.QLabel(
@@ -1024,6 +1067,12 @@ class YukiGUIClass:
         self.panscan_choose.setSingleStep(0.1)
         self.panscan_choose.setDecimals(1)
 
+        self.channelcache_choose = QtWidgets.QSpinBox()
+        self.channelcache_choose.setMinimum(0)
+        self.channelcache_choose.setMaximum(120)
+        self.channelcache_choose.setSpecialValueText(_("Automatic"))
+        self.channelcache_learned = QtWidgets.QLabel()
+
         self.contrast_lbl = QtWidgets.QLabel("{}:".format(_("Contrast")))
         self.brightness_lbl = QtWidgets.QLabel("{}:".format(_("Brightness")))
         self.hue_lbl = QtWidgets.QLabel("{}:".format(_("Hue")))
@@ -1032,6 +1081,7 @@ class YukiGUIClass:
         self.videoaspect_lbl = QtWidgets.QLabel("{}:".format(_("Aspect ratio")))
         self.zoom_lbl = QtWidgets.QLabel("{}:".format(_("Scale / Zoom")))
         self.panscan_lbl = QtWidgets.QLabel("{}:".format(_("Pan and scan")))
+        self.channelcache_lbl = QtWidgets.QLabel("{}:".format(_("Cache")))
         self.epgname_btn = QtWidgets.QPushButton(_("EPG name"))
 
         self.referer_lbl_custom = QtWidgets.QLabel(_("HTTP Referer:"))
@@ -1133,6 +1183,14 @@ class YukiGUIClass:
         self.horizontalLayout2_11.addWidget(QtWidgets.QLabel("\n"))
         self.horizontalLayout2_11.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
 
+        self.horizontalLayout2_14 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout2_14.addWidget(QtWidgets.QLabel("\n"))
+        self.horizontalLayout2_14.addWidget(self.channelcache_lbl)
+        self.horizontalLayout2_14.addWidget(self.channelcache_choose)
+        self.horizontalLayout2_14.addWidget(self.channelcache_learned)
+        self.horizontalLayout2_14.addWidget(QtWidgets.QLabel("\n"))
+        self.horizontalLayout2_14.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+
         self.horizontalLayout2_12 = QtWidgets.QHBoxLayout()
         self.horizontalLayout2_12.addWidget(QtWidgets.QLabel("\n"))
         self.horizontalLayout2_12.addWidget(self.epgname_btn)
@@ -1158,6 +1216,7 @@ class YukiGUIClass:
         self.verticalLayout.addLayout(self.horizontalLayout2_9)
         self.verticalLayout.addLayout(self.horizontalLayout2_10)
         self.verticalLayout.addLayout(self.horizontalLayout2_11)
+        self.verticalLayout.addLayout(self.horizontalLayout2_14)
         self.verticalLayout.addLayout(self.horizontalLayout2_12)
         self.verticalLayout.addLayout(self.horizontalLayout3)
         self.verticalLayout.setAlignment(
@@ -1329,7 +1388,11 @@ class YukiGUIClass:
             "autoreconnection": self.autoreconnection_flag.isChecked(),
             "showplaylistmouse": self.showplaylistmouse_flag.isChecked(),
             "channellogos": self.channellogos_select.currentIndex(),
+            "logocachesize": self.logocachesize_choose.value(),
+            "logomemorycache": self.logomemorycache_choose.value(),
             "nocacheepg": self.nocacheepg_flag.isChecked(),
+            "xtreamshortepg": self.xtreamshortepg_flag.isChecked(),
+            "streamresolve": self.streamresolve_flag.isChecked(),
             "scrrecnosubfolders": self.scrrecnosubfolders_flag.isChecked(),
             "hidetvprogram": self.hidetvprogram_flag.isChecked(),
             "showcontrolsmouse": self.showcontrolsmouse_flag.isChecked(),
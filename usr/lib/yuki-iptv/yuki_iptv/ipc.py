@@ -0,0 +1,87 @@
+#
+# Copyright (c) 2021, 2022 Astroncia
+# Copyright (c) 2023, 2024 Liya Astrova <liyaastrova@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# Font Awesome Free 5.15.4 by @fontawesome - https://fontawesome.com
+# License - https://creativecommons.org/licenses/by/4.0/
+#
+import select
+import pickle
+import logging
+from multiprocessing import get_context
+
+logger = logging.getLogger(__name__)
+
+# Writes up to PIPE_BUF bytes are atomic, so several worker processes
+# can share one pipe without a lock (and without leaving a lock acquired
+# when a worker gets killed in the middle of a write)
+IPC_MAX_MESSAGE_SIZE = getattr(select, "PIPE_BUF", 512) - 4
+
+ipc_worker_sender = None
+
+
+class YukiIPCSender:
+    """Write end of the worker -> GUI channel, used as a write-only dict"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __setitem__(self, key, value):
+        message = pickle.dumps((key, value))
+        if len(message) > IPC_MAX_MESSAGE_SIZE:
+            logger.warning(f"IPC message '{key}' is too big, dropping it")
+            return
+        try:
+            self.conn.send_bytes(message)
+        except Exception:
+            pass
+
+
+class YukiIPCDict(dict):
+    """Local dict in GUI process, updated by messages from workers"""
+
+    def __init__(self):
+        super().__init__()
+        self.reader, writer = get_context("spawn").Pipe(duplex=False)
+        self.sender = YukiIPCSender(writer)
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def drain(self):
+        """Read all pending messages without blocking, return changed keys"""
+        changed = set()
+        try:
+            while self.reader.poll():
+                key, value = pickle.loads(self.reader.recv_bytes())
+                self[key] = value
+                changed.add(key)
+        except Exception:
+            logger.warning("Failed to read IPC message")
+        return changed
+
+
+def set_ipc_worker_sender(sender):
+    """Pool initializer, sender must be passed on process spawn"""
+    global ipc_worker_sender
+    ipc_worker_sender = sender
+
+
+def get_ipc_worker_sender():
+    return ipc_worker_sender
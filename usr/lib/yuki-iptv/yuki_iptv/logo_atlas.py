@@ -0,0 +1,294 @@
+#
+# Copyright (c) 2021, 2022 Astroncia
+# Copyright (c) 2023, 2024 Liya Astrova <liyaastrova@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# Font Awesome Free 5.15.4 by @fontawesome - https://fontawesome.com
+# License - https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import json
+import mmap
+import time
+import logging
+import threading
+from pathlib import Path
+from yuki_iptv.logo_cache import LOGO_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+try:
+    from wand.image import Image
+
+    use_wand = True
+except Exception:
+    from PIL import Image
+
+    use_wand = False
+
+LOGO_ATLAS_INDEX = str(Path(LOGO_CACHE_DIR, "atlas.json"))
+LOGO_ATLAS_VERSION = 1
+# Every logo takes one slot of 64x64 RGBA pixels
+LOGO_ATLAS_LOGO_SIZE = 64
+LOGO_ATLAS_SLOT_SIZE = LOGO_ATLAS_LOGO_SIZE * LOGO_ATLAS_LOGO_SIZE * 4
+# New logos are written in batches
+LOGO_ATLAS_BATCH_DELAY = 1
+# Atlas is rewritten when it has more unused slots than that
+LOGO_ATLAS_MIN_GARBAGE = 256
+LOGO_ATLAS_CHECK_INTERVAL = 1
+
+
+def read_logo_rgba(logo_file):
+    """Returns (width, height, RGBA pixels) or None"""
+    try:
+        if use_wand:
+            with Image(filename=logo_file) as im_logo:
+                im_logo.transform(
+                    resize=f"{LOGO_ATLAS_LOGO_SIZE}x{LOGO_ATLAS_LOGO_SIZE}>"
+                )
+                im_logo.depth = 8
+                return im_logo.width, im_logo.height, im_logo.make_blob("RGBA")
+        else:
+            with Image.open(logo_file) as im_logo:
+                im_logo.thumbnail((LOGO_ATLAS_LOGO_SIZE, LOGO_ATLAS_LOGO_SIZE))
+                im_logo = im_logo.convert("RGBA")
+                return im_logo.width, im_logo.height, im_logo.tobytes()
+    except Exception:
+        return None
+
+
+def load_atlas_index():
+    try:
+        with open(LOGO_ATLAS_INDEX, encoding="utf8") as atlas_index_file:
+            atlas_index = json.loads(atlas_index_file.read())
+        if atlas_index["version"] == LOGO_ATLAS_VERSION:
+            return atlas_index
+    except Exception:
+        pass
+    return None
+
+
+class LogoAtlasWriter:
+    """Packs cached logos into one file, runs in logo service process
+
+    Slots are only appended, so GUI can read atlas while it is written.
+    Replaced and removed logos are dropped when atlas is rewritten
+    into a new file.
+    """
+
+    def __init__(self, logo_files):
+        self.cond = threading.Condition()
+        self.pending = set(logo_files)
+        # Logos removed from disk cache, their slots become unused
+        self.removed = set()
+        self.compact_requested = False
+        self.atlas_file = None
+        self.slots = 0
+        # logo file relative to cache dir -> [slot, width, height, mtime]
+        self.logos = {}
+        atlas_index = load_atlas_index()
+        if atlas_index:
+            atlas_path = os.path.join(LOGO_CACHE_DIR, atlas_index["atlas"])
+            try:
+                if (
+                    os.path.getsize(atlas_path)
+                    >= atlas_index["slots"] * LOGO_ATLAS_SLOT_SIZE
+                ):
+                    self.atlas_file = atlas_index["atlas"]
+                    self.slots = atlas_index["slots"]
+                    self.logos = atlas_index["logos"]
+            except Exception:
+                pass
+        if not self.atlas_file:
+            self.new_atlas_file()
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def new_atlas_file(self):
+        self.atlas_file = f"atlas-{int(time.time() * 1000)}.bin"
+        open(os.path.join(LOGO_CACHE_DIR, self.atlas_file), "wb").close()
+        self.slots = 0
+        self.logos = {}
+
+    def add(self, logo_file):
+        with self.cond:
+            self.pending.add(logo_file)
+            self.cond.notify()
+
+    def remove(self, logo_file):
+        with self.cond:
+            self.removed.add(os.path.relpath(logo_file, LOGO_CACHE_DIR))
+            self.cond.notify()
+
+    def compact(self):
+        with self.cond:
+            self.compact_requested = True
+            self.cond.notify()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while (
+                    not self.pending and not self.removed and not self.compact_requested
+                ):
+                    self.cond.wait()
+            time.sleep(LOGO_ATLAS_BATCH_DELAY)
+            with self.cond:
+                logo_files = self.pending
+                self.pending = set()
+                removed = self.removed
+                self.removed = set()
+                compact_requested = self.compact_requested
+                self.compact_requested = False
+            try:
+                self.update(logo_files, removed, compact_requested)
+            except Exception:
+                logger.warning("Failed to update logo atlas")
+
+    def update(self, logo_files, removed, compact_requested):
+        changed = False
+        for logo_key in removed:
+            if self.logos.pop(logo_key, None):
+                changed = True
+        if compact_requested or (
+            self.slots - len(self.logos) > max(LOGO_ATLAS_MIN_GARBAGE, len(self.logos))
+        ):
+            self.rewrite()
+            changed = True
+        with open(os.path.join(LOGO_CACHE_DIR, self.atlas_file), "ab") as atlas:
+            for logo_file in logo_files:
+                logo_key = os.path.relpath(logo_file, LOGO_CACHE_DIR)
+                try:
+                    logo_mtime = os.path.getmtime(logo_file)
+                except Exception:
+                    continue
+                if logo_key in self.logos and self.logos[logo_key][3] == logo_mtime:
+                    continue
+                logo_rgba = read_logo_rgba(logo_file)
+                if not logo_rgba:
+                    continue
+                width, height, pixels = logo_rgba
+                atlas.write(pixels.ljust(LOGO_ATLAS_SLOT_SIZE, b"\0"))
+                # Old slot of replaced logo is left unused
+                self.logos[logo_key] = [self.slots, width, height, logo_mtime]
+                self.slots += 1
+                changed = True
+        if changed:
+            self.save()
+
+    def rewrite(self):
+        """Copy logos which are still in cache into new atlas file"""
+        old_atlas_path = os.path.join(LOGO_CACHE_DIR, self.atlas_file)
+        old_logos = self.logos
+        self.new_atlas_file()
+        with open(old_atlas_path, "rb") as old_atlas, open(
+            os.path.join(LOGO_CACHE_DIR, self.atlas_file), "ab"
+        ) as atlas:
+            for logo_key, entry in old_logos.items():
+                try:
+                    logo_mtime = os.path.getmtime(
+                        os.path.join(LOGO_CACHE_DIR, logo_key)
+                    )
+                except Exception:
+                    continue
+                if logo_mtime != entry[3]:
+                    continue
+                old_atlas.seek(entry[0] * LOGO_ATLAS_SLOT_SIZE)
+                atlas.write(old_atlas.read(LOGO_ATLAS_SLOT_SIZE))
+                self.logos[logo_key] = [self.slots] + entry[1:]
+                self.slots += 1
+        self.save()
+        # GUI keeps old file mapped until it reads new index
+        try:
+            os.remove(old_atlas_path)
+        except Exception:
+            pass
+        logger.info(
+            f"Logo atlas rewritten, {len(self.logos)} of {len(old_logos)} logos kept"
+        )
+
+    def save(self):
+        try:
+            with open(LOGO_ATLAS_INDEX + ".tmp", "w", encoding="utf8") as index_file:
+                index_file.write(
+                    json.dumps(
+                        {
+                            "version": LOGO_ATLAS_VERSION,
+                            "atlas": self.atlas_file,
+                            "slots": self.slots,
+                            "logos": self.logos,
+                        }
+                    )
+                )
+            os.replace(LOGO_ATLAS_INDEX + ".tmp", LOGO_ATLAS_INDEX)
+        except Exception:
+            logger.warning("Failed to save logo atlas index")
+
+
+class LogoAtlasReader:
+    """Memory-mapped atlas in GUI process"""
+
+    def __init__(self):
+        self.logos = {}
+        self.index_mtime = None
+        self.atlas_file = None
+        self.atlas_map = None
+        self.last_check = 0
+
+    def refresh(self):
+        current_time = time.time()
+        if current_time - self.last_check < LOGO_ATLAS_CHECK_INTERVAL:
+            return
+        self.last_check = current_time
+        try:
+            index_mtime = os.path.getmtime(LOGO_ATLAS_INDEX)
+        except Exception:
+            return
+        if index_mtime == self.index_mtime:
+            return
+        self.index_mtime = index_mtime
+        atlas_index = load_atlas_index()
+        if not atlas_index:
+            return
+        try:
+            with open(
+                os.path.join(LOGO_CACHE_DIR, atlas_index["atlas"]), "rb"
+            ) as atlas:
+                if os.fstat(atlas.fileno()).st_size:
+                    atlas_map = mmap.mmap(atlas.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    atlas_map = None
+        except Exception:
+            return
+        if self.atlas_map:
+            self.atlas_map.close()
+        self.atlas_map = atlas_map
+        self.atlas_file = atlas_index["atlas"]
+        self.logos = atlas_index["logos"]
+
+    def get(self, logo_file):
+        """Returns (width, height, RGBA pixels) or None"""
+        if not self.atlas_map or not logo_file.startswith(LOGO_CACHE_DIR):
+            return None
+        entry = self.logos.get(os.path.relpath(logo_file, LOGO_CACHE_DIR))
+        if not entry:
+            return None
+        slot, width, height = entry[:3]
+        offset = slot * LOGO_ATLAS_SLOT_SIZE
+        if offset + width * height * 4 > len(self.atlas_map):
+            return None
+        return width, height, self.atlas_map[offset : offset + width * height * 4]
@@ -0,0 +1,245 @@
+#
+# Copyright (c) 2021, 2022 Astroncia
+# Copyright (c) 2023, 2024 Liya Astrova <liyaastrova@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# Font Awesome Free 5.15.4 by @fontawesome - https://fontawesome.com
+# License - https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import json
+import time
+import base64
+import hashlib
+import logging
+from pathlib import Path
+from yuki_iptv.xdg import LOCAL_DIR
+
+logger = logging.getLogger(__name__)
+
+LOGO_CACHE_DIR = str(Path(LOCAL_DIR, "logo_cache"))
+LOGO_CACHE_INDEX_VERSION = 1
+# Logos older than that are fetched again
+LOGO_CACHE_TTL = 7 * 86400
+# Trim leaves the cache at half of the size limit
+LOGO_CACHE_TRIM_RATIO = 0.5
+# Going over the size limit evicts down to that, so evictions are batched
+LOGO_CACHE_EVICT_RATIO = 0.9
+# Index with only access times changed is saved not more often than that
+LOGO_CACHE_ACCESS_SAVE_INTERVAL = 10 * 60
+# Qt loads "name@2x.png" automatically for HiDPI screens
+LOGO_CACHE_2X_SUFFIX = "@2x.png"
+
+
+def get_logo_hash(logo_url):
+    base64_enc = base64.b64encode(bytes(logo_url, "utf-8")).decode("utf-8")
+    return str(hashlib.sha512(bytes(base64_enc, "utf-8")).hexdigest())
+
+
+def get_logo_2x_file(logo_file):
+    return logo_file[: -len(".png")] + LOGO_CACHE_2X_SUFFIX
+
+
+def get_logo_files_size(logo_file):
+    """Size of 1x and 2x logo files"""
+    logo_size = os.path.getsize(logo_file)
+    logo_2x_file = get_logo_2x_file(logo_file)
+    if os.path.isfile(logo_2x_file):
+        logo_size += os.path.getsize(logo_2x_file)
+    return logo_size
+
+
+class LogoDiskCache:
+    """Logo thumbnails, sharded by hash, with index and size limit"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.index_file = str(Path(LOGO_CACHE_DIR, "index.json"))
+        # hash -> [file, size, last access, fetch time]
+        self.index = {}
+        self.size = 0
+        self.changed = False
+        self.accessed = False
+        self.save_time = time.time()
+        # Called with logo file when logo is removed from cache
+        self.on_remove = None
+        Path(LOGO_CACHE_DIR).mkdir(parents=True, exist_ok=True)
+        try:
+            with open(self.index_file, encoding="utf8") as index_file:
+                index_json = json.loads(index_file.read())
+            if index_json["version"] != LOGO_CACHE_INDEX_VERSION:
+                raise Exception("Logo cache index version changed")
+            self.index = index_json["index"]
+        except Exception:
+            self.rebuild()
+        self.size = sum(entry[1] for entry in self.index.values())
+
+    def rebuild(self):
+        logger.info("Rebuilding logo cache index...")
+        self.index = {}
+        current_time = time.time()
+        for cache_file in os.listdir(LOGO_CACHE_DIR):
+            cache_path = os.path.join(LOGO_CACHE_DIR, cache_file)
+            try:
+                if os.path.isdir(cache_path):
+                    for shard_file in os.listdir(cache_path):
+                        if not shard_file.endswith(".png") or shard_file.endswith(
+                            LOGO_CACHE_2X_SUFFIX
+                        ):
+                            continue
+                        logo_hash = shard_file.split(".")[0]
+                        shard_path = os.path.join(cache_path, shard_file)
+                        file_stat = os.stat(shard_path)
+                        self.index[logo_hash] = [
+                            os.path.join(cache_file, shard_file),
+                            get_logo_files_size(shard_path),
+                            file_stat.st_mtime,
+                            file_stat.st_mtime,
+                        ]
+                elif cache_file.endswith(".png") and len(cache_file) == 132:
+                    # Flat cache from older versions, move it into shard
+                    logo_hash = cache_file.split(".")[0]
+                    logo_file = self.get_file(logo_hash)
+                    os.replace(cache_path, logo_file)
+                    self.index[logo_hash] = [
+                        os.path.relpath(logo_file, LOGO_CACHE_DIR),
+                        os.path.getsize(logo_file),
+                        current_time,
+                        current_time,
+                    ]
+            except Exception:
+                pass
+        self.changed = True
+
+    def get_file(self, logo_hash):
+        shard_dir = os.path.join(LOGO_CACHE_DIR, logo_hash[:2])
+        if not os.path.isdir(shard_dir):
+            os.mkdir(shard_dir)
+        return os.path.join(shard_dir, f"{logo_hash}.png")
+
+    def get(self, logo_url):
+        """Returns (file, is fresh) or None if logo is not cached"""
+        logo_hash = get_logo_hash(logo_url)
+        if logo_hash not in self.index:
+            return None
+        entry = self.index[logo_hash]
+        current_time = time.time()
+        entry[2] = current_time
+        self.accessed = True
+        return (
+            os.path.join(LOGO_CACHE_DIR, entry[0]),
+            current_time - entry[3] < LOGO_CACHE_TTL,
+        )
+
+    def add(self, logo_url, logo_file):
+        logo_hash = get_logo_hash(logo_url)
+        if logo_hash in self.index:
+            self.size -= self.index[logo_hash][1]
+        current_time = time.time()
+        logo_size = get_logo_files_size(logo_file)
+        self.index[logo_hash] = [
+            os.path.relpath(logo_file, LOGO_CACHE_DIR),
+            logo_size,
+            current_time,
+            current_time,
+        ]
+        self.size += logo_size
+        self.changed = True
+        if self.size > self.max_size:
+            self.evict(int(self.max_size * LOGO_CACHE_EVICT_RATIO))
+
+    def remove(self, logo_hash):
+        entry = self.index.pop(logo_hash)
+        self.size -= entry[1]
+        self.changed = True
+        logo_file = os.path.join(LOGO_CACHE_DIR, entry[0])
+        for remove_file in (logo_file, get_logo_2x_file(logo_file)):
+            try:
+                os.remove(remove_file)
+            except Exception:
+                pass
+        if self.on_remove:
+            self.on_remove(logo_file)
+
+    def evict(self, target_size):
+        """Remove least recently used logos until cache fits target size"""
+        for logo_hash in sorted(self.index, key=lambda x: self.index[x][2]):
+            if self.size <= target_size:
+                break
+            self.remove(logo_hash)
+
+    def trim(self):
+        logger.info("Trimming logo cache...")
+        size_before = self.size
+        current_time = time.time()
+        for logo_hash in list(self.index):
+            entry = self.index[logo_hash]
+            if current_time - entry[3] > LOGO_CACHE_TTL or not os.path.isfile(
+                os.path.join(LOGO_CACHE_DIR, entry[0])
+            ):
+                self.remove(logo_hash)
+        self.evict(int(self.max_size * LOGO_CACHE_TRIM_RATIO))
+        # Files not in index
+        indexed_files = set(entry[0] for entry in self.index.values())
+        for cache_file in os.listdir(LOGO_CACHE_DIR):
+            cache_path = os.path.join(LOGO_CACHE_DIR, cache_file)
+            try:
+                if os.path.isdir(cache_path):
+                    for shard_file in os.listdir(cache_path):
+                        shard_path = os.path.join(cache_file, shard_file)
+                        # 2x logo belongs to 1x logo entry
+                        indexed_path = shard_path.replace(LOGO_CACHE_2X_SUFFIX, ".png")
+                        if (
+                            shard_file.endswith(".png")
+                            and indexed_path not in indexed_files
+                        ):
+                            os.remove(os.path.join(LOGO_CACHE_DIR, shard_path))
+                elif cache_file.endswith(".png"):
+                    os.remove(cache_path)
+            except Exception:
+                pass
+        self.save(force=True)
+        logger.info(
+            f"Logo cache trimmed, {size_before - self.size} bytes freed, "
+            f"{self.size} bytes used"
+        )
+
+    def save(self, force=False):
+        if not self.changed and not (
+            self.accessed
+            and (
+                force or time.time() - self.save_time > LOGO_CACHE_ACCESS_SAVE_INTERVAL
+            )
+        ):
+            return
+        self.changed = False
+        self.accessed = False
+        self.save_time = time.time()
+        try:
+            with open(self.index_file + ".tmp", "w", encoding="utf8") as index_file:
+                index_file.write(
+                    json.dumps(
+                        {
+                            "version": LOGO_CACHE_INDEX_VERSION,
+                            "index": self.index,
+                        }
+                    )
+                )
+            os.replace(self.index_file + ".tmp", self.index_file)
+        except Exception:
+            logger.warning("Failed to save logo cache index")
@@ -0,0 +1,101 @@
+#
+# Copyright (c) 2021, 2022 Astroncia
+# Copyright (c) 2023, 2024 Liya Astrova <liyaastrova@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# Font Awesome Free 5.15.4 by @fontawesome - https://fontawesome.com
+# License - https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import logging
+from collections import OrderedDict
+from yuki_iptv.qt import get_qt_library
+from yuki_iptv.logo_atlas import LogoAtlasReader
+
+qt_library, QtWidgets, QtCore, QtGui, QShortcut, QtOpenGLWidgets = get_qt_library()
+
+logger = logging.getLogger(__name__)
+
+# SVG icons are rendered on demand, count them as 64x64 RGBA
+SVG_ICON_SIZE = 64 * 64 * 4
+
+
+class LogoPixmapCache:
+    """Decoded logos, least recently used are dropped over memory limit"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        # filename -> [icon, size]
+        self.icons = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.atlas = LogoAtlasReader()
+        self.atlas_hits = 0
+
+    def get(self, pixmap_filename):
+        if pixmap_filename in self.icons:
+            self.hits += 1
+            self.icons.move_to_end(pixmap_filename)
+            return self.icons[pixmap_filename][0]
+        self.misses += 1
+        try:
+            self.atlas.refresh()
+            # Atlas has 1x logos only, HiDPI screens use 2x logo files
+            atlas_logo = None
+            if QtWidgets.QApplication.instance().devicePixelRatio() <= 1:
+                atlas_logo = self.atlas.get(pixmap_filename)
+            if atlas_logo:
+                width, height, pixels = atlas_logo
+                image = QtGui.QImage(
+                    pixels,
+                    width,
+                    height,
+                    width * 4,
+                    QtGui.QImage.Format.Format_RGBA8888,
+                ).copy()
+                icon = QtGui.QIcon(QtGui.QPixmap.fromImage(image))
+                icon_size = width * height * 4
+                self.atlas_hits += 1
+            elif not os.path.isfile(pixmap_filename):
+                return None
+            elif pixmap_filename.lower().endswith(".svg"):
+                icon = QtGui.QIcon(pixmap_filename)
+                icon_size = SVG_ICON_SIZE
+            else:
+                # QIcon also loads "@2x" logo if it exists
+                icon = QtGui.QIcon(pixmap_filename)
+                icon_sizes = icon.availableSizes()
+                if not icon_sizes:
+                    return None
+                icon_size = sum(size.width() * size.height() * 4 for size in icon_sizes)
+        except Exception:
+            return None
+        self.icons[pixmap_filename] = [icon, icon_size]
+        self.size += icon_size
+        while self.size > self.max_size and len(self.icons) > 1:
+            self.size -= self.icons.popitem(last=False)[1][1]
+        return icon
+
+    def log_stats(self):
+        logger.debug(
+            f"Logo pixmap cache: {len(self.icons)} icons, "
+            f"{self.size // 1024} KB / {self.max_size // 1024} KB, "
+            f"{self.hits} hits, {self.misses} misses "
+            f"({self.atlas_hits} loaded from atlas)"
+        )
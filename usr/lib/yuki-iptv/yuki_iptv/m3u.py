@@ -107,8 +107,8 @@ class M3UParser:
             title = title_regex[1].strip()
         return title
 
-    def parse_channel(self, line_info, ch_url, overrides):
-        """Parse EXTINF channel info"""
+    def apply_udp_proxy(self, ch_url):
+        """Rewrite udp:// and rtp:// URL to UDP proxy URL"""
         if self.udp_proxy and (
             ch_url.startswith("udp://") or ch_url.startswith("rtp://")
         ):
@@ -119,6 +119,11 @@ class M3UParser:
             )
             ch_url = ch_url.replace("//udp/", "/udp/").replace("//rtp/", "/rtp/")
             ch_url = ch_url.replace("@", "")
+        return ch_url
+
+    def parse_channel(self, line_info, ch_url, overrides):
+        """Parse EXTINF channel info"""
+        ch_url = self.apply_udp_proxy(ch_url)
 
         tvg_url = self.parse_regexp("tvg-url", line_info)
         url_tvg = self.parse_regexp("url-tvg", line_info)
@@ -38,6 +38,14 @@ TVGUIDE_WIDTH = int(WINDOW_SIZE[0] / 5)
 BCOLOR = "#A2A3A3"
 
 UPDATE_BR_INTERVAL = 5
+# Xtream movies and series are loaded in background after that (ms),
+# or when Movies or Series tab is opened
+XTREAM_VOD_LOAD_DELAY = 3000
+# Account expiration dates are checked again after that many seconds
+XTREAM_EXPIRATION_TTL = 600
+XTREAM_EXPIRATION_THREADS = 4
+# Series info is prefetched for that many neighbours on each side
+XTREAM_SERIES_PREFETCH_COUNT = 3
 
 AUDIO_SAMPLE_FORMATS = {
     "u16": "unsigned 16 bits",
@@ -64,7 +72,6 @@ class YukiData:
     aot_action = None
     archive_epg = None
     array = None
-    channel_logos_process = None
     channel_logos_request_old = None
     channel_sets = None
     channel_sort = None
@@ -100,6 +107,8 @@ class YukiData:
     ic1 = None
     ic2 = None
     ic3 = None
+    ipc_dict = None
+    ipc_notifier = None
     isControlPanelVisible = None
     isPlaylistVisible = None
     is_recording = None
@@ -107,12 +116,12 @@ class YukiData:
     item_selected = None
     last_cursor_moved = None
     last_cursor_time = None
+    logos_service_conn = None
+    logos_service_process = None
     main_keybinds = None
     menubar_state = None
-    movie_logos_process = None
     movie_logos_request_old = None
     mpv_osc_enabled = None
-    mp_manager_dict = None
     old_value = None
     player = None
     player_tracks = None
@@ -156,6 +165,7 @@ class YukiData:
     use_dark_icon_theme = False
     playmodeIndex = 0
     serie_selected = False
+    series_logos_request_old = None
     movies = {}
     series = {}
     osc = -1
@@ -167,10 +177,18 @@ class YukiData:
     check_playlist_visible = False
     check_controlpanel_visible = False
     rewind_value = None
-    xtream_list_old = set()
     xtream_list_lock = False
     xtream_expiration_list = {}
+    # Playlist URL -> (check time, expiration date)
+    xtream_expiration_cache = {}
     is_xtream = False
+    # "pending" or "loading" while Xtream movies and series are not loaded
+    xtream_vod_state = ""
+    # Channel name -> stream ID, only when Xtream short EPG is used
+    xtream_stream_ids = {}
+    xtream_short_epg = None
+    # Short EPG replaces TV guide for this session, epg setting is kept
+    use_xtream_short_epg = False
     # MPRIS
     mpris_loop = None
     mpris_ready = False
@@ -26,7 +26,7 @@ import logging
 import chardet
 import traceback
 from yuki_iptv.qt import get_qt_library, show_exception
-from yuki_iptv.xtreamtom3u import convert_xtream_to_m3u
+from yuki_iptv.xtreamtom3u import convert_xtream_to_channels
 from yuki_iptv.requests_timeout import requests_get
 from yuki_iptv.m3u import M3UParser
 from yuki_iptv.xspf import parse_xspf
@@ -45,6 +45,28 @@ class EmptyClass:
     pass
 
 
+def load_xtream_vod(_, settings, xt):
+    """Load Xtream movies and series, returns (movies, series)
+
+    Runs in background thread after main window is shown
+    """
+    movies = {}
+    series = {}
+    xt.load_iptv((xt.vod_type, xt.series_type))
+    try:
+        for movie in convert_xtream_to_channels(
+            _, xt.movies, "VOD", settings["udp_proxy"]
+        ):
+            movies[movie["title"]] = movie
+    except Exception:
+        logger.warning("XTream movies parse FAILED")
+    for movie1 in xt.series:
+        if isinstance(movie1, Serie):
+            series[movie1.name] = movie1
+    logger.info(f"XTream {len(movies)} movies, {len(series)} series loaded")
+    return movies, series
+
+
 def load_playlist(_, settings, YukiData, load_xtream, channel_sets, channel_sort):
     (
         qt_library,
@@ -56,6 +78,8 @@ def load_playlist(_, settings, YukiData, load_xtream, channel_sets, channel_sort
     ) = get_qt_library()
 
     m3u = ""
+    # Xtream channel records, used instead of m3u
+    xtream_channels = []
     array = {}
     groups = []
 
@@ -74,22 +98,43 @@ def load_playlist(_, settings, YukiData, load_xtream, channel_sets, channel_sort
             )
             if xt.auth_data != {}:
                 try:
-                    xt.load_iptv()
-                    m3u = convert_xtream_to_m3u(_, xt.channels)
-                    try:
-                        m3u += convert_xtream_to_m3u(_, xt.movies, True, "VOD")
-                    except Exception:
-                        logger.warning("XTream movies parse FAILED")
-                    for movie1 in xt.series:
-                        if isinstance(movie1, Serie):
-                            YukiData.series[movie1.name] = movie1
+                    # Live TV is processed while VOD and series are downloading,
+                    # they are loaded later with load_xtream_vod
+                    xt.load_iptv((xt.live_type,))
+                    xmltv_url = (
+                        f"{xtream_url}/xmltv.php?username="
+                        f"{xtream_username}&password={xtream_password}"
+                    )
+                    # xmltv.php may be saved to settings on first start
+                    use_short_epg = settings["xtreamshortepg"] and (
+                        not settings["epg"] or settings["epg"] == xmltv_url
+                    )
+                    if xt.channels:
+                        xtream_channels = convert_xtream_to_channels(
+                            _,
+                            xt.channels,
+                            udp_proxy=settings["udp_proxy"],
+                            stream_ids=(
+                                YukiData.xtream_stream_ids if use_short_epg else None
+                            ),
+                        )
+                        YukiData.xtream_vod_state = "pending"
+                    else:
+                        # Nothing to show without movies and series
+                        xt.load_iptv((xt.vod_type, xt.series_type))
+                        xtream_channels = convert_xtream_to_channels(
+                            _, xt.movies, "VOD", settings["udp_proxy"]
+                        )
+                        for movie1 in xt.series:
+                            if isinstance(movie1, Serie):
+                                YukiData.series[movie1.name] = movie1
                     logger.info("XTream init done")
-                    if not settings["epg"]:
+                    if use_short_epg and YukiData.xtream_stream_ids:
+                        logger.info("EPG not specified, using XTream short EPG")
+                        YukiData.use_xtream_short_epg = True
+                    elif not settings["epg"]:
                         logger.info("EPG not specified, using XTream xmltv.php")
-                        settings["epg"] = (
-                            f"{xtream_url}/xmltv.php?username="
-                            f"{xtream_username}&password={xtream_password}"
-                        )
+                        settings["epg"] = xmltv_url
                 except Exception:
                     exc = traceback.format_exc()
                     logger.warning(exc)
@@ -217,12 +262,14 @@ def load_playlist(_, settings, YukiData, load_xtream, channel_sets, channel_sort
 
     m3u_parser = M3UParser(settings["udp_proxy"], _)
     epg_url = ""
-    if m3u:
+    if m3u or xtream_channels:
         try:
             is_xspf = '<?xml version="' in m3u and (
                 "http://xspf.org/" in m3u or "https://xspf.org/" in m3u
             )
-            if not is_xspf:
+            if xtream_channels:
+                m3u_data0 = [xtream_channels, ""]
+            elif not is_xspf:
                 m3u_data0 = m3u_parser.parse_m3u(m3u)
             else:
                 m3u_data0 = parse_xspf(m3u)
@@ -255,12 +302,14 @@ def load_playlist(_, settings, YukiData, load_xtream, channel_sets, channel_sort
             logger.warning("Playlist parsing error!" + "\n" + traceback.format_exc())
             show_exception(traceback.format_exc(), _("Playlist loading error!"))
             m3u = ""
+            xtream_channels = []
             array = {}
             groups = []
 
     # Memory optimize
-    m3u_exists = not not m3u
+    m3u_exists = not not (m3u or xtream_channels)
     m3u = ""
+    xtream_channels = []
 
     logger.info(
         "{} channels, {} groups, {} movies, {} series".format(
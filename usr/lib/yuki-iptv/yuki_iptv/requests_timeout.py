@@ -28,7 +28,7 @@ import requests
 # https://stackoverflow.com/questions/21965484/timeout-for-python-requests-get-entire-response/71453648#71453648
 
 
-def requests_get(*args, **kwargs):
+def requests_get(*args, session=None, **kwargs):
     def trace_func(frame, event, arg):
         if time.time() - start_time > 20:
             raise Exception("Timeout 20 seconds exceeded")
@@ -39,7 +39,7 @@ def requests_get(*args, **kwargs):
     sys.settrace(trace_func)
 
     try:
-        result = requests.get(*args, **kwargs)
+        result = (session if session else requests).get(*args, **kwargs)
     except Exception:
         raise
     finally:
@@ -55,7 +55,10 @@ def parse_settings():
         "autoreconnection": False,
         "showplaylistmouse": True,
         "channellogos": 0,
+        "logocachesize": 100,
+        "logomemorycache": 32,
         "nocacheepg": False,
+        "xtreamshortepg": False,
         "scrrecnosubfolders": False,
         "hidetvprogram": False,
         "showcontrolsmouse": True,
@@ -68,6 +71,7 @@ def parse_settings():
         "zoom": 0,
         "panscan": 0.0,
         "referer": "",
+        "streamresolve": False,
         "gui": 0,
         "uuid": False,
     }
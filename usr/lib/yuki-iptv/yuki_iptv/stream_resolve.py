@@ -0,0 +1,181 @@
+#
+# Copyright (c) 2021, 2022 Astroncia
+# Copyright (c) 2023, 2024 Liya Astrova <liyaastrova@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# Font Awesome Free 5.15.4 by @fontawesome - https://fontawesome.com
+# License - https://creativecommons.org/licenses/by/4.0/
+#
+import time
+import logging
+import threading
+from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor
+from yuki_iptv.requests_timeout import requests_get
+
+logger = logging.getLogger(__name__)
+
+# Redirect targets and HLS variant playlists often carry expiring tokens
+STREAM_RESOLVE_TTL = 5 * 60
+STREAM_RESOLVE_TIMEOUT = 3
+# Cached URL is checked before it is played, playback waits for it
+STREAM_RESOLVE_VALIDATE_TIMEOUT = 2
+STREAM_RESOLVE_MAX_PLAYLIST_SIZE = 512 * 1024
+STREAM_RESOLVE_THREADS = 2
+
+
+def parse_hls_attributes(line):
+    attributes = {}
+    for attribute in line.split(":", 1)[-1].split(","):
+        if "=" in attribute:
+            name, value = attribute.split("=", 1)
+            attributes[name.strip()] = value.strip().strip('"')
+    return attributes
+
+
+def select_hls_variant(playlist):
+    """Return (URI, bandwidth) of the best variant of HLS master playlist
+
+    mpv selects the highest bitrate variant by default, so do the same.
+    None if the playlist is not a master playlist, or variants depend on
+    separate audio / subtitle renditions which mpv loads from master only.
+    """
+    best = None
+    bandwidth = None
+    for line in playlist.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-MEDIA:") and "URI=" in line:
+            return None
+        if line.startswith("#EXT-X-STREAM-INF:"):
+            try:
+                bandwidth = int(parse_hls_attributes(line).get("BANDWIDTH", 0))
+            except ValueError:
+                bandwidth = 0
+        elif line and not line.startswith("#") and bandwidth is not None:
+            if not best or bandwidth > best[1]:
+                best = (line, bandwidth)
+            bandwidth = None
+    return best
+
+
+def resolve_stream_url(url, headers):
+    """Follow HTTP redirects and HLS master playlist, return (URL, bandwidth)"""
+    req = requests_get(
+        url,
+        headers=headers,
+        stream=True,
+        timeout=(STREAM_RESOLVE_TIMEOUT, STREAM_RESOLVE_TIMEOUT),
+    )
+    try:
+        if req.status_code >= 400:
+            raise Exception(f"HTTP status {req.status_code}")
+        resolved_url = req.url
+        content_type = req.headers.get("Content-Type", "").lower()
+        if "mpegurl" not in content_type and not (
+            urlparse(resolved_url).path.lower().endswith(".m3u8")
+        ):
+            return resolved_url, None
+        playlist = b""
+        for chunk in req.iter_content(chunk_size=65536):
+            playlist += chunk
+            if len(playlist) > STREAM_RESOLVE_MAX_PLAYLIST_SIZE:
+                return resolved_url, None
+    finally:
+        req.close()
+    variant = select_hls_variant(playlist.decode("utf-8", errors="replace"))
+    if not variant:
+        return resolved_url, None
+    return urljoin(resolved_url, variant[0]), variant[1]
+
+
+def validate_stream_url(url, headers):
+    """Check that resolved URL still answers, only the first byte is requested"""
+    req = requests_get(
+        url,
+        headers=dict(headers, Range="bytes=0-0"),
+        stream=True,
+        timeout=(STREAM_RESOLVE_VALIDATE_TIMEOUT, STREAM_RESOLVE_VALIDATE_TIMEOUT),
+    )
+    try:
+        return req.status_code < 400
+    finally:
+        req.close()
+
+
+class StreamResolveCache:
+    """Channel name -> final stream URL, resolved in background
+
+    Cache is filled after the original URL was played once, next plays
+    of the channel skip the redirects and master playlist round trips
+    """
+
+    def __init__(self):
+        self.cache = {}
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=STREAM_RESOLVE_THREADS)
+
+    def get(self, channel_name, url):
+        with self.lock:
+            if channel_name not in self.cache:
+                return None
+            original_url, resolved_url, resolved_time = self.cache[channel_name]
+            if original_url != url or time.time() - resolved_time > STREAM_RESOLVE_TTL:
+                self.cache.pop(channel_name)
+                return None
+            return resolved_url
+
+    def invalidate(self, channel_name):
+        with self.lock:
+            self.cache.pop(channel_name, None)
+
+    def validate(self, channel_name, resolved_url, headers):
+        """False if cached URL does not answer, the entry is dropped then"""
+        try:
+            if validate_stream_url(resolved_url, headers):
+                return True
+        except Exception:
+            pass
+        logger.warning(f"Cached stream URL for '{channel_name}' is not valid anymore")
+        self.invalidate(channel_name)
+        return False
+
+    def request(self, channel_name, url, headers):
+        with self.lock:
+            if channel_name in self.pending:
+                return
+            self.pending.add(channel_name)
+        self.executor.submit(self.resolve, channel_name, url, headers)
+
+    def resolve(self, channel_name, url, headers):
+        try:
+            resolve_start = time.time()
+            resolved_url, bandwidth = resolve_stream_url(url, headers)
+            with self.lock:
+                self.cache[channel_name] = (url, resolved_url, time.time())
+            if resolved_url != url:
+                variant = f", variant {bandwidth} bps" if bandwidth else ""
+                logger.info(
+                    f"Stream URL for '{channel_name}' resolved in "
+                    f"{time.time() - resolve_start:.2f}s{variant}"
+                )
+        except Exception:
+            logger.warning(f"Failed to resolve stream URL for '{channel_name}'")
+        finally:
+            with self.lock:
+                self.pending.discard(channel_name)
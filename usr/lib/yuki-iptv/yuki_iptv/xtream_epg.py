@@ -0,0 +1,148 @@
+#
+# Copyright (c) 2021, 2022 Astroncia
+# Copyright (c) 2023, 2024 Liya Astrova <liyaastrova@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# Font Awesome Free 5.15.4 by @fontawesome - https://fontawesome.com
+# License - https://creativecommons.org/licenses/by/4.0/
+#
+import time
+import base64
+import logging
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Short EPG of a stream is requested again after that many seconds,
+# or earlier if all cached programmes are already over
+XTREAM_SHORT_EPG_TTL = 30 * 60
+XTREAM_SHORT_EPG_LIMIT = 10
+XTREAM_SHORT_EPG_THREADS = 4
+
+
+def decode_short_epg_text(text):
+    if not text:
+        return ""
+    try:
+        return base64.b64decode(text).decode("utf-8")
+    except Exception:
+        return str(text)
+
+
+def parse_short_epg(short_epg):
+    """Convert get_short_epg answer to TV guide programmes"""
+    programmes = []
+    try:
+        epg_listings = short_epg["epg_listings"]
+    except Exception:
+        epg_listings = []
+    for listing in epg_listings:
+        try:
+            start = int(listing["start_timestamp"])
+            stop = int(listing["stop_timestamp"])
+        except Exception:
+            continue
+        programmes.append(
+            {
+                "start": start,
+                "stop": stop,
+                "title": decode_short_epg_text(listing.get("title")),
+                "desc": decode_short_epg_text(listing.get("description")),
+                "catchup-id": "",
+            }
+        )
+    programmes.sort(key=lambda programme: programme["start"])
+    return programmes
+
+
+class XtreamShortEPG:
+    """TV guide loaded on demand with Xtream get_short_epg, per stream"""
+
+    def __init__(self, xt, callback):
+        self.xt = xt
+        # Called from worker thread with {EPG name: programmes} for each request
+        self.callback = callback
+        # Stream ID -> (load time, programmes)
+        self.cache = {}
+        self.pending = set()
+        self.cancellable = []
+        # Reentrant, cancel() runs done callbacks in the calling thread
+        self.lock = threading.RLock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=XTREAM_SHORT_EPG_THREADS, thread_name_prefix="xtream_epg"
+        )
+
+    def is_fresh(self, stream_id):
+        if stream_id not in self.cache:
+            return False
+        load_time, programmes = self.cache[stream_id]
+        if time.time() - load_time > XTREAM_SHORT_EPG_TTL:
+            return False
+        return not programmes or programmes[-1]["stop"] > time.time()
+
+    def load(self, stream_id):
+        try:
+            return parse_short_epg(
+                self.xt.liveEpgByStreamAndLimit(stream_id, XTREAM_SHORT_EPG_LIMIT)
+            )
+        except Exception:
+            logger.warning(f"Failed to load short EPG for stream {stream_id}")
+            return []
+
+    def request(self, streams, cancel_previous=True):
+        """Load short EPG for {EPG name: stream ID} which is not cached yet
+
+        Requests not started yet are cancelled by next request
+        with cancel_previous, so scrolling does not build a queue
+        """
+        with self.lock:
+            if cancel_previous:
+                for future in self.cancellable:
+                    future.cancel()
+                self.cancellable = []
+            batch = {
+                epg_name: stream_id
+                for epg_name, stream_id in streams.items()
+                if stream_id not in self.pending and not self.is_fresh(stream_id)
+            }
+            if not batch:
+                return
+            self.pending.update(batch.values())
+            results = {}
+            remaining = [len(batch)]
+            for epg_name, stream_id in batch.items():
+                future = self.executor.submit(self.load, stream_id)
+                if cancel_previous:
+                    self.cancellable.append(future)
+                future.add_done_callback(
+                    partial(self.loaded, epg_name, stream_id, results, remaining)
+                )
+
+    def loaded(self, epg_name, stream_id, results, remaining, future):
+        with self.lock:
+            self.pending.discard(stream_id)
+            if not future.cancelled():
+                programmes = future.result()
+                self.cache[stream_id] = (time.time(), programmes)
+                results[epg_name] = programmes
+            remaining[0] -= 1
+            finished = remaining[0] == 0
+        if finished and results:
+            self.callback(results)
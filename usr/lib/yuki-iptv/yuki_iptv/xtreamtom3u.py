@@ -21,23 +21,32 @@
 # Font Awesome Free 5.15.4 by @fontawesome - https://fontawesome.com
 # License - https://creativecommons.org/licenses/by/4.0/
 #
+from yuki_iptv.m3u import M3UParser
+
+
+def get_xtream_channel_info(_, channel, append_group=""):
+    """Returns (name, EPG ID, group, logo, url) of Xtream channel"""
+    # Add EPG channel ID in case channel name and epg_id are different.
+    try:
+        epg_channel_id = channel.epg_channel_id if channel.epg_channel_id else ""
+    except Exception:
+        epg_channel_id = ""
+    try:
+        group = channel.group_title if channel.group_title else ""
+    except Exception:
+        group = _("All channels")
+    if append_group:
+        group = append_group + " " + group
+    logo = channel.logo if channel.logo else ""
+    return channel.name, epg_channel_id, group, logo, channel.url
+
+
 def convert_xtream_to_m3u(_, data, skip_init=False, append_group=""):
-    output = "#EXTM3U\n" if not skip_init else ""
+    output = ["#EXTM3U\n"] if not skip_init else []
     for channel in data:
-        name = channel.name
-        # Add EPG channel ID in case channel name and epg_id are different.
-        try:
-            epg_channel_id = channel.epg_channel_id if channel.epg_channel_id else ""
-        except Exception:
-            epg_channel_id = ""
-        try:
-            group = channel.group_title if channel.group_title else ""
-        except Exception:
-            group = _("All channels")
-        if append_group:
-            group = append_group + " " + group
-        logo = channel.logo if channel.logo else ""
-        url = channel.url
+        name, epg_channel_id, group, logo, url = get_xtream_channel_info(
+            _, channel, append_group
+        )
         line = "#EXTINF:0"
         if epg_channel_id:
             line += f' tvg-id="{epg_channel_id}"'
@@ -46,5 +55,47 @@ def convert_xtream_to_m3u(_, data, skip_init=False, append_group=""):
         if group:
             line += f' group-title="{group}"'
         line += f",{name}"
-        output += line + "\n" + url + "\n"
-    return output
+        output.append(line + "\n" + url + "\n")
+    return "".join(output)
+
+
+def convert_xtream_to_channels(_, data, append_group="", udp_proxy="", stream_ids=None):
+    """Build channel records directly, same as parsing convert_xtream_to_m3u output
+
+    If stream_ids dict is given, it is filled with channel name -> stream ID
+    """
+    m3u_parser = M3UParser(udp_proxy, _)
+    all_channels = _("All channels")
+    default_catchup, default_catchup_days, default_catchup_source = (
+        m3u_parser.catchup_data
+    )
+    channels = []
+    for channel in data:
+        name, epg_channel_id, group, logo, url = get_xtream_channel_info(
+            _, channel, append_group
+        )
+        group = group.strip()
+        if stream_ids is not None:
+            stream_ids[name.strip()] = channel.id
+        url = m3u_parser.apply_udp_proxy(url)
+        useragent = ""
+        referer = ""
+        if "|" in url:
+            url, useragent, referer = m3u_parser.parse_url_kodi_arguments(url)
+        channels.append(
+            {
+                "title": name.strip(),
+                "tvg-name": "",
+                "tvg-ID": epg_channel_id.strip(),
+                "tvg-logo": logo.strip(),
+                "tvg-group": group if group else all_channels,
+                "tvg-url": "",
+                "catchup": default_catchup,
+                "catchup-source": default_catchup_source,
+                "catchup-days": default_catchup_days,
+                "useragent": useragent,
+                "referer": referer,
+                "url": url,
+            }
+        )
+    return channels
@@ -0,0 +1,250 @@
+#
+# Copyright (c) 2021, 2022 Astroncia
+# Copyright (c) 2023, 2024 Liya Astrova <liyaastrova@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# Font Awesome Free 5.15.4 by @fontawesome - https://fontawesome.com
+# License - https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import csv
+import json
+import time
+import gettext
+import logging
+import threading
+from urllib.parse import urlsplit
+
+_ = gettext.gettext
+
+logger = logging.getLogger(__name__)
+
+# Playback startup phases, in the order mpv reports them:
+# start-file - mpv started opening the URL
+# file-loaded - DNS, HTTP (redirects), HLS manifest and demuxer probing done
+# video / audio - first decoded video frame / audio output configured
+# playback - playback started (initial cache filled)
+ZAP_STATS_PHASES = ("start-file", "file-loaded", "video", "audio", "playback")
+# mpv event -> phase
+ZAP_STATS_EVENTS = {
+    "start-file": "start-file",
+    "file-loaded": "file-loaded",
+    "video-reconfig": "video",
+    "audio-reconfig": "audio",
+    "playback-restart": "playback",
+}
+ZAP_STATS_MAX_SAMPLES = 100
+ZAP_STATS_BUCKETS = (250, 500, 1000, 2000, 4000, 8000)  # milliseconds
+ZAP_STATS_CSV_MAX_SIZE = 1024 * 1024
+
+
+def get_percentile(samples, percent):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+def get_url_host(url):
+    """Host (and port) of URL, stream URL may contain credentials"""
+    try:
+        url_parts = urlsplit(url)
+        host = url_parts.hostname or ""
+        if ":" in host:
+            host = f"[{host}]"
+        if url_parts.port:
+            host += f":{url_parts.port}"
+    except Exception:
+        host = ""
+    return host
+
+
+def get_histogram(samples):
+    """Count samples in ZAP_STATS_BUCKETS, last bucket is everything above"""
+    histogram = [0] * (len(ZAP_STATS_BUCKETS) + 1)
+    for sample in samples:
+        bucket = 0
+        while bucket < len(ZAP_STATS_BUCKETS) and sample >= ZAP_STATS_BUCKETS[bucket]:
+            bucket += 1
+        histogram[bucket] += 1
+    return histogram
+
+
+class ZapStats:
+    """Playback startup latency, per channel
+
+    mark() is called from mpv event thread, so everything is under lock
+    """
+
+    def __init__(self, json_path, csv_path, playlist):
+        self.json_path = json_path
+        self.csv_path = csv_path
+        self.playlist = playlist
+        self.lock = threading.Lock()
+        self.current = None
+        self.stats = {}
+        self.channel_stats = {}
+        self.last = {}
+        self.load()
+
+    def load(self):
+        if os.path.isfile(self.json_path):
+            try:
+                with open(self.json_path, encoding="utf8") as zap_stats_file:
+                    self.stats = json.loads(zap_stats_file.read())
+            except Exception:
+                logger.warning("Failed to load startup latency stats")
+        if self.playlist not in self.stats:
+            self.stats[self.playlist] = {}
+        self.channel_stats = self.stats[self.playlist]
+
+    def save(self):
+        with self.lock:
+            data = json.dumps(self.stats)
+        try:
+            with open(self.json_path + ".tmp", "w", encoding="utf8") as zap_stats_file:
+                zap_stats_file.write(data)
+            os.replace(self.json_path + ".tmp", self.json_path)
+        except Exception:
+            logger.warning("Failed to save startup latency stats")
+
+    def start(self, channel_name, url):
+        """Play requested, unfinished previous measurement is dropped"""
+        with self.lock:
+            self.current = {
+                "channel": channel_name,
+                "host": get_url_host(url),
+                "time": time.time(),
+                "requested": time.monotonic(),
+                "phases": {},
+            }
+
+    def cancel(self):
+        with self.lock:
+            self.current = None
+
+    def mark(self, phase):
+        """True when playback of the current file has started"""
+        finished = None
+        with self.lock:
+            current = self.current
+            if not current or phase in current["phases"]:
+                return False
+            # Events of previous file may still come in before start-file
+            if phase != "start-file" and "start-file" not in current["phases"]:
+                return False
+            current["phases"][phase] = round(
+                (time.monotonic() - current["requested"]) * 1000
+            )
+            if phase == "playback" and "file-loaded" in current["phases"]:
+                finished = current
+                self.add_sample(current)
+                self.current = None
+        if finished:
+            self.write_csv(finished, "ok")
+            logger.info(
+                f"Startup latency for '{finished['channel']}': "
+                + ", ".join(
+                    f"{phase} {finished['phases'][phase]} ms"
+                    for phase in ZAP_STATS_PHASES
+                    if phase in finished["phases"]
+                )
+            )
+        return finished is not None
+
+    def fail(self):
+        with self.lock:
+            failed = self.current
+            self.current = None
+        if failed and "start-file" in failed["phases"]:
+            self.write_csv(failed, "error")
+
+    def add_sample(self, sample):
+        channel_name = sample["channel"]
+        if channel_name not in self.channel_stats:
+            self.channel_stats[channel_name] = {}
+        for phase, value in sample["phases"].items():
+            samples = self.channel_stats[channel_name].setdefault(phase, [])
+            samples.append(value)
+            del samples[:-ZAP_STATS_MAX_SAMPLES]
+        self.last[channel_name] = dict(sample["phases"])
+
+    def write_csv(self, sample, result):
+        try:
+            if (
+                os.path.isfile(self.csv_path)
+                and os.path.getsize(self.csv_path) > ZAP_STATS_CSV_MAX_SIZE
+            ):
+                os.replace(self.csv_path, self.csv_path + ".1")
+            write_header = not os.path.isfile(self.csv_path)
+            with open(self.csv_path, "a", encoding="utf8", newline="") as csv_file:
+                writer = csv.writer(csv_file)
+                if write_header:
+                    writer.writerow(
+                        ["time", "playlist", "channel", "host", "result"]
+                        + [f"{phase}_ms" for phase in ZAP_STATS_PHASES]
+                    )
+                writer.writerow(
+                    [
+                        round(sample["time"]),
+                        self.playlist,
+                        sample["channel"],
+                        sample["host"],
+                        result,
+                    ]
+                    + [sample["phases"].get(phase, "") for phase in ZAP_STATS_PHASES]
+                )
+        except Exception:
+            logger.warning("Failed to write startup latency log")
+
+    def get_properties(self, channel_name):
+        """Summary and histogram for stream information window"""
+        phase_names = {
+            "file-loaded": _("Stream opened"),
+            "video": _("First video frame"),
+            "audio": _("First audio"),
+            "playback": _("Playback started"),
+        }
+        summary = {}
+        histogram_properties = {}
+        with self.lock:
+            channel_stats = {
+                phase: list(samples)
+                for phase, samples in self.channel_stats.get(channel_name, {}).items()
+            }
+            last = dict(self.last.get(channel_name, {}))
+        for phase, phase_name in phase_names.items():
+            samples = channel_stats.get(phase)
+            if not samples:
+                continue
+            value = f"{get_percentile(samples, 50)} ms ({_('median')}), "
+            value += f"{get_percentile(samples, 90)} ms (90%)"
+            if phase in last:
+                value = f"{last[phase]} ms, " + value
+            summary[phase_name] = value
+        samples = channel_stats.get("playback")
+        if samples:
+            histogram = get_histogram(samples)
+            lower = 0
+            for bucket, count in enumerate(histogram):
+                if bucket < len(ZAP_STATS_BUCKETS):
+                    name = f"{lower / 1000:g} - {ZAP_STATS_BUCKETS[bucket] / 1000:g} s"
+                    lower = ZAP_STATS_BUCKETS[bucket]
+                else:
+                    name = f"> {lower / 1000:g} s"
+                bar = "|" * round(count * 20 / len(samples))
+                histogram_properties[name] = f"{count} {bar}".strip()
+        return summary, histogram_properties